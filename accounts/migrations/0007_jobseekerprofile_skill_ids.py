@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_jobseekerprofile_phone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='skill_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
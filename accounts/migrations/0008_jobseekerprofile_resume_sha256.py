@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_jobseekerprofile_skill_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='resume_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
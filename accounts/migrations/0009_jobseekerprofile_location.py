@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_jobseekerprofile_resume_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='location_country',
+            field=models.CharField(blank=True, editable=False, max_length=2),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='location_place',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='location_region',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -115,12 +115,20 @@ class JobSeekerProfile(models.Model):
     gender = models.CharField(max_length=10, choices=[('male', 'Male'), ('female', 'Female'), ('other', 'Other')], blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume_sha256 = models.CharField(max_length=64, blank=True, editable=False)  # Set on upload, keys jobs.ResumeExtract
     bio = models.TextField(blank=True)
     location = models.CharField(max_length=200, blank=True)
+    # Canonical location from the jobs.locations gazetteer, kept in sync on save; empty when unknown
+    location_place = models.CharField(max_length=64, blank=True, editable=False)
+    location_region = models.CharField(max_length=16, blank=True, editable=False)
+    location_country = models.CharField(max_length=2, blank=True, editable=False)
+    latitude = models.FloatField(blank=True, null=True, editable=False)
+    longitude = models.FloatField(blank=True, null=True, editable=False)
     linkedin_url = models.URLField(blank=True)
     github_url = models.URLField(blank=True)
     portfolio_url = models.URLField(blank=True)
     skills = models.JSONField(default=list, blank=True)
+    skill_ids = models.JSONField(default=list, blank=True, editable=False)  # Canonical jobs.Skill ids, kept in sync on save
     experience_years = models.IntegerField(default=0)
     education = models.JSONField(default=list, blank=True)  # [{"degree": "", "institution": "", "year": ""}]
     created_at = models.DateTimeField(auto_now_add=True)
@@ -347,17 +347,14 @@ def update_profile(request):
                 
                 form.save()
                 
-                # If resume was uploaded, generate AI recommendations
+                # If resume was uploaded, queue AI recommendations in the background
                 if resume_uploaded and profile.resume:
                     try:
-                        from jobs.ai_recommender import recommend_jobs_from_resume
-                        ai_recommendations = recommend_jobs_from_resume(profile.resume, request.user, top_k=10)
-                        if ai_recommendations:
-                            messages.success(request, f'Profile updated! Found {len(ai_recommendations)} AI-powered job recommendations based on your resume.')
-                        else:
-                            messages.success(request, 'Profile updated successfully!')
+                        from jobs.resume_pipeline import enqueue_resume_processing
+                        enqueue_resume_processing(request.user, top_k=10)
+                        messages.success(request, 'Profile updated! Your resume is being analysed; AI-powered recommendations will appear on your recommendations page shortly.')
                     except Exception as e:
-                        # If AI recommendation fails, still show success for profile update
+                        # If queueing fails, still show success for profile update
                         import logging
                         logger = logging.getLogger(__name__)
                         logger.error(f"AI recommendation error: {e}")
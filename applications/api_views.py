@@ -1,11 +1,17 @@
 from rest_framework import viewsets, permissions
+from core.pagination import KeysetPagination
 from .models import Application
 from .serializers import ApplicationSerializer
 
 
+class ApplicationPagination(KeysetPagination):
+    ordering = ('-applied_at', '-id')
+
+
 class ApplicationViewSet(viewsets.ModelViewSet):
     serializer_class = ApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ApplicationPagination
     
     def get_queryset(self):
         if self.request.user.is_job_seeker:
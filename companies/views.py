@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.db.models import Count, Q
 from .models import Company
 from jobs.models import Job
+from jobs.skills import get_profile_skill_matrix, get_skill_ids
 from applications.models import Application
 
 
@@ -225,7 +226,13 @@ def applicants(request):
     if job_filter:
         applications = applications.filter(job_id=job_filter)
     if skill_filter:
-        applications = applications.filter(user__job_seeker_profile__skills__icontains=skill_filter)
+        skill_ids = get_skill_ids([skill_filter], create=False)
+        if skill_ids:
+            profile_ids = get_profile_skill_matrix().ids_with_any(skill_ids)
+            applications = applications.filter(user__job_seeker_profile__id__in=profile_ids)
+        else:
+            # Not a known skill: fall back to a substring match on the raw skills
+            applications = applications.filter(user__job_seeker_profile__skills__icontains=skill_filter)
     
     context = {
         'applications': applications,
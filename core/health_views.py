@@ -0,0 +1,22 @@
+from django.db import connection
+from django.http import JsonResponse
+
+
+def live(request):
+    """Liveness probe: the process is serving requests"""
+    return JsonResponse({'status': 'ok'})
+
+
+def ready(request):
+    """Readiness probe: database reachable and AI model warmed up (when preloading)"""
+    from jobs.warmup import readiness
+
+    state = readiness()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        state['database'] = True
+    except Exception:
+        state['database'] = False
+        state['ready'] = False
+    return JsonResponse(state, status=200 if state['ready'] else 503)
@@ -0,0 +1,267 @@
+"""
+Keyset (cursor) pagination
+
+Pages are selected with a WHERE on the ordering key - (created_at, id) by
+default - instead of OFFSET, so page N costs the same as page 1. Cursors are
+opaque URL-safe tokens holding the boundary row's key. Totals are optional:
+they are counted once per query and cached (PAGINATION_COUNT_TIMEOUT) instead
+of running COUNT(*) on every page.
+"""
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_ORDERING = ('-created_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(payload):
+    data = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Payload of a cursor token; raises InvalidCursor when it is malformed"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(data)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(payload, dict):
+        raise InvalidCursor(cursor)
+    return payload
+
+
+class CursorPage:
+    """One page of results with cursors to its neighbours (count is None when not computed)"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _field_name(ordering_field):
+    return ordering_field.lstrip('-')
+
+
+def _reverse(ordering_field):
+    return ordering_field[1:] if ordering_field.startswith('-') else '-' + ordering_field
+
+
+def _position(obj, ordering):
+    values = []
+    for field in ordering:
+        value = getattr(obj, _field_name(field))
+        # isoformat keeps microseconds (DjangoJSONEncoder truncates them)
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return values
+
+
+def _keyset_filter(model, ordering, position, backwards):
+    """Rows strictly after `position` in `ordering` (before it when going backwards)"""
+    try:
+        values = [
+            model._meta.get_field(_field_name(field)).to_python(value)
+            for field, value in zip(ordering, position)
+        ]
+    except Exception:
+        raise InvalidCursor(position)
+    condition = Q()
+    for i, field in enumerate(ordering):
+        descending = field.startswith('-') != backwards
+        term = Q(**{f'{_field_name(field)}__{"lt" if descending else "gt"}': values[i]})
+        for previous, value in zip(ordering[:i], values[:i]):
+            term &= Q(**{_field_name(previous): value})
+        condition |= term
+    return condition
+
+
+def paginate_keyset(queryset, cursor=None, page_size=20, ordering=DEFAULT_ORDERING):
+    """
+    Page of `queryset` after (or before) the cursor's position
+
+    Args:
+        queryset: Unordered or ordered QuerySet (re-ordered by `ordering`)
+        cursor: Token from a previous page's next_cursor/previous_cursor, or None for the first page
+        page_size: Rows per page
+        ordering: Unique ordering key, e.g. ('-created_at', '-id')
+
+    Returns:
+        CursorPage: Model instances in `ordering` order
+    """
+    position, backwards = None, False
+    if cursor:
+        payload = decode_cursor(cursor)
+        position, backwards = payload.get('p'), bool(payload.get('r'))
+        if not isinstance(position, list) or len(position) != len(ordering):
+            raise InvalidCursor(cursor)
+
+    order = [_reverse(field) for field in ordering] if backwards else list(ordering)
+    queryset = queryset.order_by(*order)
+    if position is not None:
+        queryset = queryset.filter(_keyset_filter(queryset.model, ordering, position, backwards))
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    has_next, has_previous = (True, has_more) if backwards else (has_more, position is not None)
+    next_cursor = previous_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor({'p': _position(rows[-1], ordering)})
+    if rows and has_previous:
+        previous_cursor = encode_cursor({'p': _position(rows[0], ordering), 'r': 1})
+    return CursorPage(rows, next_cursor, previous_cursor)
+
+
+def paginate_ranked(ids, cursor=None, page_size=20):
+    """
+    Page of an already ranked id list (e.g. relevance order), where there is no
+    ordering key to seek on; the cursor holds the list offset
+
+    Returns:
+        CursorPage: Ids for this page, with count set to len(ids)
+    """
+    offset = 0
+    if cursor:
+        offset = decode_cursor(cursor).get('o')
+        if not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor(cursor)
+    end = offset + page_size
+    next_cursor = encode_cursor({'o': end}) if end < len(ids) else None
+    previous_cursor = encode_cursor({'o': max(offset - page_size, 0)}) if offset > 0 else None
+    return CursorPage(list(ids[offset:end]), next_cursor, previous_cursor, count=len(ids))
+
+
+def cached_count(queryset, key_parts, timeout=None):
+    """
+    Total rows of `queryset`, counted once and cached
+
+    Args:
+        queryset: QuerySet to count
+        key_parts: JSON-serialisable values identifying the query (filters, user,
+            catalogue generation); the SQL itself changes with the current time
+        timeout: Cache lifetime in seconds (default PAGINATION_COUNT_TIMEOUT); 0 disables counting
+
+    Returns:
+        int or None: None when counting is disabled
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'PAGINATION_COUNT_TIMEOUT', 300)
+    if not timeout:
+        return None
+    digest = hashlib.sha1(json.dumps(key_parts, sort_keys=True, default=str).encode()).hexdigest()
+    key = f'pagination:count:{queryset.model._meta.label_lower}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF cursor pagination on a unique (timestamp, id) key
+
+    Responses look like PageNumberPagination's ({count, next, previous, results}),
+    with ?cursor= links instead of ?page=. Views may define get_count_version()
+    to invalidate cached counts (e.g. the job catalogue generation).
+    """
+    ordering = DEFAULT_ORDERING
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    cursor_query_param = 'cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_count_key(self, request, view):
+        params = sorted(
+            (key, value) for key, value in request.query_params.lists()
+            if key not in (self.cursor_query_param, self.page_size_query_param)
+        )
+        version = view.get_count_version() if hasattr(view, 'get_count_version') else None
+        return [request.path, request.user.pk, params, version]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = paginate_keyset(
+                queryset, request.query_params.get(self.cursor_query_param),
+                self.get_page_size(request), self.ordering,
+            )
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+        self.page.count = cached_count(queryset, self.get_count_key(request, view))
+        return list(self.page)
+
+    def use_page(self, page, request):
+        """Adopt a CursorPage built elsewhere (e.g. from a result cache); returns its objects"""
+        self.request = request
+        self.page = page
+        return list(page)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
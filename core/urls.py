@@ -1,10 +1,12 @@
 from django.urls import path
-from . import admin_views
+from . import admin_views, health_views
 
 app_name = 'core'
 
 urlpatterns = [
     path('admin/analytics/', admin_views.admin_analytics, name='admin_analytics'),
     path('admin/update-analytics/', admin_views.update_analytics, name='update_analytics'),
+    path('health/live/', health_views.live, name='health_live'),
+    path('health/ready/', health_views.ready, name='health_ready'),
 ]
 
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration
+Usage: AI_PRELOAD_MODEL=True gunicorn job_portal.wsgi -c gunicorn.conf.py
+
+With preload_app the Django app (and, with AI_PRELOAD_MODEL, the sentence
+transformer weights) is loaded once in the master; forked workers share that
+memory copy-on-write and each runs a short warm-up before reporting ready on
+/health/ready/.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with workers
+    from django.db import connections
+    connections.close_all()
+
+    # Torch thread pools are not fork-safe: initialise inference per worker, off the accept loop
+    from jobs.warmup import preload_enabled, start_warm_up
+    if preload_enabled():
+        start_warm_up()
@@ -5,3 +5,11 @@ try:
 except ImportError:
     pass
 
+
+# Load the Celery app when celery is installed so @shared_task binds to it
+try:
+    from .celery import app as celery_app
+except ImportError:
+    celery_app = None
+
+__all__ = ('celery_app',)
@@ -0,0 +1,26 @@
+"""
+Celery application for background jobs (batch recommendations, resume processing)
+Usage: celery -A job_portal worker -l info
+"""
+import os
+
+from celery import Celery
+from celery.signals import worker_process_init
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
+
+app = Celery('job_portal')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def warm_up_recommender(**kwargs):
+    """Warm up the AI model in each forked worker process (AI_PRELOAD_MODEL)"""
+    from jobs.warmup import preload_enabled, warm_up
+
+    if preload_enabled():
+        try:
+            warm_up()
+        except Exception:
+            pass
@@ -159,6 +159,15 @@ except ImportError:
     }
 
 
+# Celery (optional - background tasks run inline/in threads when no broker is configured)
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='')
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+# Resume processing runs with no progress for this many seconds (worker died or recycled) are re-queued
+RESUME_PROCESSING_TIMEOUT = config('RESUME_PROCESSING_TIMEOUT', default=600, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -251,6 +260,10 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Job and application listings use cursor pagination (core.pagination); totals are counted
+# once per query and cached for this many seconds (0 = omit totals)
+PAGINATION_COUNT_TIMEOUT = config('PAGINATION_COUNT_TIMEOUT', default=300, cast=int)
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -263,12 +276,66 @@ CORS_ALLOW_CREDENTIALS = True
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 
+# Resume parsing limits: text past these budgets is ignored, and parsing runs in a pool of
+# RESUME_PARSE_WORKERS subprocesses killed after RESUME_PARSE_TIMEOUT seconds (0 workers = parse inline)
+RESUME_MAX_PAGES = config('RESUME_MAX_PAGES', default=20, cast=int)
+RESUME_MAX_CHARS = config('RESUME_MAX_CHARS', default=100000, cast=int)
+RESUME_PARSE_TIMEOUT = config('RESUME_PARSE_TIMEOUT', default=20, cast=int)
+RESUME_PARSE_WORKERS = config('RESUME_PARSE_WORKERS', default=2, cast=int)
+RESUME_MAX_BYTES = config('RESUME_MAX_BYTES', default=10485760, cast=int)  # Larger stored files are not parsed
+
 # AI Recommendation Settings (Hugging Face)
 AI_RECOMMENDATION_MODEL = config('AI_RECOMMENDATION_MODEL', default='sentence-transformers/all-mpnet-base-v2')
 # Alternative models you can use:
 # - 'sentence-transformers/all-MiniLM-L6-v2' (faster, smaller)
 # - 'sentence-transformers/all-mpnet-base-v2' (better accuracy, default)
 # - 'sentence-transformers/paraphrase-multilingual-mpnet-base-v2' (multilingual)
+# Append '@torch-int8' (quantised PyTorch) or '@onnx' (ONNX Runtime) for faster CPU inference, e.g.
+# 'sentence-transformers/all-mpnet-base-v2@onnx'; export ONNX first with `python manage.py export_embedding_model`
+AI_MODEL_ARTIFACT_DIR = config('AI_MODEL_ARTIFACT_DIR', default=str(BASE_DIR / 'ai_models'))
+AI_ONNX_THREADS = config('AI_ONNX_THREADS', default=0, cast=int) or None  # ONNX Runtime intra-op threads (0 = all cores)
+
+# Load and warm up the model at process start instead of on the first request
+# (see gunicorn.conf.py); /health/ready/ reports 503 until warm-up finishes
+AI_PRELOAD_MODEL = config('AI_PRELOAD_MODEL', default=False, cast=bool)
+
+# Long resumes/job postings are embedded as overlapping word windows pooled into one vector
+# (the model truncates past its sequence limit). Keep windows under the model's limit:
+# ~200 words for all-mpnet-base-v2 (384 word pieces), ~150 for all-MiniLM-L6-v2 (256). 0 disables chunking.
+AI_EMBEDDING_CHUNK_WORDS = config('AI_EMBEDDING_CHUNK_WORDS', default=200, cast=int)
+AI_EMBEDDING_CHUNK_OVERLAP = config('AI_EMBEDDING_CHUNK_OVERLAP', default=50, cast=int)
+AI_EMBEDDING_MAX_CHUNKS = config('AI_EMBEDDING_MAX_CHUNKS', default=16, cast=int)  # per document; longer ones are sampled
+AI_EMBEDDING_POOLING = config('AI_EMBEDDING_POOLING', default='mean')  # 'mean' or 'max'
+
+# Optional shared embedding server (python manage.py run_inference_server), e.g.
+# 'http://127.0.0.1:8765' or 'unix:///run/job_portal/inference.sock'; empty = encode in-process
+AI_INFERENCE_URL = config('AI_INFERENCE_URL', default='')
+AI_INFERENCE_TIMEOUT = config('AI_INFERENCE_TIMEOUT', default=30, cast=float)  # per request
+AI_INFERENCE_MAX_BATCH = config('AI_INFERENCE_MAX_BATCH', default=64, cast=int)  # texts per request and per server batch
+AI_INFERENCE_RETRY_AFTER = config('AI_INFERENCE_RETRY_AFTER', default=30, cast=float)  # seconds to skip a failed server
+
+# Vector index used to match resumes against job embeddings:
+# 'exact' (brute force), 'ivf' (approximate, NumPy only) or 'hnsw' (approximate, requires hnswlib)
+AI_VECTOR_INDEX_BACKEND = config('AI_VECTOR_INDEX_BACKEND', default='exact')
+AI_VECTOR_INDEX_DTYPE = config('AI_VECTOR_INDEX_DTYPE', default='float32')  # exact/ivf: 'float16' halves memory, scores slower
+AI_VECTOR_INDEX_DIR = config('AI_VECTOR_INDEX_DIR', default=str(BASE_DIR / 'ai_index'))
+AI_VECTOR_INDEX_NPROBE = config('AI_VECTOR_INDEX_NPROBE', default=8, cast=int)  # ivf: lists scanned per query
+AI_VECTOR_INDEX_EF_SEARCH = config('AI_VECTOR_INDEX_EF_SEARCH', default=64, cast=int)  # hnsw: search breadth
+
+# Job search backend: 'database' (MySQL FULLTEXT / SQLite FTS5), 'index' (in-process BM25)
+# or 'auto' (database full-text when available and no semantic blending, else the index)
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='auto')
+# Job search ('index' backend): BM25 relevance, optionally blended with embedding similarity (0 = lexical only,
+# e.g. 0.3 to mix in semantic matches; requires the AI dependencies)
+SEARCH_SEMANTIC_WEIGHT = config('SEARCH_SEMANTIC_WEIGHT', default=0.0, cast=float)
+# Facet counts (jobs.facets) are cached per normalised query for this many seconds
+SEARCH_FACET_CACHE_TIMEOUT = config('SEARCH_FACET_CACHE_TIMEOUT', default=300, cast=int)
+# Search result ids are cached per normalised query and catalogue generation (jobs.search.search_page);
+# ranked result lists longer than SEARCH_RESULT_CACHE_MAX_IDS are not cached
+SEARCH_RESULT_CACHE_TIMEOUT = config('SEARCH_RESULT_CACHE_TIMEOUT', default=300, cast=int)
+SEARCH_RESULT_CACHE_MAX_IDS = config('SEARCH_RESULT_CACHE_MAX_IDS', default=10000, cast=int)
+# Recommendations treat jobs in a different gazetteer city within this distance (km) as a location match
+LOCATION_MATCH_RADIUS_KM = config('LOCATION_MATCH_RADIUS_KM', default=50, cast=float)
 
 # AWS S3 Settings (Optional)
 USE_S3 = config('USE_S3', default=False, cast=bool)
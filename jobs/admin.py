@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Job, JobView, JobRecommendation
+from .models import Job, JobView, JobRecommendation, ResumeProcessing, Skill
 
 
 @admin.register(Job)
@@ -7,7 +7,7 @@ class JobAdmin(admin.ModelAdmin):
     list_display = ['title', 'company', 'location', 'work_mode', 'job_type', 'is_active', 'is_featured', 'views', 'application_count', 'created_at']
     list_filter = ['is_active', 'is_featured', 'work_mode', 'job_type', 'experience_level', 'created_at']
     search_fields = ['title', 'company__name', 'location']
-    readonly_fields = ['views', 'application_count', 'created_at', 'updated_at']
+    readonly_fields = ['views', 'application_count', 'created_at', 'updated_at', 'content_version', 'content_updated_at']
     list_editable = ['is_active', 'is_featured']
 
 
@@ -24,3 +24,17 @@ class JobRecommendationAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['user__email', 'job__title']
 
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ['name', 'created_at']
+    search_fields = ['name']
+
+
+@admin.register(ResumeProcessing)
+class ResumeProcessingAdmin(admin.ModelAdmin):
+    list_display = ['user', 'status', 'recommendation_count', 'queued_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['user__email']
+    readonly_fields = ['task_id', 'error', 'updated_at']
@@ -1,183 +1,379 @@
 """
 AI-powered Job Recommendation System using Hugging Face Sentence Transformers
 """
-import os
+import threading
+import time
 import numpy as np
 from django.conf import settings
-from django.core.cache import cache
-from sentence_transformers import SentenceTransformer, util
-from PyPDF2 import PdfReader
-import docx
+from django.db import transaction
+from django.utils import timezone
+from sentence_transformers import SentenceTransformer  # noqa: F401 - AI dependencies must be installed
 import logging
 
+from .catalogue import get_catalogue_generation, refresh_in_background
+from .chunking import pool_chunks, split_windows
+from .corpus import corpus_hash, prepare_job_corpus
+from .embedding_backends import load_model
+from .inference_client import try_encode_remote
+from .resume_parsing import (  # noqa: F401 - re-exported
+    extract_text_from_docx, extract_text_from_pdf, extract_text_from_resume,
+)
+from .resume_store import get_cached_embedding, get_resume_extract, store_embedding
+from .vector_index import get_job_index, normalize_rows, save_job_index
+
 logger = logging.getLogger(__name__)
 
 # Global model instance (loaded once)
 _model = None
-_job_embeddings = None
-_jobs_data = None
+_model_lock = threading.Lock()
+# Minimum cosine similarity for a job to be recommended (30%)
+SIMILARITY_THRESHOLD = 0.3
+# Jobs encoded/loaded per batch when syncing the vector index
+INDEX_SYNC_BATCH_SIZE = 1000
+# Re-sync the catalogue index at least this often (seconds), even without a generation bump
+CATALOGUE_SYNC_INTERVAL = 300
+# {model_name: (catalogue_generation, index, synced_at)}
+_catalogue_sync = {}
+
+
+def get_model_name():
+    """Configured model spec ('<model>' or '<model>@<backend>', see jobs.embedding_backends)"""
+    return getattr(settings, 'AI_RECOMMENDATION_MODEL', 'sentence-transformers/all-mpnet-base-v2')
 
 
 def get_model():
     """Get or load the sentence transformer model"""
     global _model
     if _model is None:
-        model_name = getattr(settings, 'AI_RECOMMENDATION_MODEL', 'sentence-transformers/all-mpnet-base-v2')
-        logger.info(f"Loading AI model: {model_name}")
-        try:
-            _model = SentenceTransformer(model_name)
-            logger.info("AI model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load AI model: {e}")
-            raise
+        with _model_lock:
+            if _model is None:
+                model_name = get_model_name()
+                logger.info(f"Loading AI model: {model_name}")
+                try:
+                    _model = load_model(model_name)
+                    logger.info("AI model loaded successfully")
+                except Exception as e:
+                    logger.error(f"Failed to load AI model: {e}")
+                    raise
     return _model
 
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF file"""
-    try:
-        text = []
-        reader = PdfReader(file_path)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text.append(page_text)
-        return "\n".join(text)
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF: {e}")
-        raise
+def get_chunking_config():
+    """(window words, overlap words, max chunks, pooling); window 0 disables chunking"""
+    return (
+        getattr(settings, 'AI_EMBEDDING_CHUNK_WORDS', 200),
+        getattr(settings, 'AI_EMBEDDING_CHUNK_OVERLAP', 50),
+        getattr(settings, 'AI_EMBEDDING_MAX_CHUNKS', 16),
+        getattr(settings, 'AI_EMBEDDING_POOLING', 'mean'),
+    )
 
 
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX file"""
-    try:
-        doc = docx.Document(file_path)
-        paragraphs = [p.text for p in doc.paragraphs if p.text]
-        return "\n".join(paragraphs)
-    except Exception as e:
-        logger.error(f"Error extracting text from DOCX: {e}")
-        raise
+def get_embedding_key():
+    """
+    Identifies how stored document vectors were produced (model spec plus
+    chunking), used to key cached embeddings and index files
+    """
+    window, overlap, max_chunks, pooling = get_chunking_config()
+    if not window:
+        return get_model_name()
+    return f"{get_model_name()}#{pooling}{window}-{overlap}x{max_chunks}"
 
 
-def extract_text_from_resume(resume_file):
+def encode_texts(texts, batch_size=32, show_progress_bar=False):
     """
-    Extract text from resume file (PDF, DOCX, or DOC)
+    Embed texts as a float32 matrix (one row per text)
     
-    Args:
-        resume_file: Django FileField or file path
-        
-    Returns:
-        str: Extracted text from resume
+    Uses the shared inference server when AI_INFERENCE_URL is configured and
+    reachable, otherwise the in-process model.
+    """
+    texts = list(texts)
+    embeddings = try_encode_remote(texts, get_model_name())
+    if embeddings is None:
+        embeddings = get_model().encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=show_progress_bar,
+        )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def encode_documents(texts, batch_size=32, show_progress_bar=False, kind='documents'):
     """
-    # Handle Django FileField
-    if hasattr(resume_file, 'path'):
-        file_path = resume_file.path
-    elif hasattr(resume_file, 'read'):
-        # If it's an in-memory file, save temporarily
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(resume_file.name)[1]) as tmp:
-            for chunk in resume_file.chunks():
-                tmp.write(chunk)
-            file_path = tmp.name
-    else:
-        file_path = resume_file
+    Embed possibly long documents (resumes, job postings) as unit-length rows
     
-    ext = os.path.splitext(file_path)[1].lower()
+    Each document is split into overlapping word windows (AI_EMBEDDING_CHUNK_*),
+    all windows are encoded in one batch and pooled (AI_EMBEDDING_POOLING) per
+    document, so text past the model's sequence limit still counts.
+    """
+    texts = list(texts)
+    window, overlap, max_chunks, pooling = get_chunking_config()
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    if not window:
+        return normalize_rows(encode_texts(texts, batch_size, show_progress_bar))
     
-    if ext == ".pdf":
-        text = extract_text_from_pdf(file_path)
-    elif ext in [".docx", ".doc"]:
-        text = extract_text_from_docx(file_path)
-    else:
-        raise ValueError(f"Unsupported resume file type: {ext}")
+    chunks, owners, word_counts, chunk_counts = [], [], [], []
+    for position, text in enumerate(texts):
+        windows, words = split_windows(text, window, overlap, max_chunks)
+        chunks.extend(windows)
+        owners.extend([position] * len(windows))
+        word_counts.append(words)
+        chunk_counts.append(len(windows))
     
-    # Clean up temporary file if created
-    if hasattr(resume_file, 'read') and os.path.exists(file_path):
-        try:
-            os.unlink(file_path)
-        except:
-            pass
+    vectors = encode_texts(chunks, batch_size, show_progress_bar)
+    truncated = sum(1 for words in word_counts if words > window + (max_chunks - 1) * (window - overlap))
+    logger.info(
+        f"Encoded {len(texts)} {kind} as {len(chunks)} chunks "
+        f"(words/doc mean {np.mean(word_counts):.0f}, max {max(word_counts)}; "
+        f"chunks/doc max {max(chunk_counts)}; {truncated} sampled at the {max_chunks}-chunk cap)"
+    )
+    return pool_chunks(vectors, owners, len(texts), pooling)
+
+
+def _load_stored_embeddings(job_ids, model_name):
+    """Fetch persisted embeddings for the given jobs as {job_id: (hash, vector)}"""
+    from .models import JobEmbedding
     
-    return text
+    stored = {}
+    rows = JobEmbedding.objects.filter(
+        job_id__in=job_ids, model_name=model_name
+    ).values_list('job_id', 'content_hash', 'vector')
+    for job_id, content_hash, vector in rows:
+        stored[job_id] = (content_hash, normalize_rows(np.frombuffer(bytes(vector), dtype=np.float32))[0])
+    return stored
+
 
+def _store_embeddings(entries, model_name):
+    """Persist freshly computed embeddings, replacing any previous row per job for `model_name` only"""
+    from .models import JobEmbedding
+    
+    if not entries:
+        return
+    job_ids = [job_id for job_id, _, _ in entries]
+    with transaction.atomic():
+        JobEmbedding.objects.filter(job_id__in=job_ids, model_name=model_name).delete()
+        JobEmbedding.objects.bulk_create([
+            JobEmbedding(
+                job_id=job_id,
+                model_name=model_name,
+                content_hash=content_hash,
+                vector=vector.astype(np.float32).tobytes(),
+                dimensions=vector.shape[0],
+            )
+            for job_id, content_hash, vector in entries
+        ])
 
-def prepare_job_corpus(job):
+
+def get_job_embeddings(jobs_queryset, force_reload=False):
     """
-    Combine job fields into a single text corpus for embedding
+    Get or compute embeddings for jobs
+    
+    Embeddings are stored per job and keyed by a hash of the job corpus, so
+    only new or changed postings are encoded. Vectors are persisted in the
+    JobEmbedding table (shared by all workers) and served from the vector
+    index once synced, so nothing else is kept in-process.
     
     Args:
-        job: Job model instance
+        jobs_queryset: QuerySet of Job objects
+        force_reload: Re-encode every job regardless of stored embeddings
         
     Returns:
-        str: Combined text from job fields
+        tuple: (contiguous float32 matrix of L2-normalised embeddings, jobs_list)
     """
-    parts = []
+    jobs_list = list(jobs_queryset)
+    if not jobs_list:
+        return None, []
+    
+    model_name = get_embedding_key()
+    hashes = {job.id: corpus_hash(prepare_job_corpus(job)) for job in jobs_list}
+    
+    # Reuse persisted vectors whose corpus hash still matches
+    vectors = {}
+    if not force_reload:
+        stored = _load_stored_embeddings(list(hashes), model_name)
+        for job in jobs_list:
+            if job.id in stored and stored[job.id][0] == hashes[job.id]:
+                vectors[job.id] = stored[job.id][1]
     
-    if job.title:
-        parts.append(str(job.title))
-    if hasattr(job, 'company') and job.company and job.company.name:
-        parts.append(str(job.company.name))
-    if job.location:
-        parts.append(str(job.location))
-    if job.description:
-        parts.append(str(job.description))
-    if job.skills_required:
-        if isinstance(job.skills_required, list):
-            parts.append(" ".join(str(s) for s in job.skills_required))
-        else:
-            parts.append(str(job.skills_required))
-    if job.requirements:
-        parts.append(str(job.requirements))
+    # Encode only new or changed jobs
+    stale_jobs = [job for job in jobs_list if job.id not in vectors]
+    if stale_jobs:
+        logger.info(f"Encoding {len(stale_jobs)} of {len(jobs_list)} job postings...")
+        try:
+            encoded = encode_documents(
+                [prepare_job_corpus(job) for job in stale_jobs],
+                show_progress_bar=len(stale_jobs) > 100,
+                kind='job postings',
+            )
+        except Exception as e:
+            logger.error(f"Error computing job embeddings: {e}")
+            raise
+        
+        entries = []
+        for job, vector in zip(stale_jobs, encoded):
+            vectors[job.id] = vector
+            entries.append((job.id, hashes[job.id], vector))
+        _store_embeddings(entries, model_name)
     
-    return " . ".join(parts)
+    embeddings = np.empty((len(jobs_list), vectors[jobs_list[0].id].shape[0]), dtype=np.float32)
+    for row, job in enumerate(jobs_list):
+        embeddings[row] = vectors[job.id]
+    return embeddings, jobs_list
 
 
-def get_job_embeddings(jobs_queryset, force_reload=False):
+def sync_job_index(id_versions, model_name=None):
     """
-    Get or compute embeddings for jobs
+    Bring the vector index up to date for the given (job_id, content_version)
+    pairs, encoding or loading embeddings only for missing or outdated jobs
+    """
+    from .models import Job
+    
+    model_name = model_name or get_embedding_key()
+    index = get_job_index(model_name)
+    stale_ids = index.stale_ids(id_versions)
+    for start in range(0, len(stale_ids), INDEX_SYNC_BATCH_SIZE):
+        batch = Job.objects.filter(
+            id__in=stale_ids[start:start + INDEX_SYNC_BATCH_SIZE]
+        ).select_related('company')
+        embeddings, jobs_list = get_job_embeddings(batch)
+        if jobs_list:
+            index.add(
+                [job.id for job in jobs_list],
+                embeddings,
+                [job.content_version for job in jobs_list],
+            )
+    if stale_ids:
+        logger.info(f"Vector index updated with {len(stale_ids)} jobs ({len(index)} total)")
+        save_job_index(model_name)
+    return index
+
+
+def sync_catalogue_index(model_name=None, generation=None):
+    """Bring the catalogue index in line with the open jobs in the database (a full scan)"""
+    from .models import Job
+    
+    model_name = model_name or get_embedding_key()
+    generation = get_catalogue_generation() if generation is None else generation
+    now = timezone.now()
+    rows = list(Job.objects.open(now).values_list('id', 'content_version', 'deadline'))
+    
+    index = sync_job_index([(job_id, version) for job_id, version, _ in rows], model_name)
+    open_ids = {job_id for job_id, _, _ in rows}
+    closed_ids = [job_id for job_id in index.ids() if job_id not in open_ids]
+    if closed_ids:
+        index.remove(closed_ids)
+        save_job_index(model_name)
+    index.set_deadlines(
+        [job_id for job_id, _, _ in rows],
+        [deadline.timestamp() if deadline else None for _, _, deadline in rows],
+    )
+    _catalogue_sync[model_name] = (generation, index, time.time())
+    return index
+
+
+def get_catalogue_index(model_name=None, wait=False):
+    """
+    Return the vector index over the shared catalogue of open jobs
+    
+    The index is synced with the database only when the catalogue generation
+    changes (or every CATALOGUE_SYNC_INTERVAL seconds), so it is shared by all
+    users; per-user filtering happens at query time in _match_jobs. The sync
+    runs in a background thread and the current index is returned meanwhile;
+    only an empty index (or wait=True) is synced inline.
     
     Args:
-        jobs_queryset: QuerySet of Job objects
-        force_reload: Force recomputation of embeddings
-        
-    Returns:
-        tuple: (embeddings, jobs_list)
+        wait: Sync inline when stale (warm-up, batch jobs)
     """
-    global _job_embeddings, _jobs_data
+    model_name = model_name or get_embedding_key()
+    generation = get_catalogue_generation()
+    index = get_job_index(model_name)
+    synced = _catalogue_sync.get(model_name)
+    if (synced and synced[0] == generation and synced[1] is index
+            and time.time() - synced[2] < CATALOGUE_SYNC_INTERVAL):
+        return index
     
-    # Use cache key based on job count and latest update
-    cache_key = f"job_embeddings_{jobs_queryset.count()}_{jobs_queryset.latest('updated_at').updated_at.timestamp() if jobs_queryset.exists() else 0}"
+    if wait or not len(index):
+        return sync_catalogue_index(model_name, generation)
+    refresh_in_background(f'catalogue-index:{model_name}', sync_catalogue_index, model_name, generation)
+    return index
+
+
+def ai_recommendation_row(job_id, score):
+    """(job_id, score, reason) row for storing an AI match (cosine score 0-1) as JobRecommendation"""
+    match_percentage = round(score * 100, 2)
+    return (
+        job_id,
+        score * 100,  # Convert to 0-100 scale for consistency
+        f"AI Match: {match_percentage}% similarity based on resume analysis",
+    )
+
+
+def save_ai_recommendations(user, results):
+    """Replace the user's stored recommendations with AI matches in one transaction"""
+    from .utils import save_job_recommendations
     
-    if not force_reload:
-        cached = cache.get(cache_key)
-        if cached:
-            _job_embeddings, _jobs_data = cached
-            return _job_embeddings, _jobs_data
+    return save_job_recommendations(user, [
+        ai_recommendation_row(rec['job'].id, rec['score']) for rec in results
+    ])
+
+
+def _match_jobs(query_embedding, user, top_k):
+    """
+    Find the top_k open jobs the user has not applied to that are most
+    similar to `query_embedding`
     
-    model = get_model()
+    Applied and expired jobs are masked out of the shared catalogue index at
+    query time, so no per-user embeddings or querysets are built.
     
-    # Prepare job corpus texts (queryset already filtered)
-    jobs_list = list(jobs_queryset)
-    corpus_texts = [prepare_job_corpus(job) for job in jobs_list]
+    Returns:
+        list: List of dicts with job and score information
+    """
+    from .models import Job
+    from applications.models import Application
     
-    if not corpus_texts:
-        return None, []
+    index = get_catalogue_index()
+    if not len(index):
+        return []
     
-    logger.info(f"Encoding {len(corpus_texts)} job postings...")
+    applied_job_ids = set(Application.objects.filter(user=user).values_list('job_id', flat=True))
+    job_ids, scores = index.search(
+        query_embedding,
+        k=top_k,
+        min_score=SIMILARITY_THRESHOLD,
+        exclude_ids=applied_job_ids,
+        active_at=time.time(),
+    )
     
-    # Compute embeddings
-    try:
-        embeddings = model.encode(corpus_texts, convert_to_tensor=True, show_progress_bar=True)
-        _job_embeddings = embeddings
-        _jobs_data = jobs_list
-        
-        # Cache for 1 hour
-        cache.set(cache_key, (embeddings, jobs_list), 3600)
-        
-        return embeddings, jobs_list
-    except Exception as e:
-        logger.error(f"Error computing job embeddings: {e}")
-        raise
+    # is_active guards against deactivations not yet seen by this process
+    jobs_by_id = Job.objects.filter(is_active=True).select_related('company').in_bulk(job_ids.tolist())
+    results = []
+    for job_id, score in zip(job_ids.tolist(), scores.tolist()):
+        job = jobs_by_id.get(job_id)
+        if job is not None:
+            results.append({
+                'job': job,
+                'score': score,
+                'match_percentage': round(score * 100, 2)
+            })
+    return results
+
+
+def embed_resume_extract(extract):
+    """Embedding of a ResumeExtract, encoded and stored on first use"""
+    model_name = get_embedding_key()
+    embedding = get_cached_embedding(extract, model_name)
+    if embedding is None:
+        embedding = encode_documents([extract.text], kind='resumes')[0]
+        store_embedding(extract, model_name, embedding)
+    return embedding
+
+
+def match_resume_embedding(resume_emb, user, top_k=10):
+    """Score a resume embedding against the catalogue and save the user's recommendations"""
+    results = _match_jobs(resume_emb, user, top_k)
+    save_ai_recommendations(user, results)
+    return results
 
 
 def recommend_jobs_from_resume(resume_file, user, top_k=10):
@@ -192,76 +388,24 @@ def recommend_jobs_from_resume(resume_file, user, top_k=10):
     Returns:
         list: List of dicts with job and score information
     """
-    from .models import Job
-    from applications.models import Application
-    
     try:
-        # Extract text from resume
+        # Parsed text and embedding are cached per file hash
         logger.info(f"Extracting text from resume for user {user.email}")
-        resume_text = extract_text_from_resume(resume_file)
+        extract = get_resume_extract(resume_file)
+        resume_text = extract.text
         
         if not resume_text or len(resume_text.strip()) < 50:
             logger.warning("Resume text too short or empty")
             return []
         
-        # Get active jobs (exclude expired jobs)
-        from django.utils import timezone
-        from django.db.models import Q
-        now = timezone.now()
-        jobs_queryset = Job.objects.filter(is_active=True).filter(
-            Q(deadline__isnull=True) | Q(deadline__gt=now)
-        ).select_related('company')
-        
-        # Exclude jobs user already applied to
-        applied_job_ids = Application.objects.filter(user=user).values_list('job_id', flat=True)
-        jobs_queryset = jobs_queryset.exclude(id__in=applied_job_ids)
-        
-        if not jobs_queryset.exists():
-            return []
-        
-        # Get job embeddings
-        job_embeddings, jobs_list = get_job_embeddings(jobs_queryset)
+        resume_emb = embed_resume_extract(extract)
         
-        if job_embeddings is None or not jobs_list:
-            return []
-        
-        # Get model and encode resume
-        model = get_model()
-        resume_emb = model.encode(resume_text, convert_to_tensor=True)
-        
-        # Compute cosine similarities
-        cos_scores = util.cos_sim(resume_emb, job_embeddings)[0].cpu().numpy()
-        
-        # Get top indices
-        top_idx = np.argsort(-cos_scores)[:top_k]
-        
-        # Build results
-        results = []
-        for idx in top_idx:
-            job = jobs_list[idx]
-            score = float(cos_scores[idx])
-            
-            # Only include jobs with score > 0.3 (30% similarity threshold)
-            if score > 0.3:
-                results.append({
-                    'job': job,
-                    'score': score,
-                    'match_percentage': round(score * 100, 2)
-                })
+        results = _match_jobs(resume_emb, user, top_k)
         
         logger.info(f"Generated {len(results)} AI recommendations for user {user.email}")
         
         # Save recommendations to database
-        from .models import JobRecommendation
-        for rec in results:
-            JobRecommendation.objects.update_or_create(
-                user=user,
-                job=rec['job'],
-                defaults={
-                    'score': rec['score'] * 100,  # Convert to 0-100 scale for consistency
-                    'reason': f"AI Match: {rec['match_percentage']}% similarity based on resume analysis"
-                }
-            )
+        save_ai_recommendations(user, results)
         
         logger.info(f"Saved {len(results)} AI recommendations to database for user {user.email}")
         return results
@@ -283,72 +427,20 @@ def recommend_jobs_from_text(resume_text, user, top_k=10):
     Returns:
         list: List of dicts with job and score information
     """
-    from .models import Job
-    from applications.models import Application
-    
     try:
         if not resume_text or len(resume_text.strip()) < 50:
             return []
         
-        # Get active jobs (exclude expired jobs)
-        from django.utils import timezone
-        from django.db.models import Q
-        now = timezone.now()
-        jobs_queryset = Job.objects.filter(is_active=True).filter(
-            Q(deadline__isnull=True) | Q(deadline__gt=now)
-        ).select_related('company')
-        
-        # Exclude jobs user already applied to
-        applied_job_ids = Application.objects.filter(user=user).values_list('job_id', flat=True)
-        jobs_queryset = jobs_queryset.exclude(id__in=applied_job_ids)
-        
-        if not jobs_queryset.exists():
-            return []
-        
-        # Get job embeddings
-        job_embeddings, jobs_list = get_job_embeddings(jobs_queryset)
+        # Encode resume text
+        resume_emb = encode_documents([resume_text], kind='resumes')[0]
         
-        if job_embeddings is None or not jobs_list:
-            return []
-        
-        # Get model and encode resume text
-        model = get_model()
-        resume_emb = model.encode(resume_text, convert_to_tensor=True)
-        
-        # Compute cosine similarities
-        cos_scores = util.cos_sim(resume_emb, job_embeddings)[0].cpu().numpy()
-        
-        # Get top indices
-        top_idx = np.argsort(-cos_scores)[:top_k]
-        
-        # Build results
-        results = []
-        for idx in top_idx:
-            job = jobs_list[idx]
-            score = float(cos_scores[idx])
-            
-            if score > 0.3:  # 30% similarity threshold
-                results.append({
-                    'job': job,
-                    'score': score,
-                    'match_percentage': round(score * 100, 2)
-                })
+        results = _match_jobs(resume_emb, user, top_k)
         
         # Save recommendations to database
-        from .models import JobRecommendation
-        for rec in results:
-            JobRecommendation.objects.update_or_create(
-                user=user,
-                job=rec['job'],
-                defaults={
-                    'score': rec['score'] * 100,  # Convert to 0-100 scale for consistency
-                    'reason': f"AI Match: {rec['match_percentage']}% similarity based on resume analysis"
-                }
-            )
+        save_ai_recommendations(user, results)
         
         return results
         
     except Exception as e:
         logger.error(f"Error generating AI recommendations from text: {e}", exc_info=True)
         return []
-
@@ -5,11 +5,13 @@ from . import api_views
 router = DefaultRouter()
 router.register(r'jobs', api_views.JobViewSet, basename='job')
 
-urlpatterns = router.urls
-
-urlpatterns += [
+# Explicit routes first: the router's jobs/<pk>/ pattern would otherwise capture jobs/search/
+urlpatterns = [
     path('jobs/search/', api_views.JobSearchAPIView.as_view(), name='api_job_search'),
+    path('jobs/suggest/', api_views.JobSuggestAPIView.as_view(), name='api_job_suggest'),
     path('jobs/<int:job_id>/apply/', api_views.ApplyJobAPIView.as_view(), name='api_apply_job'),
     path('jobs/<int:job_id>/save/', api_views.SaveJobAPIView.as_view(), name='api_save_job'),
 ]
 
+urlpatterns += router.urls
+
@@ -3,22 +3,32 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Q
 from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from core.pagination import InvalidCursor, KeysetPagination
+from .catalogue import get_catalogue_generation
 from .models import Job
+from .facets import get_facet_counts
+from .search import apply_filters, normalize_search_params, search_page
 from .serializers import JobSerializer
+from .suggest import suggest
 from applications.models import Application
 from accounts.models import SavedJob
 
 
 class JobViewSet(viewsets.ModelViewSet):
-    # Exclude expired jobs (deadline has passed)
-    now = timezone.now()
-    queryset = Job.objects.filter(is_active=True).filter(
-        Q(deadline__isnull=True) | Q(deadline__gt=now)
-    )
+    queryset = Job.objects.all()
     serializer_class = JobSerializer
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        # Exclude expired jobs (deadline has passed), evaluated per request
+        return Job.objects.open()
+    
+    def get_count_version(self):
+        # Cached totals are dropped whenever a job is created, edited or removed
+        return get_catalogue_generation()
     
     @action(detail=True, methods=['post'])
     def apply(self, request, pk=None):
@@ -52,36 +62,38 @@ class JobSearchAPIView(APIView):
     
     def get(self, request):
         # Exclude expired jobs (deadline has passed)
-        now = timezone.now()
-        jobs = Job.objects.filter(is_active=True).filter(
-            Q(deadline__isnull=True) | Q(deadline__gt=now)
-        )
+        jobs = Job.objects.open()
         
-        query = request.GET.get('q', '')
-        if query:
-            jobs = jobs.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(company__name__icontains=query)
-            )
+        # Same filters as the search page: location (+ radius_km), work_mode, job_type, experience_level, salary_min
+        params = normalize_search_params(request.GET)
+        jobs = apply_filters(jobs, params)
         
-        location = request.GET.get('location')
-        if location:
-            # More flexible location matching - split by comma and search for any part
-            location_parts = [part.strip() for part in location.split(',')]
-            location_query = Q()
-            for part in location_parts:
-                if part:
-                    location_query |= Q(location__icontains=part)
-            if location_query:
-                jobs = jobs.filter(location_query)
-        
-        work_mode = request.GET.get('work_mode')
-        if work_mode:
-            jobs = jobs.filter(work_mode=work_mode)
+        # Relevance-ranked when there is a query, newest first otherwise; ?cursor= and ?page_size= (max 50) paginate
+        paginator = KeysetPagination()
+        try:
+            page = search_page(params, jobs, request.GET.get('cursor'), paginator.get_page_size(request))
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+        results = paginator.use_page(page, request)
         
-        serializer = JobSerializer(jobs[:50], many=True)
-        return Response(serializer.data)
+        serializer = JobSerializer(results, many=True)
+        response = paginator.get_paginated_response(serializer.data)
+        response.data['facets'] = get_facet_counts(params)
+        return response
+
+
+class JobSuggestAPIView(APIView):
+    """Autocomplete for the search box: ?q=<partial text>&limit=<per group, max 10>"""
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        query = request.GET.get('q', '')
+        try:
+            limit = min(max(int(request.GET.get('limit', 5)), 1), 10)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        # Served from the in-memory prefix index; no database queries
+        return Response({'query': query, **suggest(query, limit)})
 
 
 class ApplyJobAPIView(APIView):
@@ -9,3 +9,16 @@ class JobsConfig(AppConfig):
         # Import signals to enable post-save hooks
         import jobs.signals  # noqa: F401
 
+        # Load the AI model once per process (or once in the gunicorn master with preload_app)
+        from .warmup import forks_workers, preload_model, should_preload, start_warm_up
+        if should_preload():
+            try:
+                preload_model()
+            except Exception as e:
+                import logging
+                logging.getLogger(__name__).error(f"AI model preload failed: {e}")
+            else:
+                # Forked gunicorn/celery workers warm up after forking instead
+                if not forks_workers():
+                    start_warm_up()
+
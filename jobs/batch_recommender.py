@@ -0,0 +1,166 @@
+"""
+Batch AI recommendation engine
+
+Recomputes resume-based recommendations for every job seeker: profiles are
+streamed in id order, resumes are parsed in a worker pool, encoded in one
+batch per chunk and scored against the shared catalogue index with a single
+matrix-matrix multiply. Parsed text and embeddings are reused from
+jobs.ResumeExtract when a resume file has not changed. Progress is checkpointed in the cache so an
+interrupted run can resume where it stopped.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY = 'jobs:recompute_recommendations:last_profile_id'
+
+
+def get_checkpoint():
+    """Id of the last profile processed by an interrupted run, or None"""
+    return cache.get(CHECKPOINT_KEY)
+
+
+def clear_checkpoint():
+    cache.delete(CHECKPOINT_KEY)
+
+
+def _profiles_with_resume():
+    from accounts.models import JobSeekerProfile
+
+    return JobSeekerProfile.objects.filter(
+        user__user_type='job_seeker'
+    ).exclude(resume='').exclude(resume__isnull=True)
+
+
+def _iter_profile_chunks(start_after, chunk_size):
+    """Yield lists of profiles in id order using keyset pagination"""
+    last_id = start_after or 0
+    while True:
+        chunk = list(
+            _profiles_with_resume()
+            .filter(id__gt=last_id)
+            .select_related('user')
+            .order_by('id')[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+
+def _get_resume_extract(profile):
+    from .resume_store import get_resume_extract
+
+    try:
+        return get_resume_extract(profile.resume)
+    except Exception as e:
+        logger.warning(f"Skipping resume of profile {profile.id}: {e}")
+        return None
+
+
+def _encode_extracts(model_name, extracts, batch_size):
+    """Embeddings for the extracts, encoding (and storing) only the ones not cached"""
+    from .ai_recommender import encode_documents
+    from .resume_store import get_cached_embedding, store_embedding
+
+    embeddings = [get_cached_embedding(extract, model_name) for extract in extracts]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        encoded = encode_documents([extracts[i].text for i in missing], batch_size=batch_size, kind='resumes')
+        for i, vector in zip(missing, encoded):
+            store_embedding(extracts[i], model_name, vector)
+            embeddings[i] = vector
+    return np.vstack(embeddings).astype(np.float32, copy=False)
+
+
+def _write_recommendations(results_by_user):
+    """Replace the recommendation sets of the given users in one transaction"""
+    from .ai_recommender import ai_recommendation_row
+    from .utils import replace_job_recommendations
+
+    return replace_job_recommendations({
+        user_id: [
+            ai_recommendation_row(job_id, score)
+            for job_id, score in zip(job_ids.tolist(), scores.tolist())
+        ]
+        for user_id, (job_ids, scores) in results_by_user.items()
+    })
+
+
+def recompute_recommendations(chunk_size=64, workers=4, top_k=20, resume=False,
+                              start_after=None, progress=None):
+    """
+    Recompute AI recommendations for all job seekers with a resume
+
+    Args:
+        chunk_size: Profiles parsed, encoded and scored per batch
+        workers: Threads used to extract resume text within a chunk
+        top_k: Recommendations stored per user
+        resume: Continue after the checkpoint left by an interrupted run
+        start_after: Explicit profile id to continue after (overrides resume)
+        progress: Optional callable(processed, total, last_profile_id)
+
+    Returns:
+        dict: Counters for the run
+    """
+    from applications.models import Application
+    from .ai_recommender import SIMILARITY_THRESHOLD, get_catalogue_index, get_embedding_key
+
+    if start_after is None and resume:
+        start_after = get_checkpoint()
+
+    index = get_catalogue_index(wait=True)
+    model_name = get_embedding_key()
+    remaining = _profiles_with_resume()
+    if start_after:
+        remaining = remaining.filter(id__gt=start_after)
+    total = remaining.count()
+
+    stats = {'total': total, 'processed': 0, 'skipped': 0, 'recommendations': 0}
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for chunk in _iter_profile_chunks(start_after, chunk_size):
+            extracts = list(pool.map(_get_resume_extract, chunk))
+            usable = [
+                (profile, extract) for profile, extract in zip(chunk, extracts)
+                if extract and len(extract.text.strip()) >= 50
+            ]
+            stats['skipped'] += len(chunk) - len(usable)
+
+            if usable and len(index):
+                user_ids = [profile.user_id for profile, _ in usable]
+                applied = {}
+                for user_id, job_id in Application.objects.filter(
+                    user_id__in=user_ids
+                ).values_list('user_id', 'job_id'):
+                    applied.setdefault(user_id, set()).add(job_id)
+
+                embeddings = _encode_extracts(
+                    model_name, [extract for _, extract in usable], chunk_size
+                )
+                matches = index.search_many(
+                    embeddings,
+                    k=top_k,
+                    min_score=SIMILARITY_THRESHOLD,
+                    exclude_ids=[applied.get(user_id) for user_id in user_ids],
+                    active_at=time.time(),
+                )
+                stats['recommendations'] += _write_recommendations(dict(zip(user_ids, matches)))
+
+            stats['processed'] += len(chunk)
+            cache.set(CHECKPOINT_KEY, chunk[-1].id, None)
+            if progress:
+                progress(stats['processed'], total, chunk[-1].id)
+
+    clear_checkpoint()
+    stats['seconds'] = round(time.monotonic() - started, 2)
+    logger.info(
+        f"Recomputed recommendations for {stats['processed']} profiles "
+        f"({stats['recommendations']} rows) in {stats['seconds']}s"
+    )
+    return stats
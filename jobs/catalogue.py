@@ -0,0 +1,112 @@
+"""
+Catalogue generation counter
+
+A single integer stored in the shared cache and bumped whenever the set of
+open jobs or their content may have changed (job create/update/delete,
+company rename, a deadline passing). In-process structures and cached search
+results built over the catalogue compare against it to decide when to refresh.
+
+Deadlines fire no signal, so the earliest upcoming deadline is kept in the
+cache as well and the generation is bumped the first time it is read after
+that moment.
+
+Structures that are expensive to refresh do it with refresh_in_background(),
+serving their previous state until the refresh finishes.
+"""
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_GENERATION_KEY = 'jobs:catalogue_generation'
+NEXT_EXPIRY_KEY = 'jobs:catalogue_next_expiry'
+# Stored when no open job has a deadline
+NO_EXPIRY = float('inf')
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def expire_catalogue(now=None):
+    """
+    Bump the generation if an open job's deadline has passed since the last check
+
+    Returns:
+        bool: True when the generation was bumped
+    """
+    from django.db.models import Min
+    from .models import Job
+
+    now = time.time() if now is None else now
+    next_expiry = cache.get(NEXT_EXPIRY_KEY)
+    if next_expiry is not None and now < next_expiry:
+        return False
+    upcoming = Job.objects.open().aggregate(deadline=Min('deadline'))['deadline']
+    cache.set(NEXT_EXPIRY_KEY, upcoming.timestamp() if upcoming else NO_EXPIRY, None)
+    if next_expiry is None:
+        # First check (or reset by a bump): nothing is known to have expired
+        return False
+    _increment()
+    return True
+
+
+def get_catalogue_generation():
+    """Current catalogue generation (starts at 1), bumped first if a deadline has passed"""
+    expire_catalogue()
+    generation = cache.get(CATALOGUE_GENERATION_KEY)
+    if generation is None:
+        cache.add(CATALOGUE_GENERATION_KEY, 1, None)
+        generation = cache.get(CATALOGUE_GENERATION_KEY, 1)
+    return generation
+
+
+def bump_catalogue_generation():
+    """Invalidate everything derived from the job catalogue"""
+    # A created or edited job may have moved the earliest deadline
+    cache.delete(NEXT_EXPIRY_KEY)
+    return _increment()
+
+
+def _increment():
+    try:
+        return cache.incr(CATALOGUE_GENERATION_KEY)
+    except ValueError:
+        cache.add(CATALOGUE_GENERATION_KEY, 1, None)
+        return cache.incr(CATALOGUE_GENERATION_KEY)
+
+
+def refresh_in_background(name, target, *args):
+    """
+    Run target(*args) in a daemon thread, unless a refresh called `name` is
+    already running in this process
+
+    Returns:
+        bool: True when a thread was started
+    """
+    with _refreshing_lock:
+        if name in _refreshing:
+            return False
+        _refreshing.add(name)
+
+    def run():
+        try:
+            target(*args)
+        except Exception as e:
+            logger.error(f"Background refresh of {name} failed: {e}", exc_info=True)
+        finally:
+            close_old_connections()
+            with _refreshing_lock:
+                _refreshing.discard(name)
+
+    try:
+        threading.Thread(target=run, name=f'refresh-{name}', daemon=True).start()
+    except Exception as e:
+        logger.error(f"Could not start background refresh of {name}: {e}")
+        with _refreshing_lock:
+            _refreshing.discard(name)
+        return False
+    return True
@@ -0,0 +1,66 @@
+"""
+Overlapping-window chunking and pooling for long documents
+
+Sentence transformers truncate input at their maximum sequence length
+(384 word pieces for all-mpnet-base-v2), so a multi-page resume would be
+embedded from its first page only. Documents are split into overlapping
+windows of words, all windows are encoded in one batch and the window
+vectors are pooled back into one vector per document.
+"""
+import re
+
+import numpy as np
+
+from .vector_index import normalize_rows
+
+POOLING_MODES = ('mean', 'max')
+
+_WORD = re.compile(r'\S+')
+
+
+def split_windows(text, window=200, overlap=50, max_chunks=16):
+    """
+    Split text into overlapping windows of `window` words
+
+    Documents needing more than `max_chunks` windows keep evenly spaced
+    windows across the whole document, so cost stays bounded while the end of
+    the document is still represented.
+
+    Returns:
+        tuple: (list of chunk strings, number of words in the document)
+    """
+    words = _WORD.findall(text or '')
+    if len(words) <= window:
+        return [' '.join(words)], len(words)
+
+    step = max(1, window - overlap)
+    starts = list(range(0, len(words) - overlap, step))
+    if starts[-1] + window < len(words):
+        starts.append(len(words) - window)
+    if max_chunks and len(starts) > max_chunks:
+        positions = np.linspace(0, len(starts) - 1, max_chunks).round().astype(int)
+        starts = [starts[i] for i in positions]
+    return [' '.join(words[start:start + window]) for start in starts], len(words)
+
+
+def pool_chunks(vectors, owners, n_documents, mode='mean'):
+    """
+    Pool chunk vectors into one L2-normalised vector per document
+
+    Args:
+        vectors: (chunks x dims) chunk embeddings, grouped by document in order
+        owners: Document index of each chunk (non-decreasing)
+        n_documents: Number of documents
+        mode: 'mean' or 'max'
+    """
+    if mode not in POOLING_MODES:
+        raise ValueError(f"Unknown pooling mode '{mode}' (expected one of {', '.join(POOLING_MODES)})")
+    vectors = normalize_rows(vectors)
+    owners = np.asarray(owners)
+    starts = np.searchsorted(owners, np.arange(n_documents))
+    if mode == 'max':
+        pooled = np.maximum.reduceat(vectors, starts, axis=0)
+    else:
+        counts = np.diff(np.append(starts, owners.shape[0]))
+        pooled = np.add.reduceat(vectors, starts, axis=0) / counts[:, None]
+    return normalize_rows(pooled)
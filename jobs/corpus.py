@@ -0,0 +1,40 @@
+"""
+Job text used for embeddings and full-text search
+"""
+import hashlib
+
+
+def prepare_job_corpus(job):
+    """
+    Combine job fields into a single text corpus for embedding
+    
+    Args:
+        job: Job model instance
+        
+    Returns:
+        str: Combined text from job fields
+    """
+    parts = []
+    
+    if job.title:
+        parts.append(str(job.title))
+    if hasattr(job, 'company') and job.company and job.company.name:
+        parts.append(str(job.company.name))
+    if job.location:
+        parts.append(str(job.location))
+    if job.description:
+        parts.append(str(job.description))
+    if job.skills_required:
+        if isinstance(job.skills_required, list):
+            parts.append(" ".join(str(s) for s in job.skills_required))
+        else:
+            parts.append(str(job.skills_required))
+    if job.requirements:
+        parts.append(str(job.requirements))
+    
+    return " . ".join(parts)
+
+
+def corpus_hash(text):
+    """SHA-256 hex digest of a job corpus, used to detect content changes"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
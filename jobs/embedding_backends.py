@@ -0,0 +1,213 @@
+"""
+Embedding model backends
+
+AI_RECOMMENDATION_MODEL may carry a backend suffix, '<model>@<backend>':
+
+    torch       PyTorch fp32 (default, no suffix)
+    torch-int8  PyTorch with dynamically int8-quantised Linear layers
+    onnx        ONNX Runtime (CPU) over an exported graph
+
+The suffixed name is used wherever embeddings are cached (JobEmbedding,
+ResumeExtract, the vector index files), so vectors from different backends
+are never mixed. The onnx artifact is produced offline by
+`python manage.py export_embedding_model` under AI_MODEL_ARTIFACT_DIR.
+torch-int8 has no artifact: the model is quantised when it is loaded, which
+takes a few seconds at startup (a saved quantised module could only be
+restored by unpickling code, so none is written).
+"""
+import json
+import logging
+import os
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'torch'
+BACKENDS = ('torch', 'torch-int8', 'onnx')
+# Backends that load an artifact written by export_model
+EXPORT_BACKENDS = ('onnx',)
+ONNX_CONFIG_FILE = 'embedding_config.json'
+
+
+def parse_model_spec(spec):
+    """Split '<model>@<backend>' into (model, backend)"""
+    name, _, backend = spec.partition('@')
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    return name, backend
+
+
+def model_spec(name, backend):
+    return name if backend == DEFAULT_BACKEND else f'{name}@{backend}'
+
+
+def get_artifact_dir(name, backend):
+    root = getattr(settings, 'AI_MODEL_ARTIFACT_DIR', None) or os.path.join(str(settings.BASE_DIR), 'ai_models')
+    return os.path.join(str(root), name.replace('/', '__'), backend)
+
+
+def _pooling_config(model):
+    """Pooling/normalisation of a SentenceTransformer pipeline, for re-implementing it over ONNX"""
+    pooling = model[1]
+    if getattr(pooling, 'pooling_mode_cls_token', False):
+        mode = 'cls'
+    elif getattr(pooling, 'pooling_mode_max_tokens', False):
+        mode = 'max'
+    else:
+        mode = 'mean'
+    return {
+        'pooling': mode,
+        'normalize': any(type(module).__name__ == 'Normalize' for module in model),
+        'max_seq_length': model.max_seq_length,
+    }
+
+
+def quantize_int8(model):
+    """Dynamically quantise the Linear layers of a SentenceTransformer to int8"""
+    import torch
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxEncoder:
+    """ONNX Runtime encoder exposing the subset of SentenceTransformer.encode used here"""
+
+    def __init__(self, artifact_dir, threads=None):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(artifact_dir, ONNX_CONFIG_FILE)) as handle:
+            self.config = json.load(handle)
+        self.tokenizer = AutoTokenizer.from_pretrained(artifact_dir)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(artifact_dir, 'model.onnx'), options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _pool(self, hidden, mask):
+        mask = mask[..., None].astype(np.float32)
+        if self.config['pooling'] == 'cls':
+            return hidden[:, 0]
+        if self.config['pooling'] == 'max':
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        # Sort by length so each batch pads to a similar size
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        output = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            tokens = self.tokenizer(
+                [texts[i] for i in rows], padding=True, truncation=True,
+                max_length=self.config['max_seq_length'], return_tensors='np',
+            )
+            feed = {name: value.astype(np.int64) for name, value in tokens.items() if name in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+            pooled = self._pool(hidden, tokens['attention_mask']).astype(np.float32)
+            if output.shape[1] == 0:
+                output = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            output[rows] = pooled
+        if self.config['normalize']:
+            output /= np.clip(np.linalg.norm(output, axis=1, keepdims=True), 1e-12, None)
+        return output[0] if single else output
+
+
+def load_model(spec):
+    """Load the encoder for a model spec; every backend exposes .encode like SentenceTransformer"""
+    name, backend = parse_model_spec(spec)
+    if backend == 'onnx':
+        artifact_dir = get_artifact_dir(name, backend)
+        if not os.path.exists(os.path.join(artifact_dir, 'model.onnx')):
+            raise FileNotFoundError(
+                f"No ONNX export at {artifact_dir}; run `python manage.py export_embedding_model --backend onnx`"
+            )
+        return OnnxEncoder(artifact_dir, threads=getattr(settings, 'AI_ONNX_THREADS', None))
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(name)
+    if backend == 'torch-int8':
+        model = quantize_int8(model)
+    return model
+
+
+def cached_model_path(name):
+    """
+    Local directory of a model already in the Hugging Face or sentence-transformers
+    cache, without any network access
+
+    Raises:
+        OSError: when the model is not cached locally
+    """
+    if os.path.isdir(name):
+        return name
+    repo_id = name if '/' in name else f'sentence-transformers/{name}'
+    try:
+        from huggingface_hub import snapshot_download
+        return snapshot_download(repo_id, local_files_only=True)
+    except Exception:
+        pass
+    # sentence-transformers 2.2.x keeps its own copy under SENTENCE_TRANSFORMERS_HOME
+    cache_folder = os.getenv('SENTENCE_TRANSFORMERS_HOME')
+    if cache_folder is None:
+        torch_home = os.getenv('TORCH_HOME', os.path.join(os.getenv('XDG_CACHE_HOME', '~/.cache'), 'torch'))
+        cache_folder = os.path.join(os.path.expanduser(torch_home), 'sentence_transformers')
+    path = os.path.join(cache_folder, repo_id.replace('/', '_'))
+    if os.path.exists(os.path.join(path, 'modules.json')):
+        return path
+    raise OSError(f"{name} is not in the local model cache")
+
+
+def export_model(name, backend, local_files_only=True):
+    """
+    Write the artifact for an EXPORT_BACKENDS backend from a model
+
+    Args:
+        local_files_only: Load the model from the local cache only (never download)
+
+    Returns:
+        str: Artifact directory
+    Raises:
+        OSError: local_files_only and the model is not cached
+    """
+    if backend not in EXPORT_BACKENDS:
+        raise ValueError(f"The {backend} backend loads the model directly and needs no export")
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # A local path never reaches the hub, however huggingface_hub was configured at import
+    model = SentenceTransformer(cached_model_path(name) if local_files_only else name, device='cpu')
+    model.eval()
+    artifact_dir = get_artifact_dir(name, backend)
+    os.makedirs(artifact_dir, exist_ok=True)
+
+    transformer = model[0].auto_model
+    tokenizer = model.tokenizer
+    sample = tokenizer(['export sample text'], return_tensors='pt')
+    input_names = [key for key in ('input_ids', 'attention_mask', 'token_type_ids') if key in sample]
+    dynamic_axes = {key: {0: 'batch', 1: 'sequence'} for key in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[key] for key in input_names),
+            os.path.join(artifact_dir, 'model.onnx'),
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    tokenizer.save_pretrained(artifact_dir)
+    with open(os.path.join(artifact_dir, ONNX_CONFIG_FILE), 'w') as handle:
+        json.dump(_pooling_config(model), handle, indent=2)
+    return artifact_dir
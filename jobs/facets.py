@@ -0,0 +1,305 @@
+"""
+Faceted search counts
+
+Loads the open job catalogue once into column arrays (integer codes for
+work_mode, job_type, experience_level and location, canonical place ids and
+coordinates, salary_max as floats)
+and answers all facet counts for a search with NumPy masks and bincounts,
+without a COUNT query per facet value. Counts are disjunctive: each facet is
+counted with every filter applied except its own, so the numbers show what
+selecting another value of that facet would return.
+
+Results are cached per normalised query (jobs.search.normalize_search_params)
+and catalogue generation. When the generation moves, the index is rebuilt in
+a background thread while requests keep counting against the previous one;
+counts from a superseded index are not cached.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .catalogue import get_catalogue_generation
+from .locations import get_gazetteer, haversine_km
+from .search import CHOICE_FILTERS, cached_rank_job_ids, search_cache_key
+
+# Salary facet thresholds (salary_max >= value)
+SALARY_FACET_STEPS = (30000, 50000, 75000, 100000, 150000)
+# Number of location values returned (most frequent first)
+LOCATION_FACET_LIMIT = 10
+# Search params that make up the location facet
+LOCATION_FILTERS = ('location', 'place', 'radius_km')
+# Rebuild the facet index at least this often (seconds), even without a generation bump
+FACET_INDEX_REBUILD_INTERVAL = 300
+
+logger = logging.getLogger(__name__)
+
+_facet_index = None  # (generation, built_at, FacetIndex)
+_facet_index_lock = threading.Lock()
+_rebuilding = False
+
+
+def _encode(values):
+    """(labels, codes): distinct values in first-seen order and each row's index into them"""
+    labels, codes, position = [], np.zeros(len(values), dtype=np.int64), {}
+    for row, value in enumerate(values):
+        if value not in position:
+            position[value] = len(labels)
+            labels.append(value)
+        codes[row] = position[value]
+    return labels, codes
+
+
+class FacetIndex:
+    """Column-oriented snapshot of the open jobs' facet fields"""
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: iterable of (id, work_mode, job_type, experience_level, location, salary_max, deadline,
+                location_place, location_region, location_country, latitude, longitude)
+        """
+        from .models import Job
+
+        rows = list(rows)
+        self.choice_labels = {name: dict(Job._meta.get_field(name).choices) for name in CHOICE_FILTERS}
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.row_of = {int(job_id): row for row, job_id in enumerate(self.ids)}
+        self.columns = {
+            name: _encode([row[i] for row in rows])
+            for i, name in enumerate(CHOICE_FILTERS, start=1)
+        }
+        # Locations are grouped by their most specific canonical id; unknown ones case-insensitively,
+        # labelled with the first spelling seen
+        gazetteer = get_gazetteer()
+        spellings, keys = {}, []
+        for row in rows:
+            place, region, country = row[7:10]
+            if country:
+                ids = (('country', country), ('region', region), ('place', place))
+                key = ('place', tuple((name, value) for name, value in ids if value))
+                if key not in spellings:
+                    spellings[key] = gazetteer.label(country, region, place) or (row[4] or '').strip()
+            else:
+                key = ('location', (row[4] or '').strip().lower())
+                spellings.setdefault(key, (row[4] or '').strip())
+            keys.append(key)
+        self.location_labels = spellings
+        self.columns['location'] = _encode(keys)
+        self.locations = np.array([(row[4] or '').strip().lower() for row in rows], dtype=str) if rows else np.empty(0, dtype=str)
+        self.places, self.regions, self.countries = (
+            np.array([row[column] for row in rows], dtype=str) if rows else np.empty(0, dtype=str)
+            for column in (7, 8, 9)
+        )
+        self.latitudes = np.array([np.nan if row[10] is None else row[10] for row in rows], dtype=np.float64)
+        self.longitudes = np.array([np.nan if row[11] is None else row[11] for row in rows], dtype=np.float64)
+        self.salary_max = np.array(
+            [float(row[5]) if row[5] is not None else np.nan for row in rows], dtype=np.float64
+        )
+        self.deadlines = np.array(
+            [row[6].timestamp() if row[6] is not None else np.inf for row in rows], dtype=np.float64
+        )
+
+    def __len__(self):
+        return self.ids.shape[0]
+
+    def open_mask(self, at=None):
+        """Rows whose deadline has not passed at `at` (epoch seconds, default now)"""
+        return self.deadlines > (time.time() if at is None else at)
+
+    def ids_mask(self, job_ids):
+        """Rows of the given job ids (ids outside the catalogue are ignored)"""
+        mask = np.zeros(len(self), dtype=bool)
+        rows = [self.row_of[job_id] for job_id in job_ids if job_id in self.row_of]
+        mask[rows] = True
+        return mask
+
+    def location_mask(self, parts):
+        """Rows whose location contains any of `parts` (as the location filter does)"""
+        mask = np.zeros(len(self), dtype=bool)
+        for part in parts:
+            mask |= np.char.find(self.locations, part) >= 0
+        return mask
+
+    def place_mask(self, place):
+        """Rows in a canonical place ({'country', 'region', 'place'}, as the place filter does)"""
+        mask = self.countries == place['country']
+        if 'place' in place or 'region' in place:
+            mask &= self.regions == place.get('region', '')
+        if 'place' in place:
+            mask &= self.places == place['place']
+        return mask
+
+    def radius_mask(self, latitude, longitude, radius_km):
+        """Rows within `radius_km` of a point"""
+        with np.errstate(invalid='ignore'):
+            return haversine_km(latitude, longitude, self.latitudes, self.longitudes) <= radius_km
+
+    def location_filters_mask(self, filters):
+        """Rows matching the location, place and radius_km filters together"""
+        mask = np.ones(len(self), dtype=bool)
+        if filters.get('radius_km'):
+            city = get_gazetteer().cities[filters['place']['place']]
+            mask &= self.radius_mask(city['lat'], city['lon'], filters['radius_km'])
+        elif filters.get('place'):
+            mask &= self.place_mask(filters['place'])
+        if filters.get('location'):
+            mask &= self.location_mask(filters['location'])
+        return mask
+
+    def filter_mask(self, name, value):
+        if name == 'location':
+            return self.location_mask(value)
+        if name == 'place':
+            return self.place_mask(value)
+        if name == 'salary_min':
+            with np.errstate(invalid='ignore'):
+                return self.salary_max >= float(value)
+        labels, codes = self.columns[name]
+        if value not in labels:
+            return np.zeros(len(self), dtype=bool)
+        return codes == labels.index(value)
+
+    def counts(self, base_mask, filters):
+        """
+        Facet counts for the rows in `base_mask` under `filters`
+
+        Args:
+            base_mask: Boolean mask of rows matching the text query (and still open)
+            filters: Normalised filters (normalize_search_params without 'q')
+
+        Returns:
+            dict: {'total': n, facet: [{'value', 'label', 'count'}, ...]} for every facet
+        """
+        masks = {name: self.filter_mask(name, value) for name, value in filters.items() if name not in LOCATION_FILTERS}
+        if any(name in filters for name in LOCATION_FILTERS):
+            masks['location'] = self.location_filters_mask(filters)
+        selected = base_mask.copy()
+        for mask in masks.values():
+            selected &= mask
+        result = {'total': int(np.count_nonzero(selected))}
+
+        for name in CHOICE_FILTERS + ('location', 'salary_min'):
+            mask = base_mask.copy()
+            for other, other_mask in masks.items():
+                if other != name:
+                    mask &= other_mask
+            if name in CHOICE_FILTERS:
+                labels, codes = self.columns[name]
+                counts = np.bincount(codes[mask], minlength=len(labels))
+                result[name] = [
+                    {'value': value, 'label': self.choice_labels[name].get(value, value), 'count': int(count)}
+                    for value, count in zip(labels, counts) if count
+                ]
+            elif name == 'location':
+                labels, codes = self.columns['location']
+                counts = np.bincount(codes[mask], minlength=len(labels))
+                top = [i for i in np.argsort(-counts, kind='stable')[:LOCATION_FACET_LIMIT] if counts[i] and labels[i][1]]
+                # Count what the location filter would return for each value: every job in a
+                # region or country, or a substring match on an unknown location's parts
+                result[name] = []
+                for i in top:
+                    kind, value = labels[i]
+                    if kind == 'place':
+                        value_mask = self.place_mask(dict(value))
+                    else:
+                        value_mask = self.location_mask([part.strip() for part in value.split(',') if part.strip()])
+                    result[name].append({
+                        'value': self.location_labels[labels[i]],
+                        'label': self.location_labels[labels[i]],
+                        'count': int(np.count_nonzero(mask & value_mask)),
+                    })
+            else:
+                with np.errstate(invalid='ignore'):
+                    salaries = self.salary_max[mask]
+                    result[name] = [
+                        {'value': step, 'label': f'{step:,}+', 'count': int(np.count_nonzero(salaries >= step))}
+                        for step in SALARY_FACET_STEPS
+                    ]
+        return result
+
+
+def build_facet_index():
+    """Load the open job catalogue's facet fields from the database"""
+    from .models import Job
+
+    return FacetIndex(Job.objects.open().order_by().values_list(
+        'id', 'work_mode', 'job_type', 'experience_level', 'location', 'salary_max', 'deadline',
+        'location_place', 'location_region', 'location_country', 'latitude', 'longitude',
+    ))
+
+
+def _rebuild_facet_index(generation):
+    global _facet_index, _rebuilding
+    try:
+        _facet_index = (generation, time.time(), build_facet_index())
+    except Exception as e:
+        logger.error(f"Facet index rebuild failed: {e}", exc_info=True)
+    finally:
+        close_old_connections()
+        with _facet_index_lock:
+            _rebuilding = False
+
+
+def get_facet_index():
+    """
+    Shared FacetIndex and whether it is current
+
+    Only the first build runs inline; after a generation change (or
+    FACET_INDEX_REBUILD_INTERVAL) one background rebuild per process is
+    started and the previous index is returned until it finishes.
+
+    Returns:
+        tuple: (FacetIndex, True when built for the current catalogue generation)
+    """
+    global _facet_index, _rebuilding
+    generation = get_catalogue_generation()
+    current = _facet_index
+    if current is None:
+        with _facet_index_lock:
+            if _facet_index is None:
+                _facet_index = (generation, time.time(), build_facet_index())
+            current = _facet_index
+    elif current[0] != generation or time.time() - current[1] > FACET_INDEX_REBUILD_INTERVAL:
+        with _facet_index_lock:
+            start = not _rebuilding
+            _rebuilding = True
+        if start:
+            try:
+                threading.Thread(
+                    target=_rebuild_facet_index, args=(generation,), name='facet-index-rebuild', daemon=True,
+                ).start()
+            except Exception as e:
+                logger.error(f"Could not start facet index rebuild: {e}")
+                with _facet_index_lock:
+                    _rebuilding = False
+    return current[2], current[0] == generation
+
+
+def get_facet_counts(canonical):
+    """
+    Facet counts for a search, cached per normalised query and catalogue generation
+
+    Args:
+        canonical: Output of jobs.search.normalize_search_params
+    """
+    key = search_cache_key('facets', canonical)
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+
+    index, current = get_facet_index()
+    base_mask = index.open_mask()
+    if canonical.get('q'):
+        from .models import Job
+        # Unfiltered ranking of the query, shared with the result cache
+        base_mask &= index.ids_mask(cached_rank_job_ids({'q': canonical['q']}, Job.objects.open()))
+    filters = {name: value for name, value in canonical.items() if name != 'q'}
+    counts = index.counts(base_mask, filters)
+    if current:
+        cache.set(key, counts, getattr(settings, 'SEARCH_FACET_CACHE_TIMEOUT', 300))
+    return counts
@@ -0,0 +1,154 @@
+"""
+Database full-text job search
+
+Uses the indexes created by migration 0008_job_fulltext:
+
+- MySQL: FULLTEXT indexes on jobs_job (title, description, requirements) and
+  companies_company (name), queried with MATCH ... AGAINST in boolean mode.
+- SQLite: an FTS5 table (jobs_job_fts) maintained by triggers, ranked with bm25().
+
+Other databases (or SQLite builds without FTS5) fall back to `icontains`.
+Skills live in a JSON column, which cannot be full-text indexed on MySQL;
+they are matched through the canonical skill matrix instead.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_fts5_available = None
+
+
+def query_words(query, limit=12):
+    """Plain words of a query (operators and punctuation stripped)"""
+    return _WORD.findall(query.lower())[:limit]
+
+
+def sqlite_fts_query(words):
+    """FTS5 query: any word, the last one as a prefix (search-as-you-type)"""
+    terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+    return ' OR '.join(terms)
+
+
+def mysql_boolean_query(words):
+    """Boolean-mode query: any word, the last one as a prefix"""
+    return ' '.join(words[:-1] + [words[-1] + '*'])
+
+
+def has_fts5_table():
+    global _fts5_available
+    if _fts5_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'jobs_job_fts'")
+            _fts5_available = cursor.fetchone() is not None
+    return _fts5_available
+
+
+def fulltext_available():
+    """Whether the configured database has a full-text index for jobs"""
+    if connection.vendor == 'mysql':
+        return True
+    return connection.vendor == 'sqlite' and has_fts5_table()
+
+
+# Jobs matched only through canonical skills (aliases the text index misses), newest first
+SKILL_MATCH_LIMIT = 1000
+# Ids per IN (...) batch, below SQLite's default variable limit
+ID_BATCH_SIZE = 500
+
+
+def _skill_matches(queryset, query):
+    """
+    (id, created_at) of jobs in `queryset` with a skill matching `query`
+
+    The ids come from the in-process skill matrix and are checked against the
+    queryset newest first, in bounded batches, until SKILL_MATCH_LIMIT are found.
+    """
+    from .skills import get_job_skill_matrix, get_skill_ids
+
+    job_ids = sorted(get_job_skill_matrix().ids_with_any(get_skill_ids([query], create=False)), reverse=True)
+    matches = []
+    for start in range(0, len(job_ids), ID_BATCH_SIZE):
+        matches.extend(queryset.filter(id__in=job_ids[start:start + ID_BATCH_SIZE]).values_list('id', 'created_at'))
+        if len(matches) >= SKILL_MATCH_LIMIT:
+            break
+    return matches[:SKILL_MATCH_LIMIT]
+
+
+def _text_matches(queryset, words):
+    """(id, created_at, score) of full-text matches in `queryset`; higher scores are more relevant"""
+    if connection.vendor == 'mysql':
+        boolean_query = mysql_boolean_query(words)
+        match = "MATCH (jobs_job.title, jobs_job.description, jobs_job.requirements) AGAINST (%s IN BOOLEAN MODE)"
+        # A bare MATCH in WHERE is answered from the FULLTEXT index
+        matches = [
+            (job_id, created_at, float(score))
+            for job_id, created_at, score in queryset.extra(
+                select={'search_relevance': match}, select_params=(boolean_query,),
+                where=[match], params=(boolean_query,),
+            ).values_list('id', 'created_at', 'search_relevance')
+        ]
+        # Company names: FULLTEXT lookup on companies_company, then jobs by company_id
+        company_ids = RawSQL(
+            "SELECT id FROM companies_company WHERE MATCH (name) AGAINST (%s IN BOOLEAN MODE)", (boolean_query,)
+        )
+        matches.extend(
+            (job_id, created_at, 2.0)
+            for job_id, created_at in queryset.filter(company_id__in=company_ids).values_list('id', 'created_at')
+        )
+        return matches
+
+    # Driven from the FTS table: CROSS JOIN keeps jobs_job_fts as the outer loop (SQLite never
+    # reorders it), so the MATCH runs once and the queryset's rows are joined by primary key.
+    # bm25() is lower-is-better; column weights favour the title, then company and skills
+    inner, params = queryset.values('id', 'created_at').query.sql_with_params()
+    sql = (
+        "SELECT jobs.id, jobs.created_at, bm25(jobs_job_fts, 5.0, 2.0, 1.0, 1.0, 2.0) FROM jobs_job_fts"
+        f" CROSS JOIN ({inner}) jobs ON jobs.id = jobs_job_fts.rowid WHERE jobs_job_fts MATCH %s"
+    )
+    created_at = queryset.model._meta.get_field('created_at')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (*params, sqlite_fts_query(words)))
+        return [
+            (job_id, connection.ops.convert_datetimefield_value(value, created_at, connection), -rank)
+            for job_id, value, rank in cursor.fetchall()
+        ]
+
+
+def search_job_ids(queryset, query):
+    """
+    Ids of jobs in `queryset` matching `query` in the full-text index, most relevant first
+
+    Text (and, on MySQL, company name) matches are ranked by the index's
+    relevance; jobs matched only through a canonical skill follow. Ties keep
+    the newest job first. Without a full-text index, `icontains` matches are
+    returned newest first.
+
+    Returns:
+        list: Job ids
+    """
+    words = query_words(query)
+    if not words:
+        return []
+    queryset = queryset.order_by()
+
+    if fulltext_available():
+        matches = _text_matches(queryset, words)
+    else:
+        matches = [
+            (job_id, created_at, 0.0)
+            for job_id, created_at in queryset.filter(
+                Q(title__icontains=query) |
+                Q(description__icontains=query) |
+                Q(company__name__icontains=query)
+            ).values_list('id', 'created_at')
+        ]
+    matches.extend((job_id, created_at, 0.0) for job_id, created_at in _skill_matches(queryset, query))
+
+    scores, created = {}, {}
+    for job_id, created_at, score in matches:
+        scores[job_id] = scores.get(job_id, 0.0) + score
+        created[job_id] = created_at
+    return sorted(scores, key=lambda job_id: (scores[job_id], created[job_id]), reverse=True)
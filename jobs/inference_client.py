@@ -0,0 +1,135 @@
+"""
+Client for the embedding inference server (jobs.inference_server)
+
+Enabled by AI_INFERENCE_URL, e.g. 'http://127.0.0.1:8765' or
+'unix:///run/job_portal/inference.sock'. When the server cannot be reached
+callers fall back to encoding in-process; the server is then skipped for
+AI_INFERENCE_RETRY_AFTER seconds so requests do not each wait for a timeout.
+
+Texts are sent in requests of at most AI_INFERENCE_MAX_BATCH, each with its own
+AI_INFERENCE_TIMEOUT, so a bulk encode (index sync, batch recommendations) is
+never one long request. A bulk encode that times out falls back for that call
+only: a busy server is not marked down for every other worker.
+"""
+import http.client
+import json
+import logging
+import socket
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_unavailable_until = 0.0
+
+
+class InferenceError(Exception):
+    """The inference server could not produce embeddings"""
+
+
+class InferenceTimeout(InferenceError):
+    """The inference server accepted the request but did not answer in time"""
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def get_inference_url():
+    return getattr(settings, 'AI_INFERENCE_URL', '') or ''
+
+
+def _connection(url, timeout):
+    parts = urlsplit(url)
+    if parts.scheme == 'unix':
+        return UnixHTTPConnection(parts.path, timeout)
+    return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+
+def get_max_batch():
+    """Most texts sent to the inference server in one request"""
+    return max(1, getattr(settings, 'AI_INFERENCE_MAX_BATCH', 64))
+
+
+def _post_encode(url, texts, model_name, timeout):
+    body = json.dumps({'model': model_name, 'texts': texts}).encode('utf-8')
+    connection = _connection(url, timeout)
+    try:
+        connection.request('POST', '/encode', body=body, headers={
+            'Content-Type': 'application/json',
+            'Content-Length': str(len(body)),
+        })
+        response = connection.getresponse()
+        payload = response.read()
+    except socket.timeout as e:
+        raise InferenceTimeout(f'inference server timed out after {timeout}s') from e
+    except (OSError, http.client.HTTPException) as e:
+        raise InferenceError(f'inference server unreachable: {e}') from e
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        try:
+            error = json.loads(payload).get('error', '')
+        except ValueError:
+            error = payload[:200]
+        raise InferenceError(f'inference server returned {response.status}: {error}')
+    rows, dims = (int(value) for value in response.getheader('X-Embedding-Shape', '0,0').split(','))
+    return np.frombuffer(payload, dtype='<f4').reshape(rows, dims)
+
+
+def encode_remote(texts, model_name, url=None, timeout=None, max_batch=None):
+    """
+    Encode texts on the inference server, at most `max_batch` texts per request
+
+    Args:
+        timeout: Seconds allowed per request (AI_INFERENCE_TIMEOUT)
+        max_batch: Texts per request (AI_INFERENCE_MAX_BATCH)
+
+    Returns:
+        np.ndarray: float32 matrix (len(texts) x dims)
+
+    Raises:
+        InferenceTimeout: when a request is not answered within `timeout`
+        InferenceError: when the server is unreachable or rejects the request
+    """
+    url = url or get_inference_url()
+    timeout = timeout or getattr(settings, 'AI_INFERENCE_TIMEOUT', 30)
+    max_batch = max_batch or get_max_batch()
+    texts = list(texts)
+    parts = [
+        _post_encode(url, texts[start:start + max_batch], model_name, timeout)
+        for start in range(0, len(texts), max_batch)
+    ]
+    if not parts:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.vstack(parts) if len(parts) > 1 else parts[0]
+
+
+def try_encode_remote(texts, model_name):
+    """Encode on the inference server if configured and available, else return None"""
+    global _unavailable_until
+    if not get_inference_url() or time.monotonic() < _unavailable_until:
+        return None
+    texts = list(texts)
+    try:
+        return encode_remote(texts, model_name)
+    except InferenceError as e:
+        if isinstance(e, InferenceTimeout) and len(texts) > get_max_batch():
+            # A slow bulk encode says the server is busy, not down
+            logger.warning(f"{e} during a bulk encode of {len(texts)} texts; encoding them in-process")
+            return None
+        retry_after = getattr(settings, 'AI_INFERENCE_RETRY_AFTER', 30)
+        _unavailable_until = time.monotonic() + retry_after
+        logger.warning(f"{e}; encoding in-process for the next {retry_after}s")
+        return None
@@ -0,0 +1,190 @@
+"""
+Embedding inference server with request micro-batching
+
+One process holds the sentence transformer; Django workers send texts to it
+over localhost HTTP or a Unix socket (jobs.inference_client). Concurrent
+requests arriving within a short window are encoded as one batch.
+
+Protocol:
+    POST /encode  {"model": "<name>", "texts": ["...", ...]}
+        200: raw little-endian float32 matrix, shape in X-Embedding-Shape ("rows,dims")
+        4xx/5xx: {"error": "..."}
+    GET /health   {"status": "ok", "model": "<name>", ...}
+"""
+import json
+import logging
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted (bytes)
+MAX_REQUEST_BYTES = 20 * 1024 * 1024
+
+
+class MicroBatcher:
+    """
+    Collects encode requests from many threads and runs them as batched encodes
+
+    The first pending request opens a window of `max_wait` seconds; everything
+    queued within it is encoded in one call of at most `max_batch` texts. Larger
+    submissions are split, and a request that would overflow the batch waits
+    for the next one.
+    """
+
+    def __init__(self, encode, max_batch=64, max_wait=0.01):
+        self.encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = {'requests': 0, 'batches': 0, 'texts': 0}
+        self._queue = queue.Queue()
+        self._carry = None  # dequeued item that did not fit the previous batch
+        self._thread = threading.Thread(target=self._run, name='encode-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """Queue texts for encoding; returns Futures resolving to float32 matrices, one per max_batch slice"""
+        texts = list(texts)
+        futures = []
+        for start in range(0, len(texts), self.max_batch):
+            future = Future()
+            self._queue.put((texts[start:start + self.max_batch], future))
+            futures.append(future)
+        return futures
+
+    def _collect(self):
+        if self._carry is not None:
+            batch, self._carry = [self._carry], None
+        else:
+            batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(item[0]) > self.max_batch:
+                self._carry = item
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = np.asarray(self.encode(texts), dtype=np.float32)
+            except Exception as e:
+                logger.error(f"Batch encode of {len(texts)} texts failed: {e}", exc_info=True)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['texts'] += len(texts)
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+
+class EncodeHandler(BaseHTTPRequestHandler):
+    """HTTP handler; the server provides `batcher`, `model_name` and `request_timeout`"""
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._send_json(404, {'error': 'not found'})
+        self._send_json(200, dict(status='ok', model=self.server.model_name, **self.server.batcher.stats))
+
+    def do_POST(self):
+        if self.path != '/encode':
+            return self._send_json(404, {'error': 'not found'})
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            return self._send_json(413 if length else 400, {'error': 'invalid request size'})
+        try:
+            payload = json.loads(self.rfile.read(length))
+            texts = payload['texts']
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError('texts must be a list of strings')
+        except (ValueError, KeyError) as e:
+            return self._send_json(400, {'error': f'bad request: {e}'})
+        model = payload.get('model')
+        if model and model != self.server.model_name:
+            return self._send_json(409, {'error': f'server model is {self.server.model_name}'})
+        if not texts:
+            vectors = np.empty((0, 0), dtype=np.float32)
+        else:
+            try:
+                deadline = time.monotonic() + self.server.request_timeout
+                vectors = np.vstack([
+                    future.result(timeout=max(0, deadline - time.monotonic()))
+                    for future in self.server.batcher.submit(texts)
+                ])
+            except Exception as e:
+                return self._send_json(503, {'error': f'encode failed: {e}'})
+
+        body = np.ascontiguousarray(vectors, dtype='<f4').tobytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Embedding-Shape', f'{vectors.shape[0]},{vectors.shape[1]}')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(batcher, model_name, bind=None, socket_path=None, request_timeout=60):
+    """
+    Build (not start) an inference server
+
+    Args:
+        batcher: MicroBatcher wrapping the model
+        model_name: Name reported to clients; requests for another model get 409
+        bind: (host, port) for HTTP
+        socket_path: Unix socket path (used instead of `bind` when given)
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, EncodeHandler)
+        os.chmod(socket_path, 0o660)
+    else:
+        server = ThreadingHTTPServer(bind, EncodeHandler)
+        server.daemon_threads = True
+    server.batcher = batcher
+    server.model_name = model_name
+    server.request_timeout = request_timeout
+    return server
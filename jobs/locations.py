@@ -0,0 +1,350 @@
+"""
+Location normalisation and geo lookups
+
+Free-text locations ("NYC", "New York, NY", "Bangalore, India") are resolved
+against a bundled offline gazetteer (jobs/fixtures/gazetteer.json: major
+cities with coordinates, regions and countries, with common aliases) to
+canonical ids:
+
+- place: city id such as 'us-ny-new-york' (empty when only a region or
+  country was recognised)
+- region: 'us-ny', 'gb-eng', ... (empty when unknown or not used)
+- country: ISO 3166 alpha-2 code, lower case
+
+Jobs and profiles store these ids, plus coordinates and (for jobs) a geohash,
+when they are saved. Radius searches ("within 50 km of Boston") select the
+geohash cells covering the circle with indexed prefix ranges and confirm the
+candidates with the haversine distance. Locations the gazetteer does not
+know (including "Remote") resolve to nothing, and callers fall back to
+substring matching on the raw text.
+"""
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import namedtuple
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'gazetteer.json')
+
+# Geohash precision stored on jobs (~5 m cells)
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+
+Place = namedtuple('Place', 'place region country latitude longitude label')
+# Empty resolution, used for unknown locations
+UNRESOLVED = Place('', '', '', None, None, '')
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_SEPARATORS = re.compile(r'\s*(?:[,;/|]|\s-\s|\(|\))\s*')
+_WHITESPACE = re.compile(r'\s+')
+
+_gazetteer = None
+
+
+def normalize_location_name(text):
+    """Lower-cased, accent-preserving, whitespace-collapsed name ("  New  York " -> 'new york')"""
+    text = unicodedata.normalize('NFC', str(text or '')).lower().replace('.', ' ').strip()
+    return _WHITESPACE.sub(' ', text)
+
+
+class Gazetteer:
+    """Alias lookups over the bundled cities, regions and countries"""
+
+    def __init__(self, data):
+        self.countries = {row['id']: row for row in data['countries']}
+        self.regions = {row['id']: row for row in data['regions']}
+        self.cities = {row['id']: row for row in data['cities']}
+        self.city_aliases = self._aliases(data['cities'])
+        self.region_aliases = self._aliases(data['regions'])
+        self.country_aliases = self._aliases(data['countries'])
+        # ISO codes ("DE", "IN") are country aliases too; several are also US state codes
+        for country_id in self.countries:
+            self.country_aliases.setdefault(country_id, [country_id])
+
+    @staticmethod
+    def _aliases(rows):
+        """Normalised name/alias -> ids in file order (earlier entries win ties)"""
+        aliases = {}
+        for row in rows:
+            for name in [row['name']] + row.get('aliases', []):
+                ids = aliases.setdefault(normalize_location_name(name), [])
+                if row['id'] not in ids:
+                    ids.append(row['id'])
+        return aliases
+
+    def city(self, city_id):
+        row = self.cities[city_id]
+        region = self.regions.get(row['region'])
+        label = f"{row['name']}, {region['name'] if region else self.countries[row['country']]['name']}"
+        return Place(city_id, row['region'], row['country'], row['lat'], row['lon'], label)
+
+    def region(self, region_id):
+        row = self.regions[region_id]
+        # 'label' disambiguates regions named like a city ("New York State")
+        label = f"{row.get('label', row['name'])}, {self.countries[row['country']]['name']}"
+        return Place('', region_id, row['country'], None, None, label)
+
+    def country(self, country_id):
+        return Place('', '', country_id, None, None, self.countries[country_id]['name'])
+
+    def label(self, country, region='', place=''):
+        """Display name of stored canonical ids ('' when the gazetteer no longer has them)"""
+        try:
+            if place:
+                return self.city(place).label
+            if region:
+                return self.region(region).label
+            return self.country(country).label
+        except KeyError:
+            return ''
+
+    def resolve(self, text):
+        """
+        Canonical place for a free-text location
+
+        The most specific part wins: a city, then a region, then a country. A
+        city name is checked against the region or country given alongside it
+        ("Cambridge, UK" vs "Cambridge, MA"); a two-letter code may name either
+        ("Berlin, DE" is Germany, "Dover, DE" Delaware). When no candidate city
+        is in the given region or country ("Paris, TX"), the region or country
+        is used instead.
+
+        Returns:
+            Place: UNRESOLVED when nothing is recognised
+        """
+        name = normalize_location_name(text)
+        if not name:
+            return UNRESOLVED
+        parts = [part for part in _SEPARATORS.split(name) if part]
+        if name in self.city_aliases or not parts:
+            parts = [name]
+        part_regions = [self.region_aliases.get(part, []) for part in parts]
+        part_countries = [self.country_aliases.get(part, []) for part in parts]
+
+        for i, part in enumerate(parts):
+            candidates = self.city_aliases.get(part)
+            if not candidates:
+                continue
+            regions = {region_id for j, ids in enumerate(part_regions) if j != i for region_id in ids}
+            countries = {country_id for j, ids in enumerate(part_countries) if j != i for country_id in ids}
+            if not regions and not countries:
+                return self.city(candidates[0])
+            # A city in the named region first, then one in the named country
+            for city_id in candidates:
+                if self.cities[city_id]['region'] in regions:
+                    return self.city(city_id)
+            for city_id in candidates:
+                if self.cities[city_id]['country'] in countries:
+                    return self.city(city_id)
+
+        for regions in part_regions:
+            for region_id in regions:
+                return self.region(region_id)
+        for countries in part_countries:
+            for country_id in countries:
+                return self.country(country_id)
+        return UNRESOLVED
+
+
+def get_gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        with open(GAZETTEER_PATH, encoding='utf-8') as f:
+            _gazetteer = Gazetteer(json.load(f))
+    return _gazetteer
+
+
+def resolve_location(text):
+    """Place for a free-text location (UNRESOLVED when the gazetteer does not know it)"""
+    return get_gazetteer().resolve(text)
+
+
+def location_fields(text):
+    """
+    Denormalised location columns for a Job or JobSeekerProfile
+
+    Returns:
+        dict: location_place, location_region, location_country, latitude, longitude, geohash
+    """
+    place = resolve_location(text)
+    return {
+        'location_place': place.place,
+        'location_region': place.region,
+        'location_country': place.country,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'geohash': encode_geohash(place.latitude, place.longitude) if place.latitude is not None else '',
+    }
+
+
+def sync_location_fields(model, batch_size=1000):
+    """
+    Recompute the canonical location columns of every row of a model (Job or
+    JobSeekerProfile, also historical models in migrations)
+
+    Returns:
+        int: Rows whose columns changed
+    """
+    names = [name for name in location_fields('') if any(f.name == name for f in model._meta.get_fields())]
+    changed, updated = [], 0
+    for obj in model.objects.only('id', 'location', *names).iterator(chunk_size=batch_size):
+        fields = location_fields(obj.location)
+        if any(getattr(obj, name) != fields[name] for name in names):
+            for name in names:
+                setattr(obj, name, fields[name])
+            changed.append(obj)
+        if len(changed) >= batch_size:
+            model.objects.bulk_update(changed, names)
+            updated, changed = updated + len(changed), []
+    if changed:
+        model.objects.bulk_update(changed, names)
+    return updated + len(changed)
+
+
+def locations_match(user, job):
+    """
+    Whether a seeker's location matches a job's
+
+    Both resolved: same city, or within LOCATION_MATCH_RADIUS_KM; a region- or
+    country-level location matches anything inside it. Otherwise the raw texts
+    are compared as substrings of each other.
+
+    Args:
+        user, job: Objects with location, location_place, location_region,
+            location_country, latitude and longitude (JobSeekerProfile, Job)
+    """
+    if not user.location or not job.location:
+        return False
+    if user.location_country and job.location_country:
+        if not user.location_place or not job.location_place:
+            if not user.location_region or not job.location_region:
+                return user.location_country == job.location_country
+            return user.location_region == job.location_region
+        if user.location_place == job.location_place:
+            return True
+        return haversine_km(user.latitude, user.longitude, job.latitude, job.longitude) <= match_radius_km()
+    user_location, job_location = user.location.lower(), job.location.lower()
+    return user_location in job_location or job_location in user_location
+
+
+def match_radius_km():
+    from django.conf import settings
+    return getattr(settings, 'LOCATION_MATCH_RADIUS_KM', 50)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres (also works elementwise on NumPy arrays)"""
+    import numpy as np
+
+    lat1, lon1, lat2, lon2 = (np.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def distance_expression(latitude, longitude):
+    """ORM expression for the haversine distance (km) from a point to each row's latitude/longitude"""
+    from django.db.models import F, FloatField, Value
+    from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+    lat1, lon1 = Value(math.radians(latitude), FloatField()), Value(math.radians(longitude), FloatField())
+    lat2, lon2 = Radians(F('latitude')), Radians(F('longitude'))
+    a = (Power(Sin((lat2 - lat1) / 2), 2)
+         + Value(math.cos(math.radians(latitude)), FloatField()) * Cos(lat2) * Power(Sin((lon2 - lon1) / 2), 2))
+    return Value(2 * EARTH_RADIUS_KM, FloatField()) * ASin(Sqrt(a))
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """
+    Rows of `queryset` (with geohash, latitude and longitude) within `radius_km` of a point
+
+    The covering geohash cells are indexed prefix ranges and the bounding box
+    trims them further; only those candidates get the exact distance test.
+    """
+    from django.db.models import Q
+
+    cells = Q()
+    for cell in geohash_cells(latitude, longitude, radius_km):
+        # '{' sorts after every geohash character
+        cells |= Q(geohash__gte=cell, geohash__lt=cell + '{') if cell else Q(latitude__isnull=False)
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    queryset = queryset.filter(cells, latitude__gte=min_lat, latitude__lte=max_lat)
+    if min_lon is not None:
+        queryset = queryset.filter(longitude__gte=min_lon, longitude__lte=max_lon)
+    return queryset.alias(distance_km=distance_expression(latitude, longitude)).filter(distance_km__lte=radius_km)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Geohash of a point ("u4pruydqq" style, `precision` characters)"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """(height, width) of a geohash cell in degrees"""
+    lat_bits = 5 * precision // 2
+    lon_bits = 5 * precision - lat_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def geohash_cells(latitude, longitude, radius_km):
+    """
+    Geohash prefixes whose cells together cover a circle
+
+    Uses the longest prefix whose cells are at least `radius_km` across at this
+    latitude, so the cell containing the centre and its eight neighbours
+    suffice.
+
+    Returns:
+        list: Distinct prefixes (a single '' when the circle needs the whole world)
+    """
+    km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+    # Narrowest cell width in the circle's latitude band
+    edge_latitude = min(abs(latitude) + radius_km / km_per_degree, 89.9)
+    precision = 0
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        height, width = geohash_cell_size(candidate)
+        if (height * km_per_degree < radius_km
+                or width * km_per_degree * math.cos(math.radians(edge_latitude)) < radius_km):
+            break
+        precision = candidate
+    if precision == 0:
+        return ['']
+    height, width = geohash_cell_size(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        for dlon in (-width, 0, width):
+            cell_latitude = latitude + dlat
+            if not -90 <= cell_latitude <= 90:
+                continue
+            cell_longitude = (longitude + dlon + 180) % 360 - 180
+            cells.add(encode_geohash(cell_latitude, cell_longitude, precision))
+    return sorted(cells)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) around a circle; longitudes are None near the poles or antimeridian"""
+    km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+    dlat = radius_km / km_per_degree
+    min_lat, max_lat = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+    if max(abs(min_lat), abs(max_lat)) >= 89.9:
+        return min_lat, max_lat, None, None
+    dlon = dlat / math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if abs(longitude) + dlon > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, longitude - dlon, longitude + dlon
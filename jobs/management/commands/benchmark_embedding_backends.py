@@ -0,0 +1,128 @@
+"""
+Management command to compare embedding backends for speed and retrieval quality
+Usage: python manage.py benchmark_embedding_backends [--backends torch,torch-int8,onnx] [--top-k 5]
+
+Quality is measured against the first backend (normally fp32 torch) on the
+fixture corpus: recall@k of the job postings retrieved for each resume query,
+and the mean cosine similarity between the two backends' document vectors.
+"""
+import json
+import os
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.embedding_backends import load_model, model_spec, parse_model_spec
+from jobs.vector_index import normalize_rows, top_k_indices
+
+DEFAULT_CORPUS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'fixtures', 'embedding_benchmark_corpus.json'
+)
+
+
+def _encode(model, texts, batch_size=32):
+    return normalize_rows(np.asarray(model.encode(texts, batch_size=batch_size, convert_to_numpy=True)))
+
+
+def _top_k(documents, queries, k):
+    scores = queries @ documents.T
+    return [set(top_k_indices(row, k).tolist()) for row in scores]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark torch / torch-int8 / onnx embedding backends (latency, throughput, recall vs fp32)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backends',
+            type=str,
+            default='torch,torch-int8,onnx',
+            help='Comma-separated backends; the first is the quality baseline',
+        )
+        parser.add_argument(
+            '--model',
+            type=str,
+            default='',
+            help='Model name (default: AI_RECOMMENDATION_MODEL without its backend suffix)',
+        )
+        parser.add_argument(
+            '--corpus',
+            type=str,
+            default=DEFAULT_CORPUS,
+            help='JSON file with "documents" and "queries" lists',
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=5,
+            help='k for recall@k',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Timed repetitions of the corpus encode',
+        )
+
+    def handle(self, *args, **options):
+        from jobs.ai_recommender import get_model_name
+
+        name = options['model'] or parse_model_spec(get_model_name())[0]
+        with open(options['corpus']) as handle:
+            corpus = json.load(handle)
+        documents, queries = corpus['documents'], corpus['queries']
+        backends = [backend.strip() for backend in options['backends'].split(',') if backend.strip()]
+        top_k = options['top_k']
+
+        self.stdout.write(f'{name}: {len(documents)} documents, {len(queries)} queries\n')
+        self.stdout.write(
+            f'{"Backend":<12} {"load s":>7} {"docs/s":>8} {"query p50 ms":>13} {"query p95 ms":>13} '
+            f'{f"recall@{top_k}":>10} {"cosine":>7}'
+        )
+        self.stdout.write('-' * 78)
+
+        baseline = None
+        for backend in backends:
+            started = time.perf_counter()
+            try:
+                model = load_model(model_spec(name, backend))
+            except (ImportError, OSError, ValueError) as e:
+                self.stdout.write(self.style.WARNING(f'{backend:<12} skipped: {e}'))
+                continue
+            load_seconds = time.perf_counter() - started
+
+            _encode(model, documents[:4])  # warm-up
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                doc_vectors = _encode(model, documents)
+            docs_per_second = len(documents) * options['repeat'] / (time.perf_counter() - started)
+
+            latencies = []
+            query_vectors = []
+            for query in queries:
+                started = time.perf_counter()
+                query_vectors.append(_encode(model, [query])[0])
+                latencies.append((time.perf_counter() - started) * 1000)
+            query_vectors = np.vstack(query_vectors)
+            retrieved = _top_k(doc_vectors, query_vectors, top_k)
+
+            if baseline is None:
+                baseline = (doc_vectors, retrieved)
+                recall, cosine = 1.0, 1.0
+            else:
+                recall = float(np.mean([
+                    len(found & expected) / len(expected) for found, expected in zip(retrieved, baseline[1])
+                ]))
+                cosine = float(np.mean(np.sum(doc_vectors * baseline[0], axis=1)))
+
+            self.stdout.write(
+                f'{backend:<12} {load_seconds:>7.1f} {docs_per_second:>8.1f} '
+                f'{np.percentile(latencies, 50):>13.1f} {np.percentile(latencies, 95):>13.1f} '
+                f'{recall:>10.3f} {cosine:>7.4f}'
+            )
+            del model
+
+        if baseline is None:
+            raise CommandError('No backend could be loaded')
+        self.stdout.write(self.style.SUCCESS('\nBenchmark complete.'))
@@ -0,0 +1,196 @@
+"""
+Management command to benchmark the open-job listing queries with and without the composite indexes
+Usage: python manage.py benchmark_job_listing [--jobs 1000000] [--repeat 5] [--keep]
+
+Generates a synthetic catalogue (90% active, 30% without deadline, the rest
+due within +/- one year, created in id order over the last two years) inside a
+transaction that is rolled back afterwards unless --keep is given, then
+prints the query plan and latency of each listing query twice: "before"
+with the Job indexes disabled (SQLite NOT INDEXED / MySQL IGNORE INDEX) and
+"after" with them. Run it against a scratch database.
+"""
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import User
+from companies.models import Company
+from jobs.locations import location_fields
+from jobs.models import Job
+from jobs.search import apply_filters, normalize_search_params
+
+INSERT_COLUMNS = (
+    'company_id', 'title', 'description', 'requirements', 'skills_required', 'skill_ids', 'location',
+    'work_mode', 'job_type', 'experience_level', 'salary_currency', 'is_active', 'is_featured', 'views',
+    'application_count', 'created_at', 'updated_at', 'content_version', 'content_updated_at', 'deadline',
+    'location_place', 'location_region', 'location_country', 'latitude', 'longitude', 'geohash',
+)
+LOCATION_COLUMNS = INSERT_COLUMNS[-6:]
+TITLES = ['Backend Engineer', 'Data Analyst', 'Product Designer', 'DevOps Engineer', 'Sales Manager']
+LOCATIONS = [
+    'New York, NY', 'London', 'Berlin', 'Remote', 'San Francisco, CA', 'Jersey City, NJ', 'Boston, MA',
+    'Austin, TX', 'Toronto', 'Bangalore, India', 'Paris', 'Chicago', 'Sydney', 'Newark, NJ', 'Singapore',
+]
+WORK_MODES = ['remote', 'hybrid', 'onsite']
+LEVELS = ['entry', 'mid', 'senior', 'executive']
+
+
+def _listing_queries(now):
+    open_jobs = Job.objects.open(now)
+    return [
+        ('home: recent', open_jobs.order_by('-created_at')[:10]),
+        ('home: featured', open_jobs.filter(is_featured=True).order_by('-created_at')[:6]),
+        ('search: remote, page 50', open_jobs.filter(work_mode='remote').order_by('-created_at')[980:1000]),
+        ('search: in Berlin', apply_filters(
+            open_jobs, normalize_search_params({'location': 'Berlin'})
+        ).order_by('-created_at')[:20]),
+        ('search: within 100 km of NYC', apply_filters(
+            open_jobs, normalize_search_params({'location': 'NYC', 'radius_km': '100'})
+        ).order_by('-created_at')[:20]),
+        ('search: count', None),
+        ('catalogue: ids', open_jobs.order_by().values_list('id', 'content_version')),
+    ]
+
+
+def _sql(queryset, disable_indexes):
+    sql, params = queryset.query.sql_with_params()
+    table = connection.ops.quote_name(Job._meta.db_table)
+    if disable_indexes:
+        if connection.vendor == 'sqlite':
+            hint = 'NOT INDEXED'
+        else:
+            hint = 'IGNORE INDEX ({})'.format(', '.join(index.name for index in Job._meta.indexes))
+        sql = sql.replace(f'FROM {table}', f'FROM {table} {hint}', 1)
+    return sql, params
+
+
+def _explain(sql, params):
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+    if connection.vendor == 'sqlite':
+        return [row[-1] for row in rows]
+    return [
+        ', '.join(f'{name}={value}' for name, value in zip(columns, row)
+                  if name in ('table', 'type', 'key', 'rows', 'Extra'))
+        for row in rows
+    ]
+
+
+def _time(sql, params, repeat):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        cursor.fetchall()  # warm-up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            cursor.execute(sql, params)
+            cursor.fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = 'Show plans and latencies of open-job listing queries before/after the composite indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1000000,
+            help='Number of synthetic jobs to generate',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per INSERT batch',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed repetitions per query',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Commit the generated jobs instead of rolling them back',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'mysql'):
+            raise CommandError(f'Unsupported database vendor: {connection.vendor}')
+
+        with transaction.atomic():
+            self._generate(options['jobs'], options['batch_size'])
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE TABLE {connection.ops.quote_name(Job._meta.db_table)}')
+                    cursor.fetchall()
+            self._report(options['repeat'])
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\nBenchmark complete.'))
+
+    def _generate(self, total, batch_size):
+        rng = random.Random(0)
+        owner = User.objects.create_user(
+            email=f'benchmark-{time.time_ns()}@example.com', password=None, user_type='employer'
+        )
+        company = Company.objects.create(user=owner, name='Benchmark Co')
+        now = timezone.now()
+        adapt = connection.ops.adapt_datetimefield_value
+        table = connection.ops.quote_name(Job._meta.db_table)
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            table,
+            ', '.join(connection.ops.quote_name(column) for column in INSERT_COLUMNS),
+            ', '.join(['%s'] * len(INSERT_COLUMNS)),
+        )
+        skills = json.dumps(['Python', 'SQL'])
+        places = {location: [location_fields(location)[name] for name in LOCATION_COLUMNS] for location in LOCATIONS}
+
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            for offset in range(0, total, batch_size):
+                rows = []
+                for i in range(offset, min(offset + batch_size, total)):
+                    # Rows are inserted oldest first, as in production (auto_now_add)
+                    created_at = adapt(now - timedelta(minutes=(total - i) * 2 * 365 * 24 * 60 / total))
+                    deadline = None
+                    if rng.random() >= 0.3:
+                        deadline = adapt(now + timedelta(minutes=rng.randrange(-365 * 24 * 60, 365 * 24 * 60)))
+                    rows.append((
+                        company.id, f'{TITLES[i % len(TITLES)]} {i}', 'Synthetic benchmark posting',
+                        'None', skills, '[]', LOCATIONS[i % len(LOCATIONS)], rng.choice(WORK_MODES),
+                        'full_time', rng.choice(LEVELS), 'USD', rng.random() < 0.9, rng.random() < 0.02,
+                        0, 0, created_at, created_at, 1, created_at, deadline,
+                        *places[LOCATIONS[i % len(LOCATIONS)]],
+                    ))
+                cursor.executemany(sql, rows)
+        self.stdout.write(f'Generated {total} jobs in {time.perf_counter() - start:.1f}s ({connection.vendor})')
+
+    def _report(self, repeat):
+        now = timezone.now()
+        for label, queryset in _listing_queries(now):
+            self.stdout.write(f'\n== {label}')
+            for phase, disable_indexes in (('before', True), ('after', False)):
+                if queryset is None:
+                    # COUNT(*) over the open-jobs predicate, as issued by the paginators
+                    inner, params = _sql(Job.objects.open(now).order_by().values('id'), disable_indexes)
+                    sql = f'SELECT COUNT(*) FROM ({inner}) subquery'
+                else:
+                    sql, params = _sql(queryset, disable_indexes)
+                latency = _time(sql, params, repeat)
+                self.stdout.write(f'  {phase:<6} {latency:>10.2f} ms')
+                for line in _explain(sql, params):
+                    self.stdout.write(f'         {line}')
@@ -0,0 +1,97 @@
+"""
+Management command to benchmark resume-to-job scoring strategies
+Usage: python manage.py benchmark_recommender --sizes 10000,100000,1000000
+"""
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from jobs.vector_index import normalize_rows, top_k_indices
+
+
+def _time(func, repeat):
+    func()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = 'Compare full-sort cosine scoring with pre-normalised matmul + argpartition top-k'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=str,
+            default='10000,100000,1000000',
+            help='Comma-separated catalogue sizes to benchmark',
+        )
+        parser.add_argument(
+            '--dim',
+            type=int,
+            default=768,
+            help='Embedding dimensions (768 for all-mpnet-base-v2)',
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=20,
+            help='Number of recommendations per query',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed repetitions per measurement',
+        )
+
+    def handle(self, *args, **options):
+        dim = options['dim']
+        top_k = options['top_k']
+        repeat = options['repeat']
+        rng = np.random.default_rng(0)
+        query = rng.standard_normal(dim).astype(np.float32)
+
+        self.stdout.write(f'{"Jobs":>10} {"cos_sim+argsort":>16} {"f32 matmul+top-k":>17} {"f16 matmul+top-k":>17}  (ms/query)')
+        self.stdout.write('-' * 70)
+
+        for size in (int(s) for s in options['sizes'].split(',') if s.strip()):
+            raw = rng.standard_normal((size, dim), dtype=np.float32)
+
+            def baseline(matrix=raw):
+                # Previous behaviour: normalise both sides per call, then sort every score
+                scores = (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)) @ (query / np.linalg.norm(query))
+                top = np.argsort(-scores)[:top_k]
+                return top[scores[top] > 0.3]
+
+            baseline_ms = _time(baseline, repeat)
+            normalized = normalize_rows(raw)
+            del raw, baseline
+
+            def optimized(matrix=normalized):
+                q = normalize_rows(query)[0]
+                scores = matrix @ q
+                positions = np.flatnonzero(scores > 0.3)
+                return positions[top_k_indices(scores[positions], top_k)]
+
+            f32_ms = _time(optimized, repeat)
+
+            half = normalized.astype(np.float16)
+            del normalized, optimized
+
+            def optimized_f16(matrix=half, chunk=65536):
+                q = normalize_rows(query)[0]
+                scores = np.empty(matrix.shape[0], dtype=np.float32)
+                for start in range(0, matrix.shape[0], chunk):
+                    scores[start:start + chunk] = matrix[start:start + chunk].astype(np.float32) @ q
+                positions = np.flatnonzero(scores > 0.3)
+                return positions[top_k_indices(scores[positions], top_k)]
+
+            f16_ms = _time(optimized_f16, repeat)
+            del half
+
+            self.stdout.write(f'{size:>10} {baseline_ms:>16.2f} {f32_ms:>17.2f} {f16_ms:>17.2f}')
+
+        self.stdout.write(self.style.SUCCESS('\nBenchmark complete.'))
@@ -0,0 +1,44 @@
+"""
+Management command to export the embedding model for the onnx backend
+(torch-int8 needs no export: it quantises the model when loading it)
+Usage: python manage.py export_embedding_model --backend onnx [--model sentence-transformers/all-mpnet-base-v2]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.embedding_backends import EXPORT_BACKENDS, export_model, model_spec, parse_model_spec
+
+
+class Command(BaseCommand):
+    help = 'Export a locally cached sentence transformer as an ONNX artifact'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend',
+            choices=EXPORT_BACKENDS,
+            default='onnx',
+        )
+        parser.add_argument(
+            '--model',
+            type=str,
+            default='',
+            help='Model name (default: AI_RECOMMENDATION_MODEL without its backend suffix)',
+        )
+        parser.add_argument(
+            '--allow-download',
+            action='store_true',
+            help='Download the model if it is not in the local Hugging Face cache',
+        )
+
+    def handle(self, *args, **options):
+        from jobs.ai_recommender import get_model_name
+
+        name = options['model'] or parse_model_spec(get_model_name())[0]
+        try:
+            artifact_dir = export_model(name, options['backend'], local_files_only=not options['allow_download'])
+        except ImportError as e:
+            raise CommandError(f'Missing dependency for {options["backend"]} export: {e}')
+        except OSError as e:
+            raise CommandError(f'Could not load {name} (use --allow-download if it is not cached): {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Exported {name} ({options["backend"]}) to {artifact_dir}'))
+        self.stdout.write(f"Enable with AI_RECOMMENDATION_MODEL='{model_spec(name, options['backend'])}'")
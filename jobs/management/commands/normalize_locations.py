@@ -0,0 +1,33 @@
+"""
+Management command to re-resolve stored job and profile locations against the gazetteer
+Usage: python manage.py normalize_locations [--batch-size 1000]
+
+Rows are normalised when they are saved; run this after editing
+jobs/fixtures/gazetteer.json so existing rows pick up new cities and aliases.
+"""
+from django.core.management.base import BaseCommand
+
+from accounts.models import JobSeekerProfile
+from jobs.catalogue import bump_catalogue_generation
+from jobs.locations import sync_location_fields
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Recompute canonical place ids and coordinates of jobs and job seeker profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk update',
+        )
+
+    def handle(self, *args, **options):
+        jobs = sync_location_fields(Job, options['batch_size'])
+        profiles = sync_location_fields(JobSeekerProfile, options['batch_size'])
+        if jobs:
+            # In-process facet and matching snapshots hold the old columns
+            bump_catalogue_generation()
+        self.stdout.write(self.style.SUCCESS(f'Updated {jobs} jobs and {profiles} profiles.'))
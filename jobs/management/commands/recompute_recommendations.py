@@ -0,0 +1,89 @@
+"""
+Management command to recompute AI job recommendations for all job seekers
+Usage: python manage.py recompute_recommendations [--chunk-size 64] [--workers 4] [--resume] [--async]
+"""
+from django.core.management.base import BaseCommand
+
+from jobs.batch_recommender import clear_checkpoint, get_checkpoint, recompute_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recompute resume-based AI recommendations for every job seeker in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=64,
+            help='Profiles parsed, encoded and scored per batch',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Threads used to extract resume text',
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=20,
+            help='Recommendations stored per user',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the checkpoint of an interrupted run',
+        )
+        parser.add_argument(
+            '--start-after',
+            type=int,
+            help='Only process profiles with an id greater than this',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Discard any saved checkpoint and exit',
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='run_async',
+            help='Queue the run as a Celery task instead of running it here',
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            clear_checkpoint()
+            self.stdout.write(self.style.SUCCESS('Checkpoint cleared.'))
+            return
+
+        if options['run_async']:
+            from jobs.tasks import recompute_recommendations as task
+            result = task.delay(
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                top_k=options['top_k'],
+                resume=options['resume'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'Queued recompute task: {getattr(result, "id", result)}'))
+            return
+
+        if options['resume'] and get_checkpoint():
+            self.stdout.write(f'Resuming after profile {get_checkpoint()}')
+
+        def report(processed, total, last_profile_id):
+            self.stdout.write(f'  {processed}/{total} profiles processed (last id {last_profile_id})')
+
+        stats = recompute_recommendations(
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            top_k=options['top_k'],
+            resume=options['resume'],
+            start_after=options['start_after'],
+            progress=report,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone: {stats['processed']} profiles, {stats['skipped']} skipped, "
+            f"{stats['recommendations']} recommendations in {stats['seconds']}s"
+        ))
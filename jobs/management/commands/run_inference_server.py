@@ -0,0 +1,73 @@
+"""
+Management command to serve embeddings for all workers from one model instance
+Usage: python manage.py run_inference_server [--bind 127.0.0.1:8765 | --socket /run/job_portal/inference.sock]
+Point the web/celery processes at it with AI_INFERENCE_URL (http://127.0.0.1:8765 or unix:///path).
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Run the embedding inference server (micro-batches concurrent encode requests)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bind',
+            type=str,
+            default='127.0.0.1:8765',
+            help='host:port to listen on (HTTP)',
+        )
+        parser.add_argument(
+            '--socket',
+            type=str,
+            default='',
+            help='Unix socket path to listen on instead of --bind',
+        )
+        parser.add_argument(
+            '--max-batch',
+            type=int,
+            default=getattr(settings, 'AI_INFERENCE_MAX_BATCH', 64),
+            help='Maximum texts encoded together (default AI_INFERENCE_MAX_BATCH)',
+        )
+        parser.add_argument(
+            '--max-wait-ms',
+            type=float,
+            default=10.0,
+            help='How long the first request of a batch waits for others to join',
+        )
+
+    def handle(self, *args, **options):
+        from jobs.ai_recommender import get_model, get_model_name
+        from jobs.inference_server import MicroBatcher, make_server
+
+        model = get_model()
+        model_name = get_model_name()
+        max_batch = options['max_batch']
+
+        def encode(texts):
+            return model.encode(texts, batch_size=max_batch, convert_to_numpy=True)
+
+        encode(['warm-up'])
+        batcher = MicroBatcher(encode, max_batch=max_batch, max_wait=options['max_wait_ms'] / 1000)
+
+        if options['socket']:
+            server = make_server(batcher, model_name, socket_path=options['socket'])
+            address = f"unix://{options['socket']}"
+        else:
+            host, _, port = options['bind'].rpartition(':')
+            try:
+                server = make_server(batcher, model_name, bind=(host or '127.0.0.1', int(port)))
+            except ValueError:
+                raise CommandError('--bind must be host:port')
+            address = f"http://{options['bind']}"
+
+        self.stdout.write(self.style.SUCCESS(f'Serving {model_name} embeddings on {address}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f"Served {batcher.stats['requests']} requests in {batcher.stats['batches']} batches"
+            )
@@ -0,0 +1,42 @@
+"""
+Management command to load the AI model and build the persisted job index ahead of traffic
+Usage: python manage.py warm_recommender [--skip-index]
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Load and warm up the AI model and sync the saved job vector index (run at deploy time)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-index',
+            action='store_true',
+            help='Only load and warm up the model',
+        )
+
+    def handle(self, *args, **options):
+        from jobs.ai_recommender import get_catalogue_index, get_model, get_model_name
+
+        started = time.monotonic()
+        try:
+            model = get_model()
+        except Exception as e:
+            raise CommandError(f'Could not load {get_model_name()}: {e}')
+        loaded = time.monotonic()
+        model.encode(['warm-up'], convert_to_numpy=True)
+        self.stdout.write(
+            f'Loaded {get_model_name()} in {loaded - started:.1f}s '
+            f'(first encode {time.monotonic() - loaded:.2f}s)'
+        )
+
+        if not options['skip_index']:
+            started = time.monotonic()
+            index = get_catalogue_index(wait=True)
+            self.stdout.write(
+                f'Synced job index: {len(index)} jobs in {time.monotonic() - started:.1f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS('AI recommender is warm.'))
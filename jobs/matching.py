@@ -0,0 +1,222 @@
+"""
+Vectorised rule-based job matching
+
+Loads the open job catalogue once into column arrays (a sparse job x skill
+matrix over canonical skill ids, experience level codes, work-mode flags,
+canonical locations) and scores one or many users with NumPy/SciPy
+operations. Weights and reasons are identical to
+jobs.utils.calculate_job_match_score.
+"""
+import time
+
+import numpy as np
+
+from .catalogue import get_catalogue_generation
+from .locations import haversine_km, match_radius_km
+from .skills import SkillMatrix
+
+# Minimum years of experience implied by each Job.experience_level
+EXPERIENCE_MAP = {
+    'entry': 0,
+    'mid': 3,
+    'senior': 7,
+    'executive': 10
+}
+
+# Rebuild the catalogue at least this often (seconds), even without a generation bump
+CATALOGUE_REBUILD_INTERVAL = 300
+
+_catalogue = None  # (generation, built_at, JobCatalogue)
+
+
+class UserFeatures:
+    """Normalised matching inputs for one job seeker profile"""
+
+    def __init__(self, profile):
+        self.skills = set(profile.skill_ids or [])
+        self.experience = profile.experience_years or 0
+        self.location = profile.location.lower() if profile.location else ''
+        self.place = profile.location_place
+        self.region = profile.location_region
+        self.country = profile.location_country
+        self.coordinates = (profile.latitude, profile.longitude)
+        self.has_education = bool(profile.education and len(profile.education) > 0)
+        self.has_resume = bool(profile.resume)
+
+
+class JobCatalogue:
+    """Column-oriented snapshot of the open jobs, in listing order (-created_at)"""
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: iterable of (id, skill_ids, experience_level, work_mode, location, deadline,
+                location_place, location_region, location_country, latitude, longitude)
+        """
+        rows = list(rows)
+        n = len(rows)
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.skills = SkillMatrix(self.ids, [row[1] for row in rows])
+        self.skill_counts = self.skills.skill_counts
+        self.experience_min = np.zeros(n, dtype=np.int64)
+        self.is_remote = np.zeros(n, dtype=bool)
+        self.has_location = np.zeros(n, dtype=bool)
+        self.deadlines = np.full(n, np.inf)
+        self.latitudes = np.full(n, np.nan)
+        self.longitudes = np.full(n, np.nan)
+        locations = []
+
+        for i, (_, _, experience_level, work_mode, location, deadline, *_, latitude, longitude) in enumerate(rows):
+            self.experience_min[i] = EXPERIENCE_MAP.get(experience_level, 0)
+            self.is_remote[i] = work_mode == 'remote'
+            self.has_location[i] = bool(location)
+            locations.append(location.lower() if location else '')
+            if deadline is not None:
+                self.deadlines[i] = deadline.timestamp()
+            if latitude is not None:
+                self.latitudes[i], self.longitudes[i] = latitude, longitude
+
+        self.locations = np.array(locations, dtype=str) if locations else np.empty(0, dtype=str)
+        self.places, self.regions, self.countries = (
+            np.array([row[column] for row in rows], dtype=str) if rows else np.empty(0, dtype=str)
+            for column in (6, 7, 8)
+        )
+        self.row_of = {int(job_id): row for row, job_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return self.ids.shape[0]
+
+    def _location_match(self, features):
+        """Vectorised jobs.locations.locations_match"""
+        if not features.location or not len(self):
+            return np.zeros(len(self), dtype=bool)
+        user_location = np.full(len(self), features.location)
+        job_in_user = np.char.find(user_location, self.locations) >= 0
+        user_in_job = np.char.find(self.locations, features.location) >= 0
+        match = user_in_job | job_in_user
+        if features.country:
+            both_places = (self.places != '') & bool(features.place)
+            same_city = np.zeros(len(self), dtype=bool)
+            if features.place:
+                with np.errstate(invalid='ignore'):
+                    distance = haversine_km(*features.coordinates, self.latitudes, self.longitudes)
+                    same_city = (self.places == features.place) | (distance <= match_radius_km())
+            both_regions = (self.regions != '') & bool(features.region)
+            canonical = np.where(
+                both_places, same_city,
+                np.where(both_regions, self.regions == features.region, self.countries == features.country),
+            )
+            match = np.where(self.countries != '', canonical, match)
+        return self.has_location & match
+
+    def _components(self, features, skill_overlap):
+        """Per-job score components, applied in the same order as calculate_job_match_score"""
+        n = len(self)
+        scores = np.zeros(n, dtype=np.float64)
+
+        # Skill matching (40% weight)
+        has_skills = self.skill_counts > 0
+        if features.skills:
+            ratio = np.divide(
+                skill_overlap, self.skill_counts,
+                out=np.zeros(n, dtype=np.float64), where=has_skills,
+            )
+            scores = np.where(has_skills, scores + ratio * 40, scores)
+
+        # Experience level matching (20% weight)
+        experience_match = features.experience >= self.experience_min
+        experience_close = ~experience_match & (features.experience >= self.experience_min - 2)
+        scores = np.where(experience_match, scores + 20, np.where(experience_close, scores + 10, scores))
+
+        # Location matching (15% weight)
+        location_match = self._location_match(features)
+        remote_fallback = np.zeros(n, dtype=bool)
+        if features.location:
+            remote_fallback = self.has_location & ~location_match & self.is_remote
+        scores = np.where(location_match | remote_fallback, scores + 15, scores)
+
+        # Work mode preference (10% weight)
+        scores = np.where(self.is_remote, scores + 10, scores)
+
+        # Education matching (10% weight)
+        if features.has_education:
+            scores = scores + 10
+
+        # Resume keywords matching (5% weight)
+        if features.has_resume:
+            scores = scores + 5
+
+        components = {
+            'experience_match': experience_match,
+            'experience_close': experience_close,
+            'location_match': location_match,
+            'remote_fallback': remote_fallback,
+        }
+        return np.minimum(scores, 100.0), components
+
+    def score(self, profile):
+        """Scores (0-100) of every catalogue job for one profile"""
+        features = UserFeatures(profile)
+        return self._components(features, self.skills.overlap(features.skills))[0]
+
+    def score_many(self, profiles):
+        """Score matrix (users x jobs); skill overlap for all users is one matrix product"""
+        features = [UserFeatures(profile) for profile in profiles]
+        if not features:
+            return np.empty((0, len(self)))
+        overlaps = self.skills.overlap_many([f.skills for f in features])
+        return np.vstack([
+            self._components(f, overlaps[:, i])[0] for i, f in enumerate(features)
+        ])
+
+    def reasons(self, profile, rows):
+        """Reason lists (as produced by calculate_job_match_score) for the given rows"""
+        features = UserFeatures(profile)
+        overlap = self.skills.overlap(features.skills)
+        _, components = self._components(features, overlap)
+        result = []
+        for row in rows:
+            reasons = []
+            if features.skills and self.skill_counts[row] and overlap[row]:
+                reasons.append(f"Matches {int(overlap[row])} required skills")
+            if components['experience_match'][row]:
+                reasons.append("Experience level matches")
+            elif components['experience_close'][row]:
+                reasons.append("Experience level close")
+            if components['location_match'][row]:
+                reasons.append("Location matches")
+            elif components['remote_fallback'][row]:
+                reasons.append("Remote position")
+            if self.is_remote[row]:
+                reasons.append("Remote work available")
+            if features.has_education:
+                reasons.append("Education background available")
+            if features.has_resume:
+                reasons.append("Resume available")
+            result.append(reasons)
+        return result
+
+    def open_mask(self, at=None):
+        """Rows whose deadline has not passed at `at` (epoch seconds, default now)"""
+        return self.deadlines > (time.time() if at is None else at)
+
+
+def build_catalogue():
+    """Load the open job catalogue from the database in listing order"""
+    from .models import Job
+
+    rows = Job.objects.open().order_by('-created_at').values_list(
+        'id', 'skill_ids', 'experience_level', 'work_mode', 'location', 'deadline',
+        'location_place', 'location_region', 'location_country', 'latitude', 'longitude',
+    )
+    return JobCatalogue(rows)
+
+
+def get_catalogue():
+    """Shared JobCatalogue, rebuilt when the catalogue generation changes"""
+    global _catalogue
+    generation = get_catalogue_generation()
+    if (_catalogue is None or _catalogue[0] != generation
+            or time.time() - _catalogue[1] > CATALOGUE_REBUILD_INTERVAL):
+        _catalogue = (generation, time.time(), build_catalogue())
+    return _catalogue[2]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=200)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('vector', models.BinaryField()),
+                ('dimensions', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='embedding', to='jobs.job')),
+            ],
+            options={
+                'verbose_name': 'Job Embedding',
+                'verbose_name_plural': 'Job Embeddings',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:32
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def copy_updated_at(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.update(content_updated_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_jobembedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='content_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='content_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(copy_updated_at, migrations.RunPython.noop),
+    ]
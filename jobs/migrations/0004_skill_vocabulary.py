@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_content_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Skill',
+                'verbose_name_plural': 'Skills',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='skill_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,86 @@
+import re
+
+from django.db import migrations
+
+# Frozen copy of jobs.skills as of this migration, so later vocabulary
+# changes do not alter what it writes
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'nextjs': 'next.js',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'dotnet': '.net',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'ms excel': 'excel',
+    'drf': 'django rest framework',
+    'html5': 'html',
+    'css3': 'css',
+    'sklearn': 'scikit-learn',
+    'tf': 'tensorflow',
+}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_skills(names):
+    seen = []
+    for name in names or []:
+        name = _WHITESPACE.sub(' ', str(name).strip().lower())
+        canonical = SKILL_ALIASES.get(name, name)
+        if canonical and canonical not in seen:
+            seen.append(canonical)
+    return seen
+
+
+def populate_skill_ids(apps, schema_editor):
+    Skill = apps.get_model('jobs', 'Skill')
+    Job = apps.get_model('jobs', 'Job')
+    JobSeekerProfile = apps.get_model('accounts', 'JobSeekerProfile')
+
+    skill_ids = dict(Skill.objects.values_list('name', 'id'))
+
+    def ids_for(names):
+        result = []
+        for name in normalize_skills(names):
+            if name not in skill_ids:
+                skill_ids[name] = Skill.objects.get_or_create(name=name)[0].id
+            result.append(skill_ids[name])
+        return result
+
+    for model, field in ((Job, 'skills_required'), (JobSeekerProfile, 'skills')):
+        for obj in model.objects.only('id', field).iterator():
+            model.objects.filter(pk=obj.pk).update(skill_ids=ids_for(getattr(obj, field)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_jobseekerprofile_skill_ids'),
+        ('jobs', '0004_skill_vocabulary'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_skill_ids, migrations.RunPython.noop),
+    ]
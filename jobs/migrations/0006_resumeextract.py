@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_populate_skill_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeExtract',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('text', models.TextField(blank=True)),
+                ('model_name', models.CharField(blank=True, max_length=200)),
+                ('embedding', models.BinaryField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Resume Extract',
+                'verbose_name_plural': 'Resume Extracts',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobs', '0006_resumeextract'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeProcessing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('extracting', 'Extracting text'), ('embedding', 'Analysing resume'), ('scoring', 'Matching jobs'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('task_id', models.CharField(blank=True, max_length=255)),
+                ('recommendation_count', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('queued_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resume_processing', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resume Processing',
+                'verbose_name_plural': 'Resume Processing',
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Full-text search indexes for job search (see jobs/fulltext.py)
+
+from django.db import migrations
+
+MYSQL_FORWARD = [
+    "ALTER TABLE jobs_job ADD FULLTEXT INDEX jobs_job_fulltext (title, description, requirements)",
+    "ALTER TABLE companies_company ADD FULLTEXT INDEX companies_company_name_fulltext (name)",
+]
+MYSQL_BACKWARD = [
+    "ALTER TABLE jobs_job DROP INDEX jobs_job_fulltext",
+    "ALTER TABLE companies_company DROP INDEX companies_company_name_fulltext",
+]
+
+# FTS5 shadow table keyed by job id, kept in sync by triggers (also covers queryset.update())
+SQLITE_JOB_VALUES = (
+    "new.id, new.title, (SELECT name FROM companies_company WHERE id = new.company_id), "
+    "new.description, new.requirements, new.skills_required"
+)
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE jobs_job_fts USING fts5("
+    "title, company, description, requirements, skills, tokenize = 'porter unicode61')",
+    "INSERT INTO jobs_job_fts (rowid, title, company, description, requirements, skills) "
+    "SELECT j.id, j.title, c.name, j.description, j.requirements, j.skills_required "
+    "FROM jobs_job j LEFT JOIN companies_company c ON c.id = j.company_id",
+    "CREATE TRIGGER jobs_job_fts_insert AFTER INSERT ON jobs_job BEGIN "
+    "INSERT INTO jobs_job_fts (rowid, title, company, description, requirements, skills) "
+    f"VALUES ({SQLITE_JOB_VALUES}); END",
+    "CREATE TRIGGER jobs_job_fts_update AFTER UPDATE OF title, description, requirements, skills_required, "
+    "company_id ON jobs_job BEGIN DELETE FROM jobs_job_fts WHERE rowid = old.id; "
+    "INSERT INTO jobs_job_fts (rowid, title, company, description, requirements, skills) "
+    f"VALUES ({SQLITE_JOB_VALUES}); END",
+    "CREATE TRIGGER jobs_job_fts_delete AFTER DELETE ON jobs_job BEGIN "
+    "DELETE FROM jobs_job_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER companies_company_fts_update AFTER UPDATE OF name ON companies_company BEGIN "
+    "UPDATE jobs_job_fts SET company = new.name "
+    "WHERE rowid IN (SELECT id FROM jobs_job WHERE company_id = new.id); END",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS companies_company_fts_update",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_delete",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_update",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_insert",
+    "DROP TABLE IF EXISTS jobs_job_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'sqlite' and statements_by_vendor is FORWARD:
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("PRAGMA compile_options")
+                options = {row[0] for row in cursor.fetchall()}
+            if 'ENABLE_FTS5' not in options:
+                # Search falls back to LIKE queries without FTS5
+                return
+        for statement in statements_by_vendor.get(vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+FORWARD = {'mysql': MYSQL_FORWARD, 'sqlite': SQLITE_FORWARD}
+BACKWARD = {'mysql': MYSQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0001_initial'),
+        ('jobs', '0007_resumeprocessing'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD), _run(BACKWARD)),
+    ]
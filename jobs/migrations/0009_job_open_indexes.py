@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'created_at', 'deadline'], name='job_open_listing'),
+        ),
+    ]
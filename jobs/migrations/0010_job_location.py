@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:20
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# Rebuilding jobs_job on SQLite (AddField) would drop the FTS5 sync triggers and trip over
+# the company trigger, so they are removed first and recreated afterwards
+fulltext = import_module('jobs.migrations.0008_job_fulltext')
+SQLITE_TRIGGERS = [statement for statement in fulltext.SQLITE_FORWARD if statement.startswith('CREATE TRIGGER')]
+SQLITE_DROP_TRIGGERS = [statement for statement in fulltext.SQLITE_BACKWARD if statement.startswith('DROP TRIGGER')]
+
+
+def _fts_triggers(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'jobs_job_fts'")
+            if cursor.fetchone() is None:
+                return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+def populate_locations(apps, schema_editor):
+    from jobs.locations import sync_location_fields
+
+    sync_location_fields(apps.get_model('jobs', 'Job'))
+    sync_location_fields(apps.get_model('accounts', 'JobSeekerProfile'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_jobseekerprofile_location'),
+        ('jobs', '0009_job_open_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(_fts_triggers(SQLITE_DROP_TRIGGERS), _fts_triggers(SQLITE_TRIGGERS)),
+        migrations.AddField(
+            model_name='job',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='location_country',
+            field=models.CharField(blank=True, editable=False, max_length=2),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='location_place',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='location_region',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['location_country', 'location_region', 'location_place', 'created_at'], name='job_location'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['geohash'], name='job_geohash'),
+        ),
+        migrations.RunPython(_fts_triggers(SQLITE_TRIGGERS), _fts_triggers(SQLITE_DROP_TRIGGERS)),
+        migrations.RunPython(populate_locations, migrations.RunPython.noop),
+    ]
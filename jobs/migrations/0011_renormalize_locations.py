@@ -0,0 +1,21 @@
+# Re-resolve stored locations: two-letter country codes ("Berlin, DE") were read as US states
+
+from django.db import migrations
+
+
+def renormalize_locations(apps, schema_editor):
+    from jobs.locations import sync_location_fields
+
+    sync_location_fields(apps.get_model('jobs', 'Job'))
+    sync_location_fields(apps.get_model('accounts', 'JobSeekerProfile'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_job_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(renormalize_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_renormalize_locations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobembedding',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='embeddings', to='jobs.job'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobembedding',
+            unique_together={('job', 'model_name')},
+        ),
+    ]
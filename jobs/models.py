@@ -1,8 +1,30 @@
+import copy
+
 from django.db import models
+from django.db.models import F, Q
 from django.conf import settings
 from django.utils import timezone
 
 
+class JobQuerySet(models.QuerySet):
+    
+    def open(self, at=None):
+        """
+        Active jobs whose deadline has not passed
+        
+        Served by the job_open_listing index: an ordered (-created_at) scan of the
+        is_active=True range that checks deadline from the index itself.
+        
+        Args:
+            at: Reference time (default: now)
+        """
+        # is_active__in rather than is_active=True: SQLite renders the latter as a bare
+        # column test, which cannot seek on the leading index column
+        return self.filter(is_active__in=[True]).filter(
+            Q(deadline__isnull=True) | Q(deadline__gt=at or timezone.now())
+        )
+
+
 class Job(models.Model):
     """Job Posting Model"""
     WORK_MODE_CHOICES = [
@@ -30,7 +52,15 @@ class Job(models.Model):
     description = models.TextField()
     requirements = models.TextField()
     skills_required = models.JSONField(default=list, blank=True)  # ["Python", "Django", "React"]
+    skill_ids = models.JSONField(default=list, blank=True, editable=False)  # Canonical Skill ids, kept in sync on save
     location = models.CharField(max_length=200)
+    # Canonical location from the gazetteer (jobs.locations), kept in sync on save; empty when unknown
+    location_place = models.CharField(max_length=64, blank=True, editable=False)
+    location_region = models.CharField(max_length=16, blank=True, editable=False)
+    location_country = models.CharField(max_length=2, blank=True, editable=False)
+    latitude = models.FloatField(blank=True, null=True, editable=False)
+    longitude = models.FloatField(blank=True, null=True, editable=False)
+    geohash = models.CharField(max_length=12, blank=True, editable=False)
     work_mode = models.CharField(max_length=20, choices=WORK_MODE_CHOICES, default='onsite')
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES, default='full_time')
     experience_level = models.CharField(max_length=20, choices=EXPERIENCE_LEVEL_CHOICES, default='mid')
@@ -43,16 +73,70 @@ class Job(models.Model):
     application_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped only when text used for embeddings/search changes (not on view or application counters)
+    content_version = models.PositiveIntegerField(default=1)
+    content_updated_at = models.DateTimeField(default=timezone.now)
     deadline = models.DateTimeField(blank=True, null=True)
     
+    # Fields that feed prepare_job_corpus and the search index
+    CONTENT_FIELDS = ('title', 'company', 'location', 'description', 'requirements', 'skills_required')
+    # Fields save() derives from the content fields
+    DERIVED_FIELDS = (
+        'skill_ids', 'content_version', 'content_updated_at', 'location_place', 'location_region',
+        'location_country', 'latitude', 'longitude', 'geohash',
+    )
+    
+    objects = JobQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Job'
         verbose_name_plural = 'Jobs'
+        indexes = [
+            # Listings: is_active=True ... ORDER BY created_at DESC, deadline checked without row lookups.
+            # Also covers open-job counts; featured/filtered listings walk it until LIMIT is reached
+            models.Index(fields=['is_active', 'created_at', 'deadline'], name='job_open_listing'),
+            # Location filters (country, country + region, or a city listed newest first) and radius searches
+            models.Index(fields=['location_country', 'location_region', 'location_place', 'created_at'], name='job_location'),
+            models.Index(fields=['geohash'], name='job_geohash'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.company.name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._content_snapshot = instance._content_values()
+        return instance
+    
+    def _content_values(self):
+        attnames = [self._meta.get_field(name).attname for name in self.CONTENT_FIELDS]
+        if self.get_deferred_fields() & set(attnames):
+            return None
+        return copy.deepcopy(tuple(getattr(self, attname) for attname in attnames))
+    
+    def _content_changed(self):
+        snapshot = getattr(self, '_content_snapshot', None)
+        return snapshot is None or snapshot != self._content_values()
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        touches_content = update_fields is None or not set(update_fields).isdisjoint(self.CONTENT_FIELDS)
+        if self._state.adding or (touches_content and self._content_changed()):
+            from .locations import location_fields
+            from .skills import get_skill_ids
+            self.skill_ids = get_skill_ids(self.skills_required)
+            for name, value in location_fields(self.location).items():
+                setattr(self, name, value)
+            if not self._state.adding:
+                self.content_version = (self.content_version or 0) + 1
+                self.content_updated_at = timezone.now()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(self.DERIVED_FIELDS)
+        super().save(*args, **kwargs)
+        self._content_snapshot = self._content_values()
+    
     @property
     def is_expired(self):
         if self.deadline:
@@ -60,8 +144,23 @@ class Job(models.Model):
         return False
     
     def increment_views(self):
+        # Counter-only update: leaves updated_at and content_version untouched
+        Job.objects.filter(pk=self.pk).update(views=F('views') + 1)
         self.views += 1
-        self.save(update_fields=['views'])
+
+
+class Skill(models.Model):
+    """Canonical skill vocabulary entry (see jobs.skills for normalisation and aliases)"""
+    name = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Skill'
+        verbose_name_plural = 'Skills'
+    
+    def __str__(self):
+        return self.name
 
 
 class JobView(models.Model):
@@ -89,3 +188,80 @@ class JobRecommendation(models.Model):
         ordering = ['-score', '-created_at']
         unique_together = ['user', 'job']
 
+
+
+class JobEmbedding(models.Model):
+    """Persisted sentence-transformer embedding for a job posting, one per embedding key (model_name)"""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='embeddings')
+    model_name = models.CharField(max_length=200)
+    content_hash = models.CharField(max_length=64)  # SHA-256 of prepare_job_corpus(job)
+    vector = models.BinaryField()  # float32 bytes
+    dimensions = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Job Embedding'
+        verbose_name_plural = 'Job Embeddings'
+        unique_together = ['job', 'model_name']
+    
+    def __str__(self):
+        return f"Embedding for job {self.job_id} ({self.model_name})"
+
+
+class ResumeExtract(models.Model):
+    """Parsed resume text and its embedding, stored once per distinct file (SHA-256)"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    text = models.TextField(blank=True)
+    model_name = models.CharField(max_length=200, blank=True)  # Model that produced `embedding`
+    embedding = models.BinaryField(null=True, blank=True)  # float32 bytes
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Resume Extract'
+        verbose_name_plural = 'Resume Extracts'
+    
+    def __str__(self):
+        return f"Resume {self.sha256[:12]}"
+
+
+class ResumeProcessing(models.Model):
+    """Status of the latest background resume -> recommendations run for a user"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('extracting', 'Extracting text'),
+        ('embedding', 'Analysing resume'),
+        ('scoring', 'Matching jobs'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    PENDING_STATUSES = ('queued', 'extracting', 'embedding', 'scoring')
+    
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='resume_processing')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    task_id = models.CharField(max_length=255, blank=True)
+    recommendation_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    queued_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Resume Processing'
+        verbose_name_plural = 'Resume Processing'
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.status}"
+    
+    @property
+    def is_pending(self):
+        return self.status in self.PENDING_STATUSES
+    
+    def set_status(self, status, **fields):
+        """Update status (and any extra fields) with a single UPDATE"""
+        fields['status'] = status
+        fields['updated_at'] = timezone.now()
+        if status in ('done', 'failed'):
+            fields['finished_at'] = fields['updated_at']
+        ResumeProcessing.objects.filter(pk=self.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(self, name, value)
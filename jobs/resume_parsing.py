@@ -0,0 +1,362 @@
+"""
+Bounded resume text extraction
+
+PDF pages are read lazily and extraction stops at a page/character budget
+(RESUME_MAX_PAGES, RESUME_MAX_CHARS). Parsing runs in a pool of spawned
+subprocesses with a per-file time limit (RESUME_PARSE_TIMEOUT), so a huge,
+scanned or malformed document cannot tie up a web or Celery worker. When a
+parse overruns, new parses go to a fresh pool and the old one is terminated
+once the parses still running in it have finished.
+
+Files are handed to the parser without a disk round-trip: local storage by
+path, uploads as in-memory bytes, and S3-backed files (USE_S3) as a bucket/key
+reference that the parser reads with ranged GETs, fetching only the blocks
+the PDF reader touches.
+
+The functions executed in the pool must not touch Django: limits are read
+in the calling process and passed as arguments.
+"""
+import atexit
+import io
+import logging
+import multiprocessing
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PAGES = 20
+DEFAULT_MAX_CHARS = 100000
+DEFAULT_TIMEOUT = 20
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+# Bytes fetched per ranged S3 request
+RANGE_BLOCK_SIZE = 256 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+_in_flight = {}  # pool -> parses waiting on it
+_retired = set()  # pools to terminate once their in-flight parses are done
+
+
+class ResumeParseError(Exception):
+    """A resume could not be parsed within its limits"""
+
+
+class RangedReader(io.RawIOBase):
+    """
+    Seekable, read-only file over fetch(start, end) -> bytes
+
+    Data is fetched in blocks on first access and kept, so a PDF reader that
+    jumps to the cross-reference table at the end and then reads a few pages
+    downloads only those regions.
+    """
+
+    def __init__(self, fetch, size, block_size=RANGE_BLOCK_SIZE):
+        self._fetch = fetch
+        self._size = size
+        self._block_size = block_size
+        self._blocks = {}
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(0, offset)
+        return self._position
+
+    def _block(self, number):
+        if number not in self._blocks:
+            start = number * self._block_size
+            self._blocks[number] = self._fetch(start, min(start + self._block_size, self._size))
+        return self._blocks[number]
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast('B')
+        written = 0
+        while written < len(view) and self._position < self._size:
+            number, offset = divmod(self._position, self._block_size)
+            data = self._block(number)[offset:offset + len(view) - written]
+            view[written:written + len(data)] = data
+            written += len(data)
+            self._position += len(data)
+        return written
+
+
+def open_s3_object(reference):
+    """Open an S3 object (see s3_reference) as a RangedReader"""
+    import boto3
+
+    client = boto3.client(
+        's3',
+        region_name=reference.get('region'),
+        endpoint_url=reference.get('endpoint_url'),
+        aws_access_key_id=reference.get('access_key'),
+        aws_secret_access_key=reference.get('secret_key'),
+    )
+    bucket, key = reference['bucket'], reference['key']
+    size = client.head_object(Bucket=bucket, Key=key)['ContentLength']
+    if reference.get('max_bytes') and size > reference['max_bytes']:
+        raise ValueError(f"Resume is larger than {reference['max_bytes']} bytes")
+
+    def fetch(start, end):
+        return client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end - 1}')['Body'].read()
+
+    return io.BufferedReader(RangedReader(fetch, size), buffer_size=64 * 1024)
+
+
+def open_source(source):
+    """File object (or path) for a parser source: path, bytes or {'s3': reference}"""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if isinstance(source, dict):
+        return open_s3_object(source['s3'])
+    return source
+
+
+def iter_pdf_pages(source, max_pages=None):
+    """
+    Yield the text of each page in turn
+
+    reader.pages resolves a page only when it is indexed, so pages past
+    `max_pages` are never read. A page that cannot be read or extracted
+    yields '' instead of failing the whole resume.
+    """
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(source, strict=False)
+    pages = reader.pages
+    count = len(pages)
+    if max_pages:
+        count = min(count, max_pages)
+    for number in range(count):
+        try:
+            text = pages[number].extract_text() or ''
+        except Exception as e:
+            logger.warning(f"Skipping unreadable PDF page {number + 1}: {e}")
+            text = ''
+        yield text
+
+
+def iter_docx_paragraphs(source):
+    import docx
+
+    for paragraph in docx.Document(source).paragraphs:
+        if paragraph.text:
+            yield paragraph.text
+
+
+def _take_budget(parts, max_chars):
+    """Join text parts with newlines, stopping once `max_chars` characters are collected"""
+    text = []
+    size = 0
+    for part in parts:
+        if not part:
+            continue
+        if max_chars and size + len(part) >= max_chars:
+            text.append(part[:max_chars - size])
+            break
+        text.append(part)
+        size += len(part) + 1
+    return "\n".join(text)
+
+
+def extract_text_from_pdf(source, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS):
+    """Extract text from a PDF (path or binary file object) within a page/character budget"""
+    try:
+        return _take_budget(iter_pdf_pages(source, max_pages), max_chars)
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {e}")
+        raise
+
+
+def extract_text_from_docx(source, max_chars=DEFAULT_MAX_CHARS):
+    """Extract text from a DOCX (path or binary file object) within a character budget"""
+    try:
+        return _take_budget(iter_docx_paragraphs(source), max_chars)
+    except Exception as e:
+        logger.error(f"Error extracting text from DOCX: {e}")
+        raise
+
+
+def parse_document(source, ext, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS):
+    """Extract text by file extension (runs inside the subprocess pool)"""
+    source = open_source(source)
+    if ext == ".pdf":
+        return extract_text_from_pdf(source, max_pages, max_chars)
+    if ext in (".docx", ".doc"):
+        return extract_text_from_docx(source, max_chars)
+    raise ValueError(f"Unsupported resume file type: {ext}")
+
+
+def get_limits():
+    from django.conf import settings
+
+    return {
+        'max_pages': getattr(settings, 'RESUME_MAX_PAGES', DEFAULT_MAX_PAGES),
+        'max_chars': getattr(settings, 'RESUME_MAX_CHARS', DEFAULT_MAX_CHARS),
+        'timeout': getattr(settings, 'RESUME_PARSE_TIMEOUT', DEFAULT_TIMEOUT),
+        'workers': getattr(settings, 'RESUME_PARSE_WORKERS', 2),
+        'max_bytes': getattr(settings, 'RESUME_MAX_BYTES', DEFAULT_MAX_BYTES),
+    }
+
+
+def _acquire_pool(workers):
+    """The current pool, counting one more parse in flight on it"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded web worker (DB connections, model threads) is unsafe
+            _pool = multiprocessing.get_context('spawn').Pool(processes=workers, maxtasksperchild=50)
+            _in_flight[_pool] = 0
+        _in_flight[_pool] += 1
+        return _pool
+
+
+def _release_pool(pool):
+    """Stop counting a parse; terminate a retired pool once nothing is waiting on it"""
+    with _pool_lock:
+        _in_flight[pool] -= 1
+        finished = pool in _retired and not _in_flight[pool]
+        if finished:
+            _retired.discard(pool)
+            del _in_flight[pool]
+    if finished:
+        pool.terminate()
+
+
+def _retire_pool(pool):
+    """Send new parses to a fresh pool; `pool` (with its overrunning worker) goes once drained"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        _retired.add(pool)
+
+
+@atexit.register
+def _shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pools = set(_in_flight)
+        _pool = None
+        _in_flight.clear()
+        _retired.clear()
+    for pool in pools:
+        pool.terminate()
+
+
+def parse_in_subprocess(source, ext):
+    """
+    Parse a resume in the subprocess pool, enforcing RESUME_PARSE_TIMEOUT
+
+    Args:
+        source: File path, bytes or {'s3': reference} (see parser_source)
+        ext: Lower-case file extension including the dot
+
+    Raises:
+        ResumeParseError: when parsing exceeds the time limit
+    """
+    limits = get_limits()
+    # Daemonic processes (e.g. Celery prefork children) cannot start a pool; they are already isolated
+    if not limits['workers'] or multiprocessing.current_process().daemon:
+        return parse_document(source, ext, limits['max_pages'], limits['max_chars'])
+
+    pool = _acquire_pool(limits['workers'])
+    try:
+        result = pool.apply_async(parse_document, (source, ext, limits['max_pages'], limits['max_chars']))
+        return result.get(timeout=limits['timeout'])
+    except multiprocessing.TimeoutError:
+        logger.warning(f"Resume parsing exceeded {limits['timeout']}s; replacing the parser pool")
+        _retire_pool(pool)
+        raise ResumeParseError(f"Resume could not be processed within {limits['timeout']} seconds")
+    finally:
+        _release_pool(pool)
+
+
+def read_bounded(file, max_bytes):
+    """Read a file object (or its chunks()) into bytes, failing past `max_bytes`"""
+    if hasattr(file, 'seek'):
+        try:
+            file.seek(0)
+        except (OSError, ValueError):
+            pass
+    chunks = file.chunks() if hasattr(file, 'chunks') else iter(lambda: file.read(64 * 1024), b'')
+    data = bytearray()
+    for chunk in chunks:
+        data.extend(chunk)
+        if max_bytes and len(data) > max_bytes:
+            raise ResumeParseError(f"Resume is larger than {max_bytes} bytes")
+    return bytes(data)
+
+
+def s3_reference(storage, name, max_bytes=None):
+    """Picklable description of an object in an S3Boto3Storage, read by the parser with ranged GETs"""
+    # S3Boto3Storage prefixes names with its `location`
+    normalize = getattr(storage, '_normalize_name', None)
+    key = normalize(name) if normalize else name
+    return {'s3': {
+        'bucket': storage.bucket_name,
+        'key': key,
+        'region': getattr(storage, 'region_name', None),
+        'endpoint_url': getattr(storage, 'endpoint_url', None),
+        'access_key': getattr(storage, 'access_key', None),
+        'secret_key': getattr(storage, 'secret_key', None),
+        'max_bytes': max_bytes,
+    }}
+
+
+def parser_source(resume_file, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    What to hand the parser for a resume, without copying it to disk
+
+    Returns:
+        tuple: (source, name) where source is a local path, bytes or an S3 reference
+    """
+    if isinstance(resume_file, (str, os.PathLike)):
+        return os.fspath(resume_file), os.fspath(resume_file)
+
+    name = getattr(resume_file, 'name', '') or ''
+    storage = getattr(resume_file, 'storage', None)
+    if storage is not None:
+        # Stored FieldFile: local path when the storage has one, else stream it
+        try:
+            return storage.path(resume_file.name), name
+        except NotImplementedError:
+            pass
+        if hasattr(storage, 'bucket_name'):
+            return s3_reference(storage, resume_file.name, max_bytes), name
+        with storage.open(resume_file.name, 'rb') as handle:
+            return read_bounded(handle, max_bytes), name
+
+    # Uploads: large ones are already spooled to disk by Django, small ones are in memory
+    if hasattr(resume_file, 'temporary_file_path'):
+        return resume_file.temporary_file_path(), name
+    return read_bounded(resume_file, max_bytes), name
+
+
+def extract_text_from_resume(resume_file):
+    """
+    Extract text from resume file (PDF, DOCX, or DOC)
+    
+    Args:
+        resume_file: Django FieldFile, uploaded file, binary file object or path
+        
+    Returns:
+        str: Extracted text from resume
+    """
+    source, name = parser_source(resume_file, get_limits()['max_bytes'])
+    ext = os.path.splitext(name)[1].lower()
+    if ext not in (".pdf", ".docx", ".doc"):
+        raise ValueError(f"Unsupported resume file type: {ext}")
+    return parse_in_subprocess(source, ext)
@@ -0,0 +1,176 @@
+"""
+Background resume processing
+
+A resume upload queues extraction -> embedding -> scoring for the user and
+returns immediately. The run is a Celery task when a broker is configured
+(CELERY_BROKER_URL, or CELERY_TASK_ALWAYS_EAGER for inline execution) and a
+daemon thread in the web process otherwise (also when the broker rejects the
+task). Progress is recorded in ResumeProcessing so the UI can poll it; a run
+that makes no progress for RESUME_PROCESSING_TIMEOUT seconds (its worker
+died or was recycled) is marked failed and queued again.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Resumes yielding less text than this are treated as unreadable
+MIN_RESUME_TEXT_LENGTH = 50
+STALE_ERROR = 'Processing was interrupted; it has been queued again.'
+
+
+def _celery_enabled():
+    from job_portal import celery_app
+
+    return celery_app is not None and bool(
+        getattr(settings, 'CELERY_BROKER_URL', '') or getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False)
+    )
+
+
+def run_resume_pipeline(user_id, top_k=10):
+    """
+    Extract, embed and score the current resume of a user, recording each stage
+
+    Returns:
+        int: Number of recommendations saved
+    """
+    from accounts.models import JobSeekerProfile
+    from .ai_recommender import embed_resume_extract, match_resume_embedding
+    from .models import ResumeProcessing
+    from .resume_store import get_resume_extract
+
+    status, _ = ResumeProcessing.objects.get_or_create(user_id=user_id)
+    try:
+        profile = JobSeekerProfile.objects.select_related('user').get(user_id=user_id)
+        if not profile.resume:
+            status.set_status('done', recommendation_count=0, error='')
+            return 0
+
+        status.set_status('extracting')
+        extract = get_resume_extract(profile.resume)
+        if not extract.text or len(extract.text.strip()) < MIN_RESUME_TEXT_LENGTH:
+            status.set_status('failed', error='Could not read enough text from the resume.')
+            return 0
+
+        status.set_status('embedding')
+        embedding = embed_resume_extract(extract)
+
+        status.set_status('scoring')
+        results = match_resume_embedding(embedding, profile.user, top_k)
+        status.set_status('done', recommendation_count=len(results), error='')
+        logger.info(f"Saved {len(results)} AI recommendations for user {user_id}")
+        return len(results)
+    except Exception as e:
+        logger.error(f"Resume processing failed for user {user_id}: {e}", exc_info=True)
+        status.set_status('failed', error='AI recommendations are temporarily unavailable.')
+        return 0
+
+
+def _run_in_thread(user_id, top_k):
+    try:
+        run_resume_pipeline(user_id, top_k)
+    finally:
+        close_old_connections()
+
+
+def _dispatch(user_id, top_k):
+    """Start the run; runs after commit, so failures are recorded on the row rather than raised"""
+    from .models import ResumeProcessing
+
+    if _celery_enabled():
+        from .tasks import process_resume
+
+        try:
+            result = process_resume.delay(user_id, top_k=top_k)
+        except Exception as e:
+            logger.error(f"Could not queue resume processing for user {user_id}, running it in-process: {e}")
+        else:
+            task_id = getattr(result, 'id', None)
+            if task_id:
+                ResumeProcessing.objects.filter(user_id=user_id).update(task_id=task_id)
+            return
+
+    try:
+        threading.Thread(
+            target=_run_in_thread,
+            args=(user_id, top_k),
+            name=f'resume-pipeline-{user_id}',
+            daemon=True,
+        ).start()
+    except Exception as e:
+        logger.error(f"Could not start resume processing for user {user_id}: {e}")
+        now = timezone.now()
+        ResumeProcessing.objects.filter(user_id=user_id).update(
+            status='failed', error='AI recommendations are temporarily unavailable.', updated_at=now, finished_at=now,
+        )
+
+
+def enqueue_resume_processing(user, top_k=10):
+    """
+    Queue resume processing for a user and return their ResumeProcessing row
+
+    The run is dispatched after the current transaction commits so the worker
+    sees the saved resume.
+    """
+    from .models import ResumeProcessing
+
+    status, _ = ResumeProcessing.objects.update_or_create(
+        user=user,
+        defaults={
+            'status': 'queued',
+            'task_id': '',
+            'recommendation_count': 0,
+            'error': '',
+            'queued_at': timezone.now(),
+            'finished_at': None,
+        },
+    )
+    transaction.on_commit(lambda: _dispatch(user.pk, top_k))
+    return status
+
+
+def recover_stale_processing(status, top_k=10):
+    """
+    Fail and re-queue a pending run with no progress for RESUME_PROCESSING_TIMEOUT seconds
+
+    Returns:
+        ResumeProcessing: The re-queued row, or `status` unchanged when it is not stale
+        (or another request recovered it first)
+    """
+    from .models import ResumeProcessing
+
+    timeout = getattr(settings, 'RESUME_PROCESSING_TIMEOUT', 600)
+    if not status.is_pending or not timeout or status.updated_at > timezone.now() - timedelta(seconds=timeout):
+        return status
+    # Conditional on the row being unchanged, so concurrent polls re-queue it once
+    now = timezone.now()
+    claimed = ResumeProcessing.objects.filter(
+        pk=status.pk, status=status.status, updated_at=status.updated_at,
+    ).update(status='failed', error=STALE_ERROR, updated_at=now, finished_at=now)
+    if not claimed:
+        return ResumeProcessing.objects.get(pk=status.pk)
+    logger.warning(f"Resume processing for user {status.user_id} stalled in '{status.status}'; re-queueing")
+    return enqueue_resume_processing(status.user, top_k)
+
+
+def get_resume_status(user):
+    """JSON-serialisable processing status of a user, or None when nothing was queued"""
+    from .models import ResumeProcessing
+
+    status = ResumeProcessing.objects.filter(user=user).first()
+    if status is None:
+        return None
+    status = recover_stale_processing(status)
+    return {
+        'status': status.status,
+        'label': status.get_status_display(),
+        'pending': status.is_pending,
+        'recommendation_count': status.recommendation_count,
+        'error': status.error,
+        'updated_at': status.updated_at.isoformat(),
+    }
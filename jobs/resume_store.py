@@ -0,0 +1,104 @@
+"""
+Extracted resume text and embedding store
+
+Parsed text (and its embedding) is stored once per distinct resume file in
+ResumeExtract, keyed by the SHA-256 of the file contents. Profiles record the
+hash of their current resume when it is uploaded, so repeat recommendation
+requests skip both parsing and encoding.
+"""
+import hashlib
+import logging
+
+import numpy as np
+
+from .resume_parsing import extract_text_from_resume
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(resume_file):
+    """SHA-256 hex digest of a file, FieldFile, upload or path, read in chunks"""
+    digest = hashlib.sha256()
+    if isinstance(resume_file, str):
+        with open(resume_file, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(64 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    close_after = False
+    if getattr(resume_file, 'closed', False) or getattr(resume_file, '_file', True) is None:
+        resume_file.open('rb')
+        close_after = True
+    try:
+        for chunk in resume_file.chunks():
+            digest.update(chunk)
+    finally:
+        if close_after:
+            resume_file.close()
+        elif hasattr(resume_file, 'seek'):
+            resume_file.seek(0)
+    return digest.hexdigest()
+
+
+def resume_sha256(resume_file):
+    """
+    Hash recorded on the owning profile when available, otherwise hash the file
+
+    Profile resumes saved without a hash (set to an already stored file) are
+    hashed here, in the processing pipeline, and the hash is recorded.
+    """
+    from accounts.models import JobSeekerProfile
+
+    instance = getattr(resume_file, 'instance', None)
+    owned = isinstance(instance, JobSeekerProfile) and instance.resume == resume_file
+    if owned and instance.resume_sha256:
+        return instance.resume_sha256
+    digest = file_sha256(resume_file)
+    if owned and instance.pk:
+        JobSeekerProfile.objects.filter(pk=instance.pk, resume=resume_file.name).update(resume_sha256=digest)
+        instance.resume_sha256 = digest
+    return digest
+
+
+def get_resume_extract(resume_file):
+    """
+    Return the ResumeExtract for a resume, parsing the file only on first use
+
+    Args:
+        resume_file: Django FieldFile, uploaded file or path
+    """
+    from .models import ResumeExtract
+
+    digest = resume_sha256(resume_file)
+    extract = ResumeExtract.objects.filter(sha256=digest).first()
+    if extract is None:
+        text = extract_text_from_resume(resume_file)
+        extract, _ = ResumeExtract.objects.get_or_create(sha256=digest, defaults={'text': text})
+    return extract
+
+
+def get_cached_embedding(extract, model_name):
+    """Stored embedding of an extract for `model_name`, or None"""
+    if extract.embedding and extract.model_name == model_name:
+        return np.frombuffer(bytes(extract.embedding), dtype=np.float32)
+    return None
+
+
+def store_embedding(extract, model_name, vector):
+    extract.embedding = np.asarray(vector, dtype=np.float32).tobytes()
+    extract.model_name = model_name
+    extract.save(update_fields=['embedding', 'model_name'])
+
+
+def discard_extract(sha256, exclude_profile_id=None):
+    """Delete a stored extract unless another profile still uses the same file"""
+    from accounts.models import JobSeekerProfile
+    from .models import ResumeExtract
+
+    if not sha256:
+        return
+    still_used = JobSeekerProfile.objects.filter(resume_sha256=sha256)
+    if exclude_profile_id:
+        still_used = still_used.exclude(pk=exclude_profile_id)
+    if not still_used.exists():
+        ResumeExtract.objects.filter(sha256=sha256).delete()
@@ -0,0 +1,218 @@
+"""
+Job search routing
+
+SEARCH_BACKEND selects how free-text queries are matched and ranked:
+
+- 'auto' (default): the database's full-text index when it has one,
+  otherwise the in-process index
+- 'database': the database's full-text index (jobs.fulltext), MySQL
+  FULLTEXT or SQLite FTS5 depending on the configured engine
+- 'index': in-process BM25 index (jobs.search_index), also used by 'auto'
+  when SEARCH_SEMANTIC_WEIGHT blends in embedding similarity
+
+Search parameters are canonicalised (normalize_search_params) so that equivalent
+searches share facet and result caches; locations the gazetteer knows
+(jobs.locations) become canonical city/region/country ids, so "NYC" and
+"New York, NY" are the same search, and radius_km turns a city into a
+"within X km" search. Result ids are cached per canonical
+query and catalogue generation (search_page), so a repeated search costs one
+id__in fetch for the page.
+"""
+import hashlib
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from core.pagination import CursorPage, cached_count, paginate_keyset, paginate_ranked
+from .catalogue import get_catalogue_generation
+from .locations import get_gazetteer, resolve_location, within_radius
+
+SEARCH_BACKENDS = ('auto', 'database', 'index')
+# Exact-match filters, in the order they appear on the search form
+CHOICE_FILTERS = ('work_mode', 'job_type', 'experience_level')
+# Largest radius_km accepted for "within X km" searches
+MAX_RADIUS_KM = 500
+
+
+def get_search_backend():
+    """Resolved backend name: 'database' or 'index'"""
+    backend = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if backend not in SEARCH_BACKENDS:
+        raise ValueError(f"Unknown SEARCH_BACKEND '{backend}' (expected one of {', '.join(SEARCH_BACKENDS)})")
+    if backend == 'auto':
+        from .fulltext import fulltext_available
+        if getattr(settings, 'SEARCH_SEMANTIC_WEIGHT', 0.0) > 0 or not fulltext_available():
+            return 'index'
+        return 'database'
+    return backend
+
+
+def rank_job_ids(query, queryset):
+    """Ids of jobs in `queryset` matching `query`, most relevant first"""
+    if get_search_backend() == 'database':
+        from .fulltext import search_job_ids
+        return search_job_ids(queryset, query)
+
+    from .search_index import rank_job_ids as rank_with_index
+    return rank_with_index(query, queryset)
+
+
+def _ranking_is_current():
+    if get_search_backend() == 'database':
+        return True
+    from .search_index import index_is_current
+    return index_is_current()
+
+
+def location_parts(location):
+    """Lower-cased, de-duplicated parts of a comma-separated location ("New York, NY" -> ['new york', 'ny'])"""
+    return sorted({part.strip().lower() for part in (location or '').split(',') if part.strip()})
+
+
+def location_filter(location):
+    """
+    Canonical location filter for free text
+
+    Returns:
+        tuple: ('place', {'country', 'region', 'place'}) for a known location (empty
+        ids dropped), ('location', parts) for an unknown one, or (None, None)
+    """
+    place = resolve_location(location)
+    if place.country:
+        return 'place', {
+            name: value for name, value in
+            (('country', place.country), ('region', place.region), ('place', place.place)) if value
+        }
+    parts = location_parts(location)
+    return ('location', parts) if parts else (None, None)
+
+
+def normalize_search_params(params):
+    """
+    Canonical form of search parameters: collapsed lower-case query, canonical
+    place ids (or split location parts for unknown places), a radius around a
+    city, lower-cased choice filters and a normalised salary; empty and
+    invalid values are dropped
+
+    Args:
+        params: QueryDict or dict of request parameters
+
+    Returns:
+        dict: JSON-serialisable, suitable for cache keys and apply_filters()
+    """
+    canonical = {}
+    query = ' '.join((params.get('q') or '').lower().split())
+    if query:
+        canonical['q'] = query
+    name, value = location_filter(params.get('location'))
+    if name:
+        canonical[name] = value
+    try:
+        radius_km = float((params.get('radius_km') or '').strip())
+    except ValueError:
+        radius_km = None
+    # Radius searches need a city's coordinates; regions and countries are matched as a whole
+    if radius_km is not None and 0 < radius_km < float('inf') and 'place' in canonical.get('place', {}):
+        radius_km = min(radius_km, MAX_RADIUS_KM)
+        canonical['radius_km'] = int(radius_km) if radius_km == int(radius_km) else radius_km
+    for name in CHOICE_FILTERS:
+        value = (params.get(name) or '').strip().lower()
+        if value:
+            canonical[name] = value
+    try:
+        salary_min = Decimal((params.get('salary_min') or '').strip())
+    except InvalidOperation:
+        salary_min = None
+    if salary_min is not None and salary_min.is_finite() and salary_min > 0:
+        canonical['salary_min'] = str(salary_min.normalize())
+    return canonical
+
+
+def apply_filters(queryset, canonical):
+    """Restrict a Job queryset by the filters (everything but q) of normalised search params"""
+    if canonical.get('radius_km'):
+        city = get_gazetteer().cities[canonical['place']['place']]
+        queryset = within_radius(queryset, city['lat'], city['lon'], canonical['radius_km'])
+    elif canonical.get('place'):
+        # Canonical ids as a prefix of the job_location index (a city's region may be empty)
+        place = canonical['place']
+        lookups = {'location_country': place['country']}
+        if 'place' in place or 'region' in place:
+            lookups['location_region'] = place.get('region', '')
+        if 'place' in place:
+            lookups['location_place'] = place['place']
+        queryset = queryset.filter(**lookups)
+    if canonical.get('location'):
+        # Unknown places: any part of the comma-separated location
+        location_query = Q()
+        for part in canonical['location']:
+            location_query |= Q(location__icontains=part)
+        queryset = queryset.filter(location_query)
+    for name in CHOICE_FILTERS:
+        if canonical.get(name):
+            queryset = queryset.filter(**{name: canonical[name]})
+    if canonical.get('salary_min'):
+        queryset = queryset.filter(salary_max__gte=Decimal(canonical['salary_min']))
+    return queryset
+
+
+def search_cache_key(kind, canonical, *extra):
+    """Cache key for a canonical search, scoped to the current catalogue generation"""
+    digest = hashlib.sha1(json.dumps([canonical, extra], sort_keys=True).encode()).hexdigest()
+    return f'jobs:search:{kind}:{get_catalogue_generation()}:{digest}'
+
+
+def cached_rank_job_ids(canonical, queryset):
+    """
+    rank_job_ids() for normalised search params, cached per canonical query
+
+    Args:
+        canonical: normalize_search_params output with a 'q'
+        queryset: Open jobs restricted by the same params' filters
+    """
+    key = search_cache_key('ranked', canonical)
+    job_ids = cache.get(key)
+    if job_ids is None:
+        job_ids = rank_job_ids(canonical['q'], queryset)
+        # Very broad queries are re-ranked rather than stored as one huge cache entry, and
+        # rankings from an in-process index still catching up are not cached for this generation
+        if len(job_ids) <= getattr(settings, 'SEARCH_RESULT_CACHE_MAX_IDS', 10000) and _ranking_is_current():
+            cache.set(key, job_ids, getattr(settings, 'SEARCH_RESULT_CACHE_TIMEOUT', 300))
+    return job_ids
+
+
+def search_page(canonical, queryset, cursor=None, page_size=20):
+    """
+    One page of search results: relevance order with a query, newest first without
+
+    Args:
+        canonical: normalize_search_params output
+        queryset: Open jobs with apply_filters(canonical) applied
+        cursor: Pagination cursor from a previous page
+        page_size: Jobs per page
+
+    Returns:
+        CursorPage: Job instances (with company) and a total count
+    Raises:
+        core.pagination.InvalidCursor: Malformed cursor
+    """
+    if canonical.get('q'):
+        page = paginate_ranked(cached_rank_job_ids(canonical, queryset), cursor, page_size)
+    else:
+        key = search_cache_key('page', canonical, cursor, page_size)
+        cached = cache.get(key)
+        if cached is None:
+            # Keys only (served from the listing index); the page's rows are loaded by id below
+            keys = paginate_keyset(queryset.only('id', 'created_at'), cursor, page_size)
+            cached = ([job.id for job in keys], keys.next_cursor, keys.previous_cursor)
+            cache.set(key, cached, getattr(settings, 'SEARCH_RESULT_CACHE_TIMEOUT', 300))
+        page = CursorPage(*cached)
+        page.count = cached_count(queryset, ['search', canonical, get_catalogue_generation()])
+
+    from .models import Job
+    jobs_by_id = Job.objects.select_related('company').in_bulk(page.object_list)
+    page.object_list = [jobs_by_id[job_id] for job_id in page.object_list if job_id in jobs_by_id]
+    return page
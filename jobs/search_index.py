@@ -0,0 +1,267 @@
+"""
+BM25 job search index with optional semantic blending
+
+An in-process inverted index over the open job catalogue
+(jobs.corpus.prepare_job_corpus, with the title weighted up). It replaces
+`icontains` scans with relevance-ranked lookups:
+
+- Kept current incrementally: job save/delete signals update the local
+  index directly, and other processes re-index only jobs whose
+  content_version changed when the catalogue generation moves. That sync
+  runs in a background thread; queries keep using the index meanwhile, and
+  only the very first build happens inline.
+- The last query term also matches as a prefix ("pyth" -> "python"), so
+  search-as-you-type keeps working.
+- With SEARCH_SEMANTIC_WEIGHT > 0 and the AI stack available, BM25 scores
+  are blended with cosine similarity from the job vector index.
+"""
+import bisect
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .catalogue import get_catalogue_generation, refresh_in_background
+from .corpus import prepare_job_corpus
+from .skills import SKILL_ALIASES
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Extra copies of the title in the indexed text
+TITLE_BOOST = 2
+# Vocabulary terms a trailing query prefix may expand to
+MAX_PREFIX_EXPANSIONS = 30
+# Re-sync with the database at least this often (seconds)
+SYNC_INTERVAL = 300
+# Semantic candidates considered when blending
+SEMANTIC_CANDIDATES = 200
+# Matching ids checked against the filter queryset per query
+FILTER_BATCH_SIZE = 1000
+
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have in is it of on or our the to we will with you your'.split()
+)
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*')
+
+_index = None
+_index_lock = threading.RLock()
+
+
+def tokenize(text):
+    """Lower-cased terms with stop words dropped and skill aliases canonicalised (js -> javascript)"""
+    terms = []
+    for token in _TOKEN.findall((text or '').lower()):
+        if token in STOP_WORDS:
+            continue
+        terms.extend(SKILL_ALIASES.get(token, token).split())
+    return terms
+
+
+def job_search_text(job):
+    return " . ".join([str(job.title or '')] * TITLE_BOOST + [prepare_job_corpus(job)])
+
+
+class BM25Index:
+    """Incrementally updatable inverted index with BM25 scoring"""
+
+    def __init__(self):
+        self.postings = {}  # term -> {doc_id: term frequency}
+        self.doc_terms = {}  # doc_id -> Counter of terms (for removal)
+        self.doc_lengths = {}
+        self.versions = {}  # doc_id -> content_version indexed
+        self.total_length = 0
+        self._vocabulary = None  # sorted terms, rebuilt lazily for prefix lookups
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, doc_id, text, version=None):
+        """Index (or re-index) one document"""
+        self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        for term, frequency in counts.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self._vocabulary = None
+            self.postings[term][doc_id] = frequency
+        self.doc_terms[doc_id] = counts
+        self.doc_lengths[doc_id] = length
+        self.versions[doc_id] = version
+        self.total_length += length
+
+    def remove(self, doc_id):
+        counts = self.doc_terms.pop(doc_id, None)
+        if counts is None:
+            return
+        for term in counts:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+                    self._vocabulary = None
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self.versions.pop(doc_id, None)
+
+    def prefix_terms(self, prefix, limit=MAX_PREFIX_EXPANSIONS):
+        """Vocabulary terms starting with `prefix`, most frequent first"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + '\uffff')
+        terms = self._vocabulary[start:end]
+        if len(terms) > limit:
+            terms = sorted(terms, key=lambda term: -len(self.postings[term]))[:limit]
+        return terms
+
+    def query_terms(self, query):
+        """(term, weight) pairs; the final token also matches as a prefix at reduced weight"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        weights = {token: 1.0 for token in tokens}
+        last = tokens[-1]
+        for term in self.prefix_terms(last):
+            if term != last:
+                weights.setdefault(term, 0.5)
+        return list(weights.items())
+
+    def score(self, query):
+        """{doc_id: BM25 score} for documents matching any query term"""
+        count = len(self.doc_lengths)
+        if not count:
+            return {}
+        average_length = self.total_length / count or 1.0
+        scores = {}
+        for term, weight in self.query_terms(query):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5)) * weight
+            for doc_id, frequency in posting.items():
+                norm = K1 * (1 - B + B * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+        return scores
+
+
+class JobSearchIndex(BM25Index):
+    """BM25Index over open jobs, synced with the database by content_version"""
+
+    def __init__(self):
+        super().__init__()
+        self.generation = None
+        self.synced_at = 0.0
+
+    def sync(self):
+        """Re-index changed jobs; database reads run outside _index_lock, index updates inside it"""
+        from .models import Job
+
+        generation = get_catalogue_generation()
+        rows = dict(Job.objects.open().values_list('id', 'content_version'))
+        with _index_lock:
+            for doc_id in [doc_id for doc_id in self.doc_lengths if doc_id not in rows]:
+                self.remove(doc_id)
+            stale = [job_id for job_id, version in rows.items() if self.versions.get(job_id) != version]
+        for start in range(0, len(stale), 1000):
+            jobs = Job.objects.filter(id__in=stale[start:start + 1000]).select_related('company')
+            documents = [(job.id, job_search_text(job), job.content_version) for job in jobs]
+            with _index_lock:
+                for doc_id, text, version in documents:
+                    self.add(doc_id, text, version)
+        if stale:
+            logger.info(f"Search index: re-indexed {len(stale)} jobs ({len(self)} total)")
+        self.generation = generation
+        self.synced_at = time.time()
+
+
+def get_search_index():
+    """Shared JobSearchIndex; built inline once, then synced in the background when the catalogue generation changes"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = JobSearchIndex()
+            index.sync()
+            _index = index
+            return _index
+        index = _index
+    if index.generation != get_catalogue_generation() or time.time() - index.synced_at > SYNC_INTERVAL:
+        refresh_in_background('search-index', index.sync)
+    return index
+
+
+def index_is_current():
+    """Whether the local index has been synced for the current catalogue generation"""
+    index = _index
+    return index is not None and index.generation == get_catalogue_generation()
+
+
+def index_job(job):
+    """Update the local index after a job is saved (no-op until the index is built)"""
+    with _index_lock:
+        if _index is None:
+            return
+        open_job = job.is_active and (job.deadline is None or job.deadline.timestamp() > time.time())
+        if open_job:
+            _index.add(job.id, job_search_text(job), job.content_version)
+        else:
+            _index.remove(job.id)
+
+
+def remove_job(job_id):
+    with _index_lock:
+        if _index is not None:
+            _index.remove(job_id)
+
+
+def _semantic_scores(query):
+    """{job_id: cosine similarity} from the vector index, or {} when the AI stack is unavailable"""
+    try:
+        from .ai_recommender import encode_documents, get_catalogue_index
+        index = get_catalogue_index()
+        query_vector = encode_documents([query], kind='search queries')[0]
+        ids, scores = index.search(query_vector, k=SEMANTIC_CANDIDATES, active_at=time.time())
+        return dict(zip(ids.tolist(), scores.tolist()))
+    except Exception as e:
+        logger.warning(f"Semantic search unavailable, using BM25 only: {e}")
+        return {}
+
+
+def rank_job_ids(query, queryset=None):
+    """
+    Ids of jobs matching `query`, most relevant first
+
+    Args:
+        query: Free-text search query
+        queryset: Optional Job queryset further restricting the results (filters)
+    """
+    index = get_search_index()
+    with _index_lock:
+        scores = index.score(query)
+
+    weight = getattr(settings, 'SEARCH_SEMANTIC_WEIGHT', 0.0)
+    if weight > 0:
+        semantic = _semantic_scores(query)
+        if semantic:
+            top = max(scores.values(), default=0.0) or 1.0
+            scores = {
+                job_id: (1 - weight) * scores.get(job_id, 0.0) / top + weight * max(semantic.get(job_id, 0.0), 0.0)
+                for job_id in set(scores) | set(semantic)
+            }
+
+    if queryset is not None and scores:
+        # Check the hits against the filters, never the whole filtered catalogue
+        hits = list(scores)
+        allowed = set()
+        for start in range(0, len(hits), FILTER_BATCH_SIZE):
+            allowed.update(queryset.filter(id__in=hits[start:start + FILTER_BATCH_SIZE]).values_list('id', flat=True))
+        scores = {job_id: score for job_id, score in scores.items() if job_id in allowed}
+    # Ties keep the newest job first
+    return sorted(scores, key=lambda job_id: (-scores[job_id], -job_id))
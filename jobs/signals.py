@@ -1,10 +1,24 @@
+import logging
+
 from django.conf import settings
 from django.core.mail import send_mail
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
-from accounts.models import User
+from accounts.models import JobSeekerProfile, User
+from companies.models import Company
+from .catalogue import bump_catalogue_generation
+from .locations import location_fields
 from .models import Job
+from .resume_store import discard_extract, file_sha256
+from .search_index import index_job, remove_job
+from .skills import bump_profile_skills_generation, get_skill_ids
+from .suggest import index_job as index_job_suggestions, remove_job as remove_job_suggestions
+from .vector_index import discard_jobs
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=Job)
@@ -53,3 +67,95 @@ def notify_job_seekers_on_new_job(sender, instance: Job, created: bool, **kwargs
         fail_silently=True,
     )
 
+
+
+@receiver(pre_save, sender=Company)
+def bump_job_content_on_company_rename(sender, instance: Company, **kwargs):
+    """
+    The company name is part of every job's corpus, so a rename must bump the
+    content version of its postings (view/application counters never do).
+    """
+    if not instance.pk:
+        return
+
+    previous_name = Company.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+    if previous_name is not None and previous_name != instance.name:
+        Job.objects.filter(company_id=instance.pk).update(
+            content_version=F('content_version') + 1,
+            content_updated_at=timezone.now(),
+        )
+        bump_catalogue_generation()
+
+
+@receiver(post_save, sender=Job)
+def bump_catalogue_on_job_save(sender, instance: Job, **kwargs):
+    # Counter-only updates (increment_views) use queryset.update() and never get here
+    bump_catalogue_generation()
+    index_job(instance)
+    index_job_suggestions(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_deleted_job_from_vector_index(sender, instance: Job, **kwargs):
+    """Keep in-process vector indexes compact; other workers drop it on their next sync"""
+    discard_jobs([instance.id])
+    remove_job(instance.id)
+    remove_job_suggestions(instance.id)
+    bump_catalogue_generation()
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+def sync_profile_skill_ids(sender, instance: JobSeekerProfile, **kwargs):
+    """Keep the canonical skill ids of a profile in step with its free-form skills"""
+    skill_ids = get_skill_ids(instance.skills)
+    if skill_ids != instance.skill_ids:
+        JobSeekerProfile.objects.filter(pk=instance.pk).update(skill_ids=skill_ids)
+        instance.skill_ids = skill_ids
+        bump_profile_skills_generation()
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+def sync_profile_location(sender, instance: JobSeekerProfile, **kwargs):
+    """Keep the canonical location of a profile in step with its free-text location"""
+    fields = location_fields(instance.location)
+    del fields['geohash']
+    if any(getattr(instance, name) != value for name, value in fields.items()):
+        JobSeekerProfile.objects.filter(pk=instance.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(instance, name, value)
+
+
+@receiver(pre_save, sender=JobSeekerProfile)
+def remember_previous_resume(sender, instance: JobSeekerProfile, **kwargs):
+    """
+    Remember the stored resume and hash a new upload before storage saves it
+
+    The upload is hashed from its local chunks (memory or temp file), so remote
+    storage is never read back. A resume set to an already stored file is left
+    unhashed; the processing pipeline hashes it on first use.
+    """
+    instance._previous_resume = None
+    if instance.pk:
+        instance._previous_resume = JobSeekerProfile.objects.filter(
+            pk=instance.pk
+        ).values_list('resume', 'resume_sha256').first()
+
+    previous_name = (instance._previous_resume or ('', ''))[0] or ''
+    if instance.resume and not instance.resume._committed:
+        try:
+            instance.resume_sha256 = file_sha256(instance.resume.file)
+        except Exception as e:
+            logger.warning(f"Could not hash resume upload of profile {instance.pk}: {e}")
+            instance.resume_sha256 = ''
+    elif (instance.resume.name if instance.resume else '') != previous_name:
+        instance.resume_sha256 = ''
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+def track_resume_hash(sender, instance: JobSeekerProfile, update_fields=None, **kwargs):
+    """Drop the cached text and embedding of the resume a new one replaced"""
+    _, previous_sha256 = getattr(instance, '_previous_resume', None) or ('', '')
+    if update_fields and 'resume' in update_fields and 'resume_sha256' not in update_fields:
+        JobSeekerProfile.objects.filter(pk=instance.pk).update(resume_sha256=instance.resume_sha256)
+    if previous_sha256 and previous_sha256 != instance.resume_sha256:
+        discard_extract(previous_sha256, exclude_profile_id=instance.pk)
@@ -0,0 +1,201 @@
+"""
+Canonical skill vocabulary and sparse skill matrices
+
+Free-form skill strings from Job.skills_required and JobSeekerProfile.skills
+are normalised (case, whitespace, aliases such as "js" -> "javascript") and
+mapped to integer ids backed by the Skill table. The ids are stored on each
+row (skill_ids) when it is saved, and in-process CSR matrices (job x skill,
+profile x skill) are built from them so that overlap scoring, related-job
+lookup and skill filtering are sparse-matrix operations.
+"""
+import re
+import time
+
+import numpy as np
+from django.core.cache import cache
+from scipy import sparse
+
+from .catalogue import get_catalogue_generation
+
+# Alias -> canonical skill name (all lower case)
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'nextjs': 'next.js',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'dotnet': '.net',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'ms excel': 'excel',
+    'drf': 'django rest framework',
+    'html5': 'html',
+    'css3': 'css',
+    'sklearn': 'scikit-learn',
+    'tf': 'tensorflow',
+}
+
+# Rebuild in-process matrices at least this often (seconds)
+MATRIX_REBUILD_INTERVAL = 300
+PROFILE_SKILLS_GENERATION_KEY = 'jobs:profile_skills_generation'
+
+_WHITESPACE = re.compile(r'\s+')
+_skill_ids = {}  # canonical name -> Skill.id
+_matrices = {}  # name -> (generation, built_at, SkillMatrix)
+
+
+def normalize_skill(name):
+    """Canonical form of a skill name, or '' when empty"""
+    name = _WHITESPACE.sub(' ', str(name).strip().lower())
+    return SKILL_ALIASES.get(name, name)
+
+
+def normalize_skills(names):
+    """Canonical, de-duplicated skill names in their original order"""
+    seen = []
+    for name in names or []:
+        canonical = normalize_skill(name)
+        if canonical and canonical not in seen:
+            seen.append(canonical)
+    return seen
+
+
+def get_skill_ids(names, create=True):
+    """
+    Integer ids for a list of skill names (canonicalised and de-duplicated)
+
+    Args:
+        names: Iterable of free-form skill strings
+        create: Add unknown skills to the vocabulary; when False they are dropped
+    """
+    from .models import Skill
+
+    canonical = normalize_skills(names)
+    missing = [name for name in canonical if name not in _skill_ids]
+    if missing:
+        for name, skill_id in Skill.objects.filter(name__in=missing).values_list('name', 'id'):
+            _skill_ids[name] = skill_id
+        unknown = [name for name in missing if name not in _skill_ids]
+        if unknown and create:
+            Skill.objects.bulk_create([Skill(name=name) for name in unknown], ignore_conflicts=True)
+            for name, skill_id in Skill.objects.filter(name__in=unknown).values_list('name', 'id'):
+                _skill_ids[name] = skill_id
+    return [_skill_ids[name] for name in canonical if name in _skill_ids]
+
+
+class SkillMatrix:
+    """Sparse entity x skill incidence matrix (CSR) with id <-> row lookups"""
+
+    def __init__(self, entity_ids, skill_id_lists):
+        self.ids = np.asarray(entity_ids, dtype=np.int64)
+        self.row_of = {int(entity_id): row for row, entity_id in enumerate(self.ids)}
+        indptr = np.zeros(len(skill_id_lists) + 1, dtype=np.int64)
+        indices = []
+        for row, skill_ids in enumerate(skill_id_lists):
+            unique_ids = sorted(set(skill_ids or []))
+            indices.extend(unique_ids)
+            indptr[row + 1] = indptr[row] + len(unique_ids)
+        indices = np.asarray(indices, dtype=np.int64)
+        n_skills = int(indices.max()) + 1 if indices.size else 0
+        self.matrix = sparse.csr_matrix(
+            (np.ones(indices.shape[0], dtype=np.int32), indices, indptr),
+            shape=(len(skill_id_lists), n_skills),
+        )
+        self.skill_counts = np.diff(indptr)
+        self._by_skill = None
+
+    def __len__(self):
+        return self.ids.shape[0]
+
+    def skill_vector(self, skill_ids):
+        """Dense 0/1 vector over this matrix's skill columns"""
+        vector = np.zeros(self.matrix.shape[1], dtype=np.int32)
+        columns = [skill_id for skill_id in set(skill_ids or []) if skill_id < vector.shape[0]]
+        vector[columns] = 1
+        return vector
+
+    def overlap(self, skill_ids):
+        """Number of shared skills between every row and `skill_ids`"""
+        return self.matrix @ self.skill_vector(skill_ids)
+
+    def overlap_many(self, skill_id_lists):
+        """Overlap counts (rows x len(skill_id_lists)) in one sparse product"""
+        other = SkillMatrix(range(len(skill_id_lists)), skill_id_lists).matrix
+        other.resize((other.shape[0], self.matrix.shape[1]))
+        return (self.matrix @ other.T).toarray()
+
+    def ids_with_any(self, skill_ids):
+        """Entity ids having at least one of `skill_ids` (CSC column lookup)"""
+        if self._by_skill is None:
+            self._by_skill = self.matrix.tocsc()
+        columns = [skill_id for skill_id in set(skill_ids) if skill_id < self.matrix.shape[1]]
+        if not columns:
+            return []
+        rows = np.unique(self._by_skill[:, columns].indices)
+        return self.ids[rows].tolist()
+
+    def related(self, skill_ids, exclude_id=None, limit=5):
+        """Ids of rows sharing the most of `skill_ids`, best first (ties keep row order)"""
+        overlap = np.asarray(self.overlap(skill_ids)).ravel()
+        if exclude_id in self.row_of:
+            overlap[self.row_of[exclude_id]] = 0
+        candidates = np.flatnonzero(overlap)
+        ranked = candidates[np.argsort(-overlap[candidates], kind='stable')][:limit]
+        return self.ids[ranked].tolist()
+
+
+def _cached_matrix(name, generation, build):
+    cached = _matrices.get(name)
+    if cached is None or cached[0] != generation or time.time() - cached[1] > MATRIX_REBUILD_INTERVAL:
+        cached = (generation, time.time(), build())
+        _matrices[name] = cached
+    return cached[2]
+
+
+def get_job_skill_matrix():
+    """Sparse job x skill matrix over open jobs, in listing order (-created_at)"""
+    from .models import Job
+
+    def build():
+        rows = list(Job.objects.open().order_by('-created_at').values_list('id', 'skill_ids'))
+        return SkillMatrix([row[0] for row in rows], [row[1] for row in rows])
+
+    return _cached_matrix('jobs', get_catalogue_generation(), build)
+
+
+def get_profile_skill_matrix():
+    """Sparse job-seeker-profile x skill matrix"""
+    from accounts.models import JobSeekerProfile
+
+    def build():
+        rows = list(JobSeekerProfile.objects.values_list('id', 'skill_ids'))
+        return SkillMatrix([row[0] for row in rows], [row[1] for row in rows])
+
+    return _cached_matrix('profiles', cache.get(PROFILE_SKILLS_GENERATION_KEY, 0), build)
+
+
+def bump_profile_skills_generation():
+    try:
+        cache.incr(PROFILE_SKILLS_GENERATION_KEY)
+    except ValueError:
+        cache.add(PROFILE_SKILLS_GENERATION_KEY, 1, None)
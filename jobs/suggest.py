@@ -0,0 +1,237 @@
+"""
+Search-as-you-type suggestions
+
+An in-process prefix index over the open jobs' titles, skills, company names
+and locations. Each distinct phrase is stored once with the set of jobs that
+use it; every word start of the phrase is a key in one sorted list, so
+"eng" finds both "Engineering Manager" and "Senior Engineer" with a bisect
+and a short scan. Lookups never touch the database:
+
+- Job save/delete signals update the local index directly, and other
+  processes re-index only jobs whose content_version changed when the
+  catalogue generation moves (checked at most once per
+  SUGGEST_GENERATION_CHECK_INTERVAL seconds). That sync runs in a background
+  thread; lookups keep using the index meanwhile, and only the very first
+  build happens inline.
+- Phrases are ranked by the number of open jobs using them.
+"""
+import bisect
+import heapq
+import logging
+import re
+import threading
+import time
+
+from .catalogue import get_catalogue_generation, refresh_in_background
+from .skills import normalize_skill
+
+logger = logging.getLogger(__name__)
+
+SUGGESTION_KINDS = ('titles', 'skills', 'companies', 'locations')
+# Keys examined per lookup, bounding the cost of very short prefixes
+MAX_SCAN = 500
+# Prefix lookups remembered between index changes
+RESULT_CACHE_SIZE = 10000
+# Re-sync with the database at least this often (seconds)
+SYNC_INTERVAL = 300
+# Suggestions may lag other processes' job edits by this much (seconds)
+SUGGEST_GENERATION_CHECK_INTERVAL = 1.0
+
+_WORD_START = re.compile(r'(?:^|(?<=[\s,/(-]))\w', re.UNICODE)
+_WHITESPACE = re.compile(r'\s+')
+
+_index = None
+_index_lock = threading.RLock()
+
+
+def normalize_phrase(text):
+    return _WHITESPACE.sub(' ', str(text or '').strip().lower())
+
+
+def job_phrases(job):
+    """(kind, key, label) for every suggestible phrase of a job"""
+    phrases = [('titles', normalize_phrase(job.title), str(job.title or '').strip())]
+    phrases.extend(
+        ('skills', normalize_skill(skill), str(skill).strip())
+        for skill in job.skills_required or []
+    )
+    phrases.append(('companies', normalize_phrase(job.company.name), job.company.name.strip()))
+    phrases.append(('locations', normalize_phrase(job.location), str(job.location or '').strip()))
+    return [(kind, key, label) for kind, key, label in phrases if key]
+
+
+class SuggestIndex:
+    """Phrase -> job ids, with a sorted list of (word-start suffix, kind, phrase) keys for prefix lookups"""
+
+    def __init__(self):
+        self.phrases = {}  # (kind, phrase) -> [label, set of job ids]
+        self.doc_phrases = {}  # job id -> [(kind, phrase), ...]
+        self.versions = {}  # job id -> content_version indexed
+        self._keys = []
+        self._results = {}  # (prefix, limit) -> suggestions, cleared on every change
+        self._bulk = False
+
+    def __len__(self):
+        return len(self.doc_phrases)
+
+    def _suffixes(self, phrase):
+        return {phrase[match.start():] for match in _WORD_START.finditer(phrase)} or {phrase}
+
+    def add(self, job_id, phrases, version=None):
+        """Index (or re-index) one job's phrases"""
+        self.remove(job_id)
+        entries = []
+        for kind, phrase, label in phrases:
+            entry = self.phrases.get((kind, phrase))
+            if entry is None:
+                entry = self.phrases[(kind, phrase)] = [label, set()]
+                for suffix in self._suffixes(phrase):
+                    if self._bulk:
+                        self._keys.append((suffix, kind, phrase))
+                    else:
+                        bisect.insort(self._keys, (suffix, kind, phrase))
+            entry[1].add(job_id)
+            entries.append((kind, phrase))
+        self.doc_phrases[job_id] = entries
+        self.versions[job_id] = version
+        self._results.clear()
+
+    def add_many(self, items):
+        """Index many (job_id, phrases, version) at once, sorting the keys once at the end"""
+        items = list(items)
+        # Removals bisect the keys, so drop old entries while they are still sorted
+        for job_id, _, _ in items:
+            self.remove(job_id)
+        self._bulk = True
+        try:
+            for job_id, phrases, version in items:
+                self.add(job_id, phrases, version)
+        finally:
+            self._bulk = False
+            self._keys.sort()
+
+    def remove(self, job_id):
+        for kind, phrase in self.doc_phrases.pop(job_id, []):
+            entry = self.phrases.get((kind, phrase))
+            if entry is None:
+                continue
+            entry[1].discard(job_id)
+            if not entry[1]:
+                del self.phrases[(kind, phrase)]
+                for suffix in self._suffixes(phrase):
+                    position = bisect.bisect_left(self._keys, (suffix, kind, phrase))
+                    if position < len(self._keys) and self._keys[position] == (suffix, kind, phrase):
+                        del self._keys[position]
+        self.versions.pop(job_id, None)
+        self._results.clear()
+
+    def suggest(self, prefix, limit=5):
+        """
+        Phrases with a word starting with `prefix`, grouped by kind
+
+        Returns:
+            dict: kind -> [{'text', 'count'}, ...]; phrases that start with the
+            prefix come first, then the most used
+        """
+        prefix = normalize_phrase(prefix)
+        cached = self._results.get((prefix, limit))
+        if cached is not None:
+            return cached
+        results = {kind: [] for kind in SUGGESTION_KINDS}
+        if prefix:
+            matches = {kind: {} for kind in SUGGESTION_KINDS}
+            start = bisect.bisect_left(self._keys, (prefix,))
+            end = bisect.bisect_left(
+                self._keys, (prefix + '\uffff',), start, min(start + MAX_SCAN, len(self._keys))
+            )
+            for suffix, kind, phrase in self._keys[start:end]:
+                leading = suffix == phrase
+                if leading or phrase not in matches[kind]:
+                    matches[kind][phrase] = leading
+            for kind, phrases in matches.items():
+                best = heapq.nsmallest(
+                    limit, phrases.items(),
+                    key=lambda item, kind=kind: (not item[1], -len(self.phrases[(kind, item[0])][1]), item[0]),
+                )
+                for phrase, _ in best:
+                    label, job_ids = self.phrases[(kind, phrase)]
+                    results[kind].append({'text': label, 'count': len(job_ids)})
+        if len(self._results) >= RESULT_CACHE_SIZE:
+            self._results.clear()
+        self._results[(prefix, limit)] = results
+        return results
+
+
+class JobSuggestIndex(SuggestIndex):
+    """SuggestIndex over open jobs, synced with the database by content_version"""
+
+    def __init__(self):
+        super().__init__()
+        self.generation = None
+        self.synced_at = 0.0
+        self.checked_at = 0.0
+
+    def sync(self):
+        """Re-index changed jobs; database reads run outside _index_lock, index updates inside it"""
+        from .models import Job
+
+        generation = get_catalogue_generation()
+        rows = dict(Job.objects.open().values_list('id', 'content_version'))
+        with _index_lock:
+            for job_id in [job_id for job_id in self.doc_phrases if job_id not in rows]:
+                self.remove(job_id)
+            stale = [job_id for job_id, version in rows.items() if self.versions.get(job_id) != version]
+        for start in range(0, len(stale), 1000):
+            jobs = Job.objects.filter(id__in=stale[start:start + 1000]).select_related('company')
+            items = [(job.id, job_phrases(job), job.content_version) for job in jobs]
+            with _index_lock:
+                self.add_many(items)
+        if stale:
+            logger.info(f"Suggest index: re-indexed {len(stale)} jobs ({len(self)} total)")
+        self.generation = generation
+        self.synced_at = self.checked_at = time.time()
+
+
+def get_suggest_index():
+    """Shared JobSuggestIndex; built inline once, then synced in the background when the catalogue generation changes"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = JobSuggestIndex()
+            index.sync()
+            _index = index
+            return _index
+        index = _index
+    now = time.time()
+    if now - index.synced_at > SYNC_INTERVAL:
+        refresh_in_background('suggest-index', index.sync)
+    elif now - index.checked_at > SUGGEST_GENERATION_CHECK_INTERVAL:
+        index.checked_at = now
+        if index.generation != get_catalogue_generation():
+            refresh_in_background('suggest-index', index.sync)
+    return index
+
+
+def index_job(job):
+    """Update the local index after a job is saved (no-op until the index is built)"""
+    with _index_lock:
+        if _index is None:
+            return
+        open_job = job.is_active and (job.deadline is None or job.deadline.timestamp() > time.time())
+        if open_job:
+            _index.add(job.id, job_phrases(job), job.content_version)
+        else:
+            _index.remove(job.id)
+
+
+def remove_job(job_id):
+    with _index_lock:
+        if _index is not None:
+            _index.remove(job_id)
+
+
+def suggest(prefix, limit=5):
+    """Title, skill, company and location suggestions for a partial query"""
+    index = get_suggest_index()
+    with _index_lock:
+        return index.suggest(prefix, limit)
@@ -0,0 +1,58 @@
+"""
+Background tasks for the jobs app
+
+Run under Celery when it is installed (celery -A job_portal worker); without
+Celery the tasks are plain functions and `.delay()` runs them inline.
+"""
+import logging
+
+try:
+    from celery import shared_task
+except ImportError:
+    def shared_task(*args, **kwargs):
+        """Fallback decorator used when celery is not installed"""
+        def decorator(func):
+            func.delay = func
+            func.apply_async = lambda args=(), kwargs=None, **options: func(*args, **(kwargs or {}))
+            return func
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return decorator(args[0])
+        return decorator
+
+logger = logging.getLogger(__name__)
+
+
+def _report_progress(processed, total, last_profile_id):
+    """Expose batch progress as Celery task state (PROGRESS) when running in a worker"""
+    try:
+        from celery import current_task
+    except ImportError:
+        return
+    if current_task and current_task.request.id:
+        current_task.update_state(state='PROGRESS', meta={
+            'processed': processed,
+            'total': total,
+            'last_profile_id': last_profile_id,
+        })
+
+
+@shared_task
+def recompute_recommendations(chunk_size=64, workers=4, top_k=20, resume=True):
+    """Recompute AI recommendations for every job seeker (resumes from the last checkpoint)"""
+    from .batch_recommender import recompute_recommendations as run
+
+    return run(
+        chunk_size=chunk_size,
+        workers=workers,
+        top_k=top_k,
+        resume=resume,
+        progress=_report_progress,
+    )
+
+
+@shared_task
+def process_resume(user_id, top_k=10):
+    """Extract, embed and score a user's uploaded resume (queued on upload)"""
+    from .resume_pipeline import run_resume_pipeline
+
+    return run_resume_pipeline(user_id, top_k=top_k)
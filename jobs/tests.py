@@ -0,0 +1,335 @@
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+import numpy as np
+from django.db.models import Count
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from companies.models import Company
+from core.pagination import InvalidCursor, encode_cursor, paginate_keyset, paginate_ranked
+from jobs.facets import LOCATION_FILTERS, build_facet_index
+from jobs.locations import locations_match, resolve_location
+from jobs.matching import JobCatalogue, UserFeatures
+from jobs.models import Job
+from jobs.search import CHOICE_FILTERS, apply_filters, normalize_search_params
+from jobs.skills import normalize_skills
+from jobs.utils import calculate_job_match_score
+from jobs.vector_index import ExactIndex, IVFIndex
+
+
+class ResolveLocationTests(SimpleTestCase):
+
+    def assertResolves(self, text, place='', region='', country=''):
+        resolved = resolve_location(text)
+        self.assertEqual((resolved.place, resolved.region, resolved.country), (place, region, country), text)
+
+    def test_aliases_share_a_place(self):
+        for text in ('NYC', 'New York, NY', 'new york', 'Brooklyn, NY'):
+            self.assertResolves(text, 'us-ny-new-york', 'us-ny', 'us')
+
+    def test_country_code_that_is_also_a_state_code(self):
+        self.assertResolves('Berlin, DE', 'de-berlin', '', 'de')
+        self.assertResolves('Toronto, CA', 'ca-on-toronto', 'ca-on', 'ca')
+        self.assertResolves('Mumbai, IN', 'in-mh-mumbai', 'in-mh', 'in')
+
+    def test_state_code_still_resolves_us_cities(self):
+        self.assertResolves('San Francisco, CA', 'us-ca-san-francisco', 'us-ca', 'us')
+        self.assertResolves('Indianapolis, IN', 'us-in-indianapolis', 'us-in', 'us')
+
+    def test_city_disambiguated_by_region_or_country(self):
+        self.assertResolves('Cambridge, MA', 'us-ma-cambridge', 'us-ma', 'us')
+        self.assertResolves('Cambridge, UK', 'gb-eng-cambridge', 'gb-eng', 'gb')
+
+    def test_unknown_city_falls_back_to_region(self):
+        self.assertResolves('Paris, TX', '', 'us-tx', 'us')
+        self.assertResolves('Dover, DE', '', 'us-de', 'us')
+        self.assertResolves('London, ON, Canada', '', 'ca-on', 'ca')
+
+    def test_unknown_location(self):
+        self.assertResolves('Remote')
+        self.assertResolves('')
+
+
+class LocationsMatchTests(SimpleTestCase):
+
+    class Located:
+        def __init__(self, location):
+            place = resolve_location(location)
+            self.location = location
+            self.location_place, self.location_region, self.location_country = place.place, place.region, place.country
+            self.latitude, self.longitude = place.latitude, place.longitude
+
+    def test_country_code_does_not_match_us_state(self):
+        self.assertFalse(locations_match(self.Located('Wilmington, Delaware'), self.Located('Berlin, DE')))
+        self.assertTrue(locations_match(self.Located('Germany'), self.Located('Berlin, DE')))
+
+    def test_nearby_city_matches(self):
+        self.assertTrue(locations_match(self.Located('NYC'), self.Located('Jersey City, NJ')))
+        self.assertFalse(locations_match(self.Located('NYC'), self.Located('Boston, MA')))
+
+
+class MatchingParityTests(SimpleTestCase):
+    """JobCatalogue must score and explain exactly like calculate_job_match_score"""
+
+    skill_ids = {}
+
+    def ids_for(self, names):
+        return [self.skill_ids.setdefault(name, len(self.skill_ids)) for name in normalize_skills(names)]
+
+    def located(self, location, **fields):
+        place = resolve_location(location)
+        return SimpleNamespace(
+            location=location, location_place=place.place, location_region=place.region,
+            location_country=place.country, latitude=place.latitude, longitude=place.longitude, **fields,
+        )
+
+    def profile(self, skills, experience, location, education=(), resume=''):
+        return self.located(
+            location, skills=skills, skill_ids=self.ids_for(skills), experience_years=experience,
+            education=list(education), resume=resume,
+        )
+
+    def job(self, job_id, skills, experience_level, work_mode, location):
+        return self.located(
+            location, id=job_id, skills_required=skills, skill_ids=self.ids_for(skills),
+            experience_level=experience_level, work_mode=work_mode, deadline=None,
+        )
+
+    def test_scores_and_reasons_match_reference(self):
+        jobs = [
+            self.job(1, ['Python', 'Django', 'PostgreSQL'], 'mid', 'onsite', 'New York, NY'),
+            self.job(2, ['JS', 'React'], 'entry', 'remote', 'Berlin, DE'),
+            self.job(3, [], 'senior', 'hybrid', 'Brooklyn, NY'),
+            self.job(4, ['python3', 'k8s'], 'executive', 'remote', ''),
+            self.job(5, ['Go'], 'senior', 'onsite', 'Paris, TX'),
+            self.job(6, ['py', 'ml'], 'mid', 'onsite', 'Some Startup Hub'),
+            self.job(7, ['React', 'TypeScript'], 'entry', 'remote', 'Jersey City, NJ'),
+        ]
+        profiles = [
+            self.profile(['python', 'Django'], 3, 'NYC', education=[{'degree': 'BSc'}], resume='cv.pdf'),
+            self.profile(['javascript', 'reactjs', 'ts'], 1, 'Germany'),
+            self.profile([], 0, ''),
+            self.profile(['Golang', 'Kubernetes'], 5, 'Texas', resume='cv.pdf'),
+            self.profile(['Machine Learning'], 8, 'startup hub'),
+            self.profile(['Python'], 12, 'Boston, MA', education=[{'degree': 'PhD'}]),
+        ]
+        catalogue = JobCatalogue(
+            (job.id, job.skill_ids, job.experience_level, job.work_mode, job.location, job.deadline,
+             job.location_place, job.location_region, job.location_country, job.latitude, job.longitude)
+            for job in jobs
+        )
+        rows = range(len(jobs))
+        matrix = catalogue.score_many(profiles)
+        for i, profile in enumerate(profiles):
+            user = SimpleNamespace(job_seeker_profile=profile)
+            reasons = catalogue.reasons(profile, rows)
+            scores = catalogue.score(profile)
+            for row, job in enumerate(jobs):
+                expected_score, expected_reasons = calculate_job_match_score(user, job)
+                label = f'profile {i}, job {job.id}'
+                self.assertAlmostEqual(scores[row], expected_score, msg=label)
+                self.assertAlmostEqual(matrix[i, row], expected_score, msg=label)
+                self.assertEqual(reasons[row], expected_reasons, label)
+                self.assertEqual(catalogue._location_match(UserFeatures(profile))[row], locations_match(profile, job), label)
+
+
+class VectorIndexTests(SimpleTestCase):
+
+    def clustered(self, n, dimensions=32, clusters=64, seed=0):
+        rng = np.random.default_rng(seed)
+        centres = rng.normal(size=(clusters, dimensions))
+        return centres[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dimensions))
+
+    def build(self, index, vectors, deadlines=None):
+        ids = list(range(1, len(vectors) + 1))
+        index.add(ids, vectors, [1] * len(ids), deadlines)
+        return index
+
+    def test_ivf_recall_against_exact(self):
+        vectors = self.clustered(4096)
+        exact = self.build(ExactIndex(dtype='float32'), vectors)
+        ivf = self.build(IVFIndex(dtype='float32', nprobe=16), vectors)
+        self.assertIsNotNone(ivf._centroids)
+        queries = self.clustered(50, seed=1)
+        found = total = 0
+        for query in queries:
+            expected, _ = exact.search(query, k=10)
+            ids, scores = ivf.search(query, k=10)
+            self.assertEqual(list(scores), sorted(scores, reverse=True))
+            found += len(set(ids) & set(expected))
+            total += len(expected)
+        self.assertGreaterEqual(found / total, 0.9)
+
+    def test_untrained_ivf_is_exact(self):
+        vectors = self.clustered(500)
+        exact = self.build(ExactIndex(dtype='float32'), vectors)
+        ivf = self.build(IVFIndex(dtype='float32'), vectors)
+        self.assertIsNone(ivf._centroids)
+        for query in self.clustered(10, seed=2):
+            self.assertEqual(list(ivf.search(query, k=10)[0]), list(exact.search(query, k=10)[0]))
+
+    def test_search_skips_removed_excluded_and_expired_jobs(self):
+        vectors = self.clustered(3000)
+        deadlines = [100.0 if job_id % 10 == 0 else None for job_id in range(1, 3001)]
+        for index in (ExactIndex(dtype='float32'), IVFIndex(dtype='float32')):
+            self.build(index, vectors, deadlines)
+            removed, excluded = set(range(1, 3001, 7)), set(range(2, 3001, 7))
+            index.remove(list(removed))
+            for query in self.clustered(10, seed=3):
+                ids, _ = index.search(query, k=20, exclude_ids=excluded, active_at=200.0)
+                self.assertEqual(len(ids), 20)
+                for job_id in ids:
+                    self.assertNotIn(job_id, removed | excluded)
+                    self.assertNotEqual(job_id % 10, 0)
+
+    def test_concurrent_updates_and_searches(self):
+        index = self.build(IVFIndex(dtype='float32'), self.clustered(2500))
+        vectors = self.clustered(600, seed=4)
+        errors = []
+
+        def update():
+            try:
+                for start in range(0, 600, 50):
+                    ids = list(range(10001 + start, 10051 + start))
+                    index.add(ids, vectors[start:start + 50], [1] * 50)
+                    index.remove(ids[:25])
+            except Exception as e:
+                errors.append(e)
+
+        def search():
+            try:
+                for query in self.clustered(100, seed=5):
+                    ids, scores = index.search(query, k=5)
+                    self.assertEqual(len(ids), len(scores))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=update)] + [threading.Thread(target=search) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(index), 2500 + 300)
+
+
+class CatalogueTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        employer = User.objects.create_user('employer@example.com', 'pw', user_type='employer')
+        cls.company = Company.objects.create(user=employer, name='Acme')
+
+    @classmethod
+    def create_job(cls, title, **fields):
+        fields.setdefault('location', 'New York, NY')
+        return Job.objects.create(
+            company=cls.company, title=title, description=title, requirements='', **fields
+        )
+
+
+class KeysetPaginationTests(CatalogueTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(23):
+            cls.create_job(f'Job {i}')
+        # Ties on created_at must be broken by id
+        tied = timezone.now() - timedelta(days=1)
+        Job.objects.filter(id__in=Job.objects.order_by('id').values('id')[5:15]).update(created_at=tied)
+        cls.expected = list(Job.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def test_forward_and_backward_walk(self):
+        pages, cursor = [], None
+        while True:
+            page = paginate_keyset(Job.objects.all(), cursor, page_size=5)
+            pages.append([job.id for job in page])
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual([len(ids) for ids in pages], [5, 5, 5, 5, 3])
+        self.assertIsNotNone(page.previous_cursor)
+
+        backwards = []
+        while page.has_previous():
+            page = paginate_keyset(Job.objects.all(), page.previous_cursor, page_size=5)
+            backwards.insert(0, [job.id for job in page])
+        self.assertEqual(backwards, pages[:-1])
+        self.assertFalse(page.has_previous())
+
+    def test_cursor_skips_deleted_boundary_row(self):
+        first = paginate_keyset(Job.objects.all(), page_size=5)
+        Job.objects.filter(id=first.object_list[-1].id).delete()
+        second = paginate_keyset(Job.objects.all(), first.next_cursor, page_size=5)
+        self.assertEqual([job.id for job in second], self.expected[5:10])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-a-cursor', encode_cursor([1, 2]), encode_cursor({'p': ['x']}), encode_cursor({'p': ['x', 1]})):
+            with self.assertRaises(InvalidCursor, msg=cursor):
+                paginate_keyset(Job.objects.all(), cursor, page_size=5)
+
+    def test_ranked_pages(self):
+        ids = list(range(12))
+        first = paginate_ranked(ids, page_size=5)
+        second = paginate_ranked(ids, first.next_cursor, page_size=5)
+        last = paginate_ranked(ids, second.next_cursor, page_size=5)
+        self.assertEqual((first.object_list, second.object_list, last.object_list), (ids[:5], ids[5:10], ids[10:]))
+        self.assertIsNone(last.next_cursor)
+        self.assertEqual(paginate_ranked(ids, last.previous_cursor, page_size=5).object_list, ids[5:10])
+        self.assertEqual(first.count, 12)
+
+
+class FacetCountTests(CatalogueTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        combinations = [
+            ('remote', 'full_time', 'entry', 'Berlin, DE', 40000),
+            ('remote', 'contract', 'mid', 'New York, NY', 90000),
+            ('onsite', 'full_time', 'mid', 'Brooklyn, NY', 120000),
+            ('hybrid', 'part_time', 'senior', 'Boston, MA', None),
+            ('onsite', 'full_time', 'senior', 'San Francisco, CA', 160000),
+            ('remote', 'internship', 'entry', 'Some Startup Hub', 30000),
+        ]
+        for i in range(30):
+            work_mode, job_type, level, location, salary = combinations[i % len(combinations)]
+            cls.create_job(
+                f'Job {i}', work_mode=work_mode, job_type=job_type, experience_level=level,
+                location=location, salary_max=salary and salary + i,
+            )
+        cls.create_job('Closed', work_mode='remote', is_active=False)
+        cls.create_job('Expired', work_mode='remote', deadline=timezone.now() - timedelta(days=1))
+
+    def assertCountsMatchOrm(self, params):
+        canonical = normalize_search_params(params)
+        index = build_facet_index()
+        counts = index.counts(index.open_mask(), canonical)
+        self.assertEqual(counts['total'], apply_filters(Job.objects.open(), canonical).count())
+
+        def without(*names):
+            return apply_filters(Job.objects.open(), {k: v for k, v in canonical.items() if k not in names})
+
+        for name in CHOICE_FILTERS:
+            expected = dict(without(name).order_by().values_list(name).annotate(count=Count('id')))
+            self.assertEqual({item['value']: item['count'] for item in counts[name]}, expected, (params, name))
+        for item in counts['salary_min']:
+            expected = without('salary_min').filter(salary_max__gte=item['value']).count()
+            self.assertEqual(item['count'], expected, (params, item['value']))
+        for item in counts['location']:
+            location = normalize_search_params({'location': item['value']})
+            expected = apply_filters(without(*LOCATION_FILTERS), location).count()
+            self.assertEqual(item['count'], expected, (params, item['value']))
+
+    def test_counts_match_orm(self):
+        self.assertCountsMatchOrm({})
+        self.assertCountsMatchOrm({'work_mode': 'remote'})
+        self.assertCountsMatchOrm({'work_mode': 'onsite', 'experience_level': 'senior'})
+        self.assertCountsMatchOrm({'job_type': 'full_time', 'salary_min': '50000'})
+        self.assertCountsMatchOrm({'location': 'New York', 'work_mode': 'remote'})
+        self.assertCountsMatchOrm({'location': 'startup hub'})
@@ -11,5 +11,6 @@ urlpatterns = [
     path('<int:job_id>/save/', views.save_job, name='save'),
     path('saved/', views.saved_jobs, name='saved'),
     path('recommendations/', views.recommendations, name='recommendations'),
+    path('recommendations/status/', views.recommendations_status, name='recommendations_status'),
 ]
 
@@ -1,10 +1,14 @@
 """
 Utility functions for job recommendations and matching
 """
+import numpy as np
+from django.db import transaction
 from django.db.models import Q, Count
 from django.utils import timezone
 from .models import Job, JobRecommendation
 from accounts.models import JobSeekerProfile
+from .locations import locations_match
+from .skills import normalize_skills
 
 
 def calculate_job_match_score(user, job):
@@ -20,10 +24,10 @@ def calculate_job_match_score(user, job):
     except JobSeekerProfile.DoesNotExist:
         return 0.0, ["Profile not complete"]
     
-    # Skill matching (40% weight)
+    # Skill matching (40% weight), on canonical skill names ("js" == "JavaScript")
     if profile.skills and job.skills_required:
-        user_skills = [s.lower() for s in profile.skills]
-        job_skills = [s.lower() for s in job.skills_required]
+        user_skills = normalize_skills(profile.skills)
+        job_skills = normalize_skills(job.skills_required)
         
         matching_skills = set(user_skills) & set(job_skills)
         if job_skills:
@@ -52,11 +56,8 @@ def calculate_job_match_score(user, job):
     
     # Location matching (15% weight)
     if profile.location and job.location:
-        user_location = profile.location.lower()
-        job_location = job.location.lower()
-        
-        # Check if locations match (simple check)
-        if user_location in job_location or job_location in user_location:
+        # Same city, nearby, or inside the same region/country; substring check for unknown places
+        if locations_match(profile, job):
             score += 15
             reasons.append("Location matches")
         elif job.work_mode == 'remote':
@@ -82,51 +83,90 @@ def calculate_job_match_score(user, job):
     return min(score, 100.0), reasons
 
 
+def replace_job_recommendations(recommendations_by_user):
+    """
+    Replace the stored recommendations of one or more users
+    
+    Each user's previous rows are deleted and the new set is inserted with a
+    single bulk INSERT, all in one transaction (works on MySQL and SQLite).
+    Stale recommendations are pruned and created_at reflects the recompute.
+    
+    Args:
+        recommendations_by_user: {user_id: [(job_id, score, reason), ...]}
+        
+    Returns:
+        int: Number of rows written
+    """
+    rows = [
+        JobRecommendation(user_id=user_id, job_id=job_id, score=score, reason=reason)
+        for user_id, recommendations in recommendations_by_user.items()
+        for job_id, score, reason in recommendations
+    ]
+    with transaction.atomic():
+        JobRecommendation.objects.filter(user_id__in=list(recommendations_by_user)).delete()
+        JobRecommendation.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def save_job_recommendations(user, recommendations):
+    """Replace a single user's recommendations; see replace_job_recommendations"""
+    return replace_job_recommendations({user.id: recommendations})
+
+
 def generate_job_recommendations(user, limit=20):
     """
     Generate job recommendations for a user
+    
+    Scores the whole open catalogue at once with the vectorised matcher in
+    jobs.matching (same weights as calculate_job_match_score).
     """
     if not user.is_job_seeker:
         return []
     
-    # Get all active jobs (exclude expired jobs)
-    now = timezone.now()
-    active_jobs = Job.objects.filter(is_active=True).filter(
-        Q(deadline__isnull=True) | Q(deadline__gt=now)
-    )
+    from applications.models import Application
+    from .matching import get_catalogue
     
-    # Calculate scores for each job
+    try:
+        profile = user.job_seeker_profile
+    except JobSeekerProfile.DoesNotExist:
+        return []
+    
+    catalogue = get_catalogue()
+    if not len(catalogue):
+        return []
+    
+    # Calculate scores for each job, skipping expired and already-applied jobs
+    scores = catalogue.score(profile)
+    eligible = catalogue.open_mask() & (scores > 30)  # Only recommend jobs with score > 30
+    applied_rows = [
+        catalogue.row_of[job_id]
+        for job_id in Application.objects.filter(user=user).values_list('job_id', flat=True)
+        if job_id in catalogue.row_of
+    ]
+    eligible[applied_rows] = False
+    
+    # Sort by score (stable, so ties keep the listing order)
+    rows = np.flatnonzero(eligible)
+    rows = rows[np.argsort(-scores[rows], kind='stable')][:limit]
+    
+    jobs_by_id = Job.objects.filter(is_active=True).in_bulk(catalogue.ids[rows].tolist())
     recommendations = []
-    for job in active_jobs:
-        # Check if user already applied
-        from applications.models import Application
-        if Application.objects.filter(user=user, job=job).exists():
-            continue
-        
-        score, reasons = calculate_job_match_score(user, job)
-        
-        if score > 30:  # Only recommend jobs with score > 30
+    for row, reasons in zip(rows, catalogue.reasons(profile, rows)):
+        job = jobs_by_id.get(int(catalogue.ids[row]))
+        if job is not None:
             recommendations.append({
                 'job': job,
-                'score': score,
+                'score': float(scores[row]),
                 'reasons': reasons
             })
     
-    # Sort by score
-    recommendations.sort(key=lambda x: x['score'], reverse=True)
-    
     # Save to database
-    for rec in recommendations[:limit]:
-        JobRecommendation.objects.update_or_create(
-            user=user,
-            job=rec['job'],
-            defaults={
-                'score': rec['score'],
-                'reason': ', '.join(rec['reasons'])
-            }
-        )
-    
-    return recommendations[:limit]
+    save_job_recommendations(user, [
+        (rec['job'].id, rec['score'], ', '.join(rec['reasons']))
+        for rec in recommendations
+    ])
+    
+    return recommendations
 
 
 def get_job_recommendations_for_user(user, limit=20):
@@ -0,0 +1,623 @@
+"""
+Vector index layer for resume-to-job matching
+
+Backends (selected with settings.AI_VECTOR_INDEX_BACKEND):
+    - 'exact': brute-force cosine scan over a normalised float32 matrix
+    - 'ivf':   inverted-file index (k-means coarse quantiser) in pure NumPy
+    - 'hnsw':  HNSW graph via the optional `hnswlib` package
+
+Every backend stores L2-normalised vectors keyed by job id together with the
+job's content_version, is updated incrementally and can be persisted to disk.
+Row-aligned deadlines let searches mask expired jobs without touching the
+database; per-user exclusions are applied as a mask at query time too.
+
+An index is shared by every thread of a process (request threads, warm-up,
+background resume processing), so each one holds an RLock around its public
+methods: a search never sees the row-aligned arrays halfway through an update.
+"""
+import functools
+import logging
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(vectors):
+    """Return a contiguous float32 copy of `vectors` with unit-length rows"""
+    vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores, k):
+    """Indices of the k highest scores, best first (argpartition + partial sort)"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+def _locked(method):
+    """Run an index method under the index's lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _deadline_array(deadlines, count):
+    if deadlines is None:
+        return np.full(count, np.inf)
+    return np.array([np.inf if d is None else d for d in deadlines], dtype=np.float64)
+
+
+class VectorIndex:
+    """Base class: id/version bookkeeping shared by all backends"""
+    backend = None
+
+    def __init__(self, dimensions=None):
+        self.dimensions = dimensions
+        self._ids = np.empty(0, dtype=np.int64)
+        self._versions = np.empty(0, dtype=np.int64)
+        self._deadlines = np.empty(0, dtype=np.float64)  # epoch seconds, inf when none
+        self._row_of = {}
+        self._lock = threading.RLock()
+        self.dirty = False
+
+    def __len__(self):
+        return len(self._row_of)
+
+    @_locked
+    def ids(self):
+        """Job ids currently in the index"""
+        return list(self._row_of)
+
+    @_locked
+    def version_of(self, job_id):
+        row = self._row_of.get(job_id)
+        return None if row is None else int(self._versions[row])
+
+    @_locked
+    def stale_ids(self, id_versions):
+        """Ids from an iterable of (job_id, content_version) missing or outdated in the index"""
+        return [job_id for job_id, version in id_versions if self.version_of(job_id) != version]
+
+    def _rebuild_row_map(self):
+        self._row_of = {int(job_id): row for row, job_id in enumerate(self._ids)}
+
+    @_locked
+    def set_deadlines(self, ids, deadlines):
+        """Update row-aligned deadlines (epoch seconds, None for open-ended)"""
+        for job_id, deadline in zip(ids, deadlines):
+            row = self._row_of.get(int(job_id))
+            if row is not None:
+                self._deadlines[row] = np.inf if deadline is None else deadline
+
+    def _allowed_rows(self, allowed_ids=None, exclude_ids=None, active_at=None):
+        """Boolean row mask for pre-filtering, or None when nothing is filtered"""
+        if allowed_ids is None and not exclude_ids and active_at is None:
+            return None
+        if allowed_ids is None:
+            mask = np.ones(self._ids.shape[0], dtype=bool)
+        else:
+            mask = np.isin(self._ids, np.fromiter(allowed_ids, dtype=np.int64))
+        if active_at is not None:
+            mask &= self._deadlines > active_at
+        if exclude_ids:
+            rows = [self._row_of[job_id] for job_id in exclude_ids if job_id in self._row_of]
+            mask[rows] = False
+        return mask
+
+    def add(self, ids, vectors, versions, deadlines=None):
+        raise NotImplementedError
+
+    def remove(self, ids):
+        raise NotImplementedError
+
+    def search(self, query, k=10, min_score=None, allowed_ids=None, exclude_ids=None, active_at=None):
+        """
+        Return (job_ids, scores) for the k nearest jobs, best first
+
+        Args:
+            query: Query embedding (any scale; normalised internally)
+            k: Number of results
+            min_score: Optional cosine similarity threshold; only scores
+                strictly above it are returned
+            allowed_ids: Optional iterable restricting the candidate set
+            exclude_ids: Optional collection of ids that must not be returned
+            active_at: Optional epoch timestamp; jobs whose deadline is at or
+                before it are skipped
+        """
+        raise NotImplementedError
+
+    @_locked
+    def search_many(self, queries, k=10, min_score=None, exclude_ids=None, active_at=None):
+        """
+        Batched search: one (job_ids, scores) pair per query row
+
+        Args:
+            exclude_ids: Optional list (one collection per query) of ids to skip
+        """
+        exclude_ids = exclude_ids or [None] * len(queries)
+        return [
+            self.search(query, k=k, min_score=min_score, exclude_ids=excluded, active_at=active_at)
+            for query, excluded in zip(queries, exclude_ids)
+        ]
+
+    def save(self, path):
+        raise NotImplementedError
+
+    @classmethod
+    def load(cls, path):
+        raise NotImplementedError
+
+
+class ExactIndex(VectorIndex):
+    """
+    Brute-force index: one matmul over a contiguous normalised matrix.
+    With settings.AI_VECTOR_INDEX_DTYPE = 'float16' vectors are stored at half
+    precision (half the memory) and upcast chunk by chunk when scoring.
+    """
+    backend = 'exact'
+    score_chunk_size = 65536
+
+    def __init__(self, dimensions=None, dtype=None):
+        super().__init__(dimensions)
+        self.dtype = np.dtype(dtype or getattr(settings, 'AI_VECTOR_INDEX_DTYPE', 'float32'))
+        self._vectors = np.empty((0, dimensions or 0), dtype=self.dtype)
+
+    @_locked
+    def add(self, ids, vectors, versions, deadlines=None):
+        if len(ids) == 0:
+            return
+        vectors = normalize_rows(vectors).astype(self.dtype, copy=False)
+        if self.dimensions is None or self._vectors.shape[0] == 0:
+            self.dimensions = vectors.shape[1]
+            self._vectors = np.empty((0, self.dimensions), dtype=self.dtype)
+        self.remove(ids)
+        start = self._ids.shape[0]
+        self._ids = np.concatenate([self._ids, np.asarray(ids, dtype=np.int64)])
+        self._versions = np.concatenate([self._versions, np.asarray(versions, dtype=np.int64)])
+        self._deadlines = np.concatenate([self._deadlines, _deadline_array(deadlines, len(ids))])
+        self._vectors = np.ascontiguousarray(np.vstack([self._vectors, vectors]))
+        for offset, job_id in enumerate(ids):
+            self._row_of[int(job_id)] = start + offset
+        self._on_rows_added(start)
+        self.dirty = True
+
+    def _on_rows_added(self, start):
+        pass
+
+    @_locked
+    def remove(self, ids):
+        rows = [self._row_of[int(job_id)] for job_id in ids if int(job_id) in self._row_of]
+        if not rows:
+            return
+        keep = np.ones(self._ids.shape[0], dtype=bool)
+        keep[rows] = False
+        self._ids = self._ids[keep]
+        self._versions = self._versions[keep]
+        self._deadlines = self._deadlines[keep]
+        self._vectors = np.ascontiguousarray(self._vectors[keep])
+        self._on_rows_removed(keep)
+        self._rebuild_row_map()
+        self.dirty = True
+
+    def _on_rows_removed(self, keep):
+        pass
+
+    def _candidate_rows(self, query, k, mask):
+        return None  # scan everything
+
+    def _score_rows(self, query, rows=None):
+        """Cosine scores for `rows` (all rows when None), upcasting float16 storage in chunks"""
+        matrix = self._vectors if rows is None else self._vectors[rows]
+        if matrix.dtype == np.float32:
+            return matrix @ query
+        scores = np.empty(matrix.shape[0], dtype=np.float32)
+        for start in range(0, matrix.shape[0], self.score_chunk_size):
+            chunk = matrix[start:start + self.score_chunk_size].astype(np.float32)
+            scores[start:start + self.score_chunk_size] = chunk @ query
+        return scores
+
+    @_locked
+    def search(self, query, k=10, min_score=None, allowed_ids=None, exclude_ids=None, active_at=None):
+        empty = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self._ids.shape[0] == 0:
+            return empty
+        query = normalize_rows(query)[0]
+        mask = self._allowed_rows(allowed_ids, exclude_ids, active_at)
+        rows = self._candidate_rows(query, k, mask)
+        if rows is None:
+            rows = np.flatnonzero(mask) if mask is not None else None
+        elif mask is not None:
+            rows = rows[mask[rows]]
+        if rows is not None and rows.shape[0] == 0:
+            return empty
+
+        scores = self._score_rows(query, rows)
+        positions = None
+        # Apply the threshold before selecting/sorting so only qualifying scores are ranked
+        if min_score is not None:
+            positions = np.flatnonzero(scores > min_score)
+            scores = scores[positions]
+        best = top_k_indices(scores, k)
+        if positions is not None:
+            best_rows = positions[best]
+        else:
+            best_rows = best
+        if rows is not None:
+            best_rows = rows[best_rows]
+        return self._ids[best_rows], scores[best]
+
+    @_locked
+    def search_many(self, queries, k=10, min_score=None, exclude_ids=None, active_at=None):
+        """Exact batched search: one matrix-matrix multiply for all queries"""
+        if self._ids.shape[0] == 0:
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in queries]
+        queries = normalize_rows(queries)
+        scores = np.empty((queries.shape[0], self._ids.shape[0]), dtype=np.float32)
+        for start in range(0, self._ids.shape[0], self.score_chunk_size):
+            chunk = self._vectors[start:start + self.score_chunk_size].astype(np.float32, copy=False)
+            scores[:, start:start + self.score_chunk_size] = queries @ chunk.T
+        if active_at is not None:
+            scores[:, self._deadlines <= active_at] = -np.inf
+        for row, excluded in enumerate(exclude_ids or []):
+            if excluded:
+                scores[row, [self._row_of[job_id] for job_id in excluded if job_id in self._row_of]] = -np.inf
+        if min_score is not None:
+            scores[scores <= min_score] = -np.inf
+
+        k = min(k, scores.shape[1])
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        results = []
+        for row, cols in enumerate(candidates):
+            cols = cols[np.argsort(-scores[row, cols], kind='stable')]
+            cols = cols[np.isfinite(scores[row, cols])]
+            results.append((self._ids[cols], scores[row, cols]))
+        return results
+
+    def _extra_state(self):
+        return {}
+
+    def _restore_extra_state(self, data):
+        pass
+
+    @_locked
+    def save(self, path):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            ids=self._ids,
+            versions=self._versions,
+            vectors=self._vectors,
+            **self._extra_state(),
+        )
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            index = cls(int(data['vectors'].shape[1]))
+            index._ids = data['ids'].astype(np.int64)
+            index._versions = data['versions'].astype(np.int64)
+            index._vectors = np.ascontiguousarray(data['vectors'], dtype=index.dtype)
+            index._deadlines = np.full(index._ids.shape[0], np.inf)
+            index._rebuild_row_map()
+            index._restore_extra_state(data)
+        return index
+
+
+class IVFIndex(ExactIndex):
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means centroid
+    and a query only scans the `nprobe` closest buckets. Below `min_train_size`
+    vectors it behaves exactly like ExactIndex. search_many is inherited, so
+    batch scoring stays an exact matrix-matrix multiply.
+    """
+    backend = 'ivf'
+    min_train_size = 2048
+    kmeans_iterations = 10
+    kmeans_sample_size = 20000
+
+    def __init__(self, dimensions=None, dtype=None, nprobe=None):
+        super().__init__(dimensions, dtype)
+        self.nprobe = nprobe or getattr(settings, 'AI_VECTOR_INDEX_NPROBE', 8)
+        self._centroids = None
+        self._assign = np.empty(0, dtype=np.int32)
+        self._trained_size = 0
+        self._order = None
+        self._bounds = None
+
+    def _train(self):
+        n = self._vectors.shape[0]
+        nlist = max(1, int(4 * np.sqrt(n)))
+        rng = np.random.default_rng(0)
+        sample = self._vectors
+        if n > self.kmeans_sample_size:
+            sample = self._vectors[rng.choice(n, self.kmeans_sample_size, replace=False)]
+        sample = sample.astype(np.float32)
+        centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if members.shape[0]:
+                    centroids[c] = members.mean(axis=0)
+            centroids = normalize_rows(centroids)
+        self._centroids = centroids
+        self._assign = self._assign_rows(self._vectors)
+        self._trained_size = n
+        self._order = None
+        logger.info(f"Trained IVF index with {nlist} lists over {n} vectors")
+
+    def _assign_rows(self, vectors):
+        if self._centroids is None or vectors.shape[0] == 0:
+            return np.zeros(vectors.shape[0], dtype=np.int32)
+        labels = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], self.score_chunk_size):
+            chunk = vectors[start:start + self.score_chunk_size].astype(np.float32)
+            labels[start:start + self.score_chunk_size] = np.argmax(chunk @ self._centroids.T, axis=1)
+        return labels
+
+    def _on_rows_added(self, start):
+        n = self._vectors.shape[0]
+        if n >= self.min_train_size and (self._centroids is None or n > 4 * self._trained_size):
+            self._train()
+            return
+        self._assign = np.concatenate([self._assign, self._assign_rows(self._vectors[start:])])
+        self._order = None
+
+    def _on_rows_removed(self, keep):
+        self._assign = self._assign[keep]
+        self._order = None
+
+    def _candidate_rows(self, query, k, mask):
+        if self._centroids is None:
+            return None
+        if self._order is None:
+            self._order = np.argsort(self._assign, kind='stable')
+            self._bounds = np.searchsorted(self._assign[self._order], np.arange(self._centroids.shape[0] + 1))
+        ranked_lists = np.argsort(-(self._centroids @ query))
+        nprobe = self.nprobe
+        while True:
+            probe = ranked_lists[:nprobe]
+            rows = np.concatenate([self._order[self._bounds[c]:self._bounds[c + 1]] for c in probe])
+            available = rows.shape[0] if mask is None else int(mask[rows].sum())
+            if available >= k or nprobe >= ranked_lists.shape[0]:
+                return rows
+            nprobe *= 2
+
+    def _extra_state(self):
+        if self._centroids is None:
+            return {}
+        return {
+            'centroids': self._centroids,
+            'assign': self._assign,
+            'trained_size': np.array([self._trained_size]),
+        }
+
+    def _restore_extra_state(self, data):
+        if 'centroids' in data.files:
+            self._centroids = data['centroids']
+            self._assign = data['assign'].astype(np.int32)
+            self._trained_size = int(data['trained_size'][0])
+        else:
+            self._assign = np.zeros(self._ids.shape[0], dtype=np.int32)
+
+
+class HNSWIndex(VectorIndex):
+    """HNSW graph index backed by the optional `hnswlib` package"""
+    backend = 'hnsw'
+
+    def __init__(self, dimensions=None, ef_search=None):
+        try:
+            import hnswlib  # noqa: F401
+        except ImportError:
+            raise ImportError("The 'hnsw' vector index backend requires the hnswlib package")
+        super().__init__(dimensions)
+        self.ef_search = ef_search or getattr(settings, 'AI_VECTOR_INDEX_EF_SEARCH', 64)
+        self._graph = None
+        self._capacity = 0
+        self._deleted = set()
+
+    def _ensure_capacity(self, extra):
+        import hnswlib
+
+        needed = self._graph.get_current_count() + extra if self._graph is not None else extra
+        if self._graph is None:
+            self._capacity = max(1024, needed * 2)
+            self._graph = hnswlib.Index(space='ip', dim=self.dimensions)
+            self._graph.init_index(max_elements=self._capacity, ef_construction=200, M=16)
+            self._graph.set_ef(self.ef_search)
+        elif needed > self._capacity:
+            self._capacity = needed * 2
+            self._graph.resize_index(self._capacity)
+
+    @_locked
+    def add(self, ids, vectors, versions, deadlines=None):
+        if len(ids) == 0:
+            return
+        vectors = normalize_rows(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        self.dimensions = self.dimensions or vectors.shape[1]
+        self._ensure_capacity(len(ids))
+        for job_id in ids.tolist():
+            if job_id in self._deleted:
+                self._graph.unmark_deleted(job_id)
+                self._deleted.discard(job_id)
+        # Existing labels are updated in place by hnswlib
+        self._graph.add_items(vectors, ids)
+        keep = ~np.isin(self._ids, ids)
+        self._ids = np.concatenate([self._ids[keep], ids])
+        self._versions = np.concatenate([self._versions[keep], np.asarray(versions, dtype=np.int64)])
+        self._deadlines = np.concatenate([self._deadlines[keep], _deadline_array(deadlines, len(ids))])
+        self._rebuild_row_map()
+        self.dirty = True
+
+    @_locked
+    def remove(self, ids):
+        present = [int(job_id) for job_id in ids if int(job_id) in self._row_of]
+        if not present:
+            return
+        for job_id in present:
+            self._graph.mark_deleted(job_id)
+            self._deleted.add(job_id)
+        keep = ~np.isin(self._ids, present)
+        self._ids = self._ids[keep]
+        self._versions = self._versions[keep]
+        self._deadlines = self._deadlines[keep]
+        self._rebuild_row_map()
+        self.dirty = True
+
+    @_locked
+    def search(self, query, k=10, min_score=None, allowed_ids=None, exclude_ids=None, active_at=None):
+        if not self._row_of:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = normalize_rows(query)
+        mask = self._allowed_rows(allowed_ids, exclude_ids, active_at)
+        id_filter = None
+        if mask is not None:
+            allowed_count = int(mask.sum())
+            if not allowed_count:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            # Filter on whichever side of the mask is smaller
+            if allowed_count <= mask.shape[0] // 2:
+                id_filter = set(self._ids[mask].tolist()).__contains__
+            else:
+                blocked = set(self._ids[~mask].tolist())
+                id_filter = lambda label: label not in blocked  # noqa: E731
+        k = min(k, len(self._row_of) if mask is None else int(mask.sum()))
+        self._graph.set_ef(max(self.ef_search, k))
+        labels, distances = self._graph.knn_query(query, k=k, filter=id_filter)
+        # 'ip' space returns 1 - inner product
+        job_ids = labels[0].astype(np.int64)
+        scores = (1.0 - distances[0]).astype(np.float32)
+        if min_score is not None:
+            keep = scores > min_score
+            job_ids, scores = job_ids[keep], scores[keep]
+        return job_ids, scores
+
+    @_locked
+    def save(self, path):
+        graph_path = f"{path}.graph"
+        self._graph.save_index(f"{graph_path}.tmp")
+        os.replace(f"{graph_path}.tmp", graph_path)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, ids=self._ids, versions=self._versions,
+                 deleted=np.fromiter(self._deleted, dtype=np.int64),
+                 meta=np.array([self.dimensions, self._capacity]))
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        import hnswlib
+
+        with np.load(path) as data:
+            dimensions, capacity = (int(v) for v in data['meta'])
+            index = cls(dimensions)
+            index._ids = data['ids'].astype(np.int64)
+            index._versions = data['versions'].astype(np.int64)
+            index._deleted = set(data['deleted'].tolist())
+        index._deadlines = np.full(index._ids.shape[0], np.inf)
+        index._rebuild_row_map()
+        index._capacity = capacity
+        index._graph = hnswlib.Index(space='ip', dim=dimensions)
+        index._graph.load_index(f"{path}.graph", max_elements=capacity)
+        index._graph.set_ef(index.ef_search)
+        return index
+
+
+BACKENDS = {
+    'exact': ExactIndex,
+    'ivf': IVFIndex,
+    'hnsw': HNSWIndex,
+}
+
+# Loaded indexes per (backend, model_name): {key: (index, mtime_at_load)}
+_indexes = {}
+_lock = threading.RLock()
+
+
+def get_backend_name():
+    return getattr(settings, 'AI_VECTOR_INDEX_BACKEND', 'exact')
+
+
+def get_index_path(model_name, backend=None):
+    """On-disk location of the index file for a model/backend pair"""
+    backend = backend or get_backend_name()
+    directory = getattr(settings, 'AI_VECTOR_INDEX_DIR', None)
+    if not directory:
+        return None
+    slug = model_name.replace('/', '__')
+    return os.path.join(str(directory), f"jobs-{backend}-{slug}.npz")
+
+
+def get_job_index(model_name):
+    """
+    Return the job vector index for `model_name`, loading it from disk when
+    available. Another process saving a newer file causes a reload.
+    """
+    backend = get_backend_name()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown AI_VECTOR_INDEX_BACKEND: {backend}")
+    key = (backend, model_name)
+    path = get_index_path(model_name, backend)
+    with _lock:
+        index, loaded_mtime = _indexes.get(key, (None, None))
+        disk_mtime = os.path.getmtime(path) if path and os.path.exists(path) else None
+        if index is None or (disk_mtime and disk_mtime != loaded_mtime and not index.dirty):
+            index = None
+            if disk_mtime:
+                try:
+                    index = BACKENDS[backend].load(path)
+                except Exception as e:
+                    logger.warning(f"Could not load vector index {path}: {e}")
+            if index is None:
+                index = BACKENDS[backend]()
+            _indexes[key] = (index, disk_mtime)
+        return index
+
+
+def save_job_index(model_name):
+    """Persist the loaded index for `model_name` if it has unsaved changes"""
+    backend = get_backend_name()
+    key = (backend, model_name)
+    path = get_index_path(model_name, backend)
+    with _lock:
+        index, _ = _indexes.get(key, (None, None))
+        if index is None or not index.dirty or not path:
+            return
+        if not len(index):
+            # Nothing to save; remove the old file so a restart does not load closed jobs
+            for stale_path in (path, f"{path}.graph"):
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+            index.dirty = False
+            _indexes[key] = (index, None)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        index.save(path)
+        _indexes[key] = (index, os.path.getmtime(path))
+
+
+def discard_jobs(job_ids):
+    """Drop jobs from every loaded index (e.g. after deletion)"""
+    with _lock:
+        for index, _ in _indexes.values():
+            index.remove(job_ids)
@@ -1,10 +1,15 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count
-from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.db.models import Count
 from django.utils import timezone
+from core.pagination import InvalidCursor
 from .models import Job, JobView, JobRecommendation
+from .facets import get_facet_counts
+from .resume_pipeline import get_resume_status
+from .search import apply_filters, location_filter, normalize_search_params, search_page
+from .skills import get_job_skill_matrix
 from applications.models import Application
 from accounts.models import SavedJob
 
@@ -13,17 +18,8 @@ def home(request):
     """Homepage with recent jobs"""
     # Exclude expired jobs (deadline has passed)
     now = timezone.now()
-    recent_jobs = Job.objects.filter(
-        is_active=True
-    ).filter(
-        Q(deadline__isnull=True) | Q(deadline__gt=now)
-    ).order_by('-created_at')[:10]
-    featured_jobs = Job.objects.filter(
-        is_active=True, 
-        is_featured=True
-    ).filter(
-        Q(deadline__isnull=True) | Q(deadline__gt=now)
-    ).order_by('-created_at')[:6]
+    recent_jobs = Job.objects.open(now).order_by('-created_at')[:10]
+    featured_jobs = Job.objects.open(now).filter(is_featured=True).order_by('-created_at')[:6]
     
     context = {
         'recent_jobs': recent_jobs,
@@ -32,67 +28,79 @@ def home(request):
     return render(request, 'jobs/home.html', context)
 
 
+def _without_cursor(params):
+    """Query string of the current search without the pagination cursor"""
+    params = params.copy()
+    params.pop('cursor', None)
+    params.pop('page', None)
+    return params.urlencode()
+
+
+# "Within X km" options on the search form
+RADIUS_CHOICES = ('10', '25', '50', '100')
+
+FACET_TITLES = (
+    ('work_mode', 'Work Mode'),
+    ('job_type', 'Job Type'),
+    ('experience_level', 'Experience'),
+    ('location', 'Location'),
+    ('salary_min', 'Salary'),
+)
+
+
+def _facet_links(params, facets):
+    """(title, entries) per facet; each entry carries the query string that selects (or, when active, clears) it"""
+    groups = []
+    for name, title in FACET_TITLES:
+        entries = []
+        for entry in facets.get(name, []):
+            query = params.copy()
+            query.pop('cursor', None)
+            query.pop('page', None)
+            if name == 'location':
+                # "NYC" selects the "New York, New York" entry
+                selected = location_filter(entry['value']) == location_filter(params.get(name))
+            else:
+                selected = str(entry['value']).lower() == (params.get(name) or '').strip().lower()
+            if selected:
+                query.pop(name, None)
+                if name == 'location':
+                    query.pop('radius_km', None)
+            else:
+                query[name] = entry['value']
+            entries.append(dict(entry, selected=selected, query=query.urlencode()))
+        groups.append((title, entries))
+    return groups
+
+
 def search_jobs(request):
     """Job search with filters"""
     # Exclude expired jobs (deadline has passed)
-    now = timezone.now()
-    jobs = Job.objects.filter(is_active=True).filter(
-        Q(deadline__isnull=True) | Q(deadline__gt=now)
-    )
+    jobs = Job.objects.open()
     
-    # Search query
-    query = request.GET.get('q', '')
-    if query:
-        jobs = jobs.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(company__name__icontains=query) |
-            Q(skills_required__icontains=query)
-        )
-    
-    # Filters
-    location = request.GET.get('location')
-    if location:
-        # More flexible location matching - split by comma and search for any part
-        location_parts = [part.strip() for part in location.split(',')]
-        location_query = Q()
-        for part in location_parts:
-            if part:
-                location_query |= Q(location__icontains=part)
-        if location_query:
-            jobs = jobs.filter(location_query)
-    
-    work_mode = request.GET.get('work_mode')
-    if work_mode:
-        jobs = jobs.filter(work_mode=work_mode)
-    
-    job_type = request.GET.get('job_type')
-    if job_type:
-        jobs = jobs.filter(job_type=job_type)
-    
-    experience_level = request.GET.get('experience_level')
-    if experience_level:
-        jobs = jobs.filter(experience_level=experience_level)
-    
-    salary_min = request.GET.get('salary_min')
-    if salary_min:
-        jobs = jobs.filter(salary_max__gte=salary_min)
+    # Filters (place or location parts, radius, work mode, job type, experience level, minimum salary)
+    params = normalize_search_params(request.GET)
+    jobs = apply_filters(jobs, params)
     
-    # Pagination
-    paginator = Paginator(jobs, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Search query: relevance-ranked, restricted to the filtered jobs; otherwise newest first.
+    # Cursor pagination: ?cursor= seeks on (created_at, id), so deep pages cost the same as the first.
+    # Result ids are cached per canonical query, so a repeated search only loads the page by id
+    query = request.GET.get('q', '')
+    try:
+        page_obj = search_page(params, jobs, request.GET.get('cursor'), 20)
+    except InvalidCursor:
+        return redirect(f"{request.path}?{_without_cursor(request.GET)}")
     
     context = {
         'jobs': page_obj,
+        'pagination_query': _without_cursor(request.GET),
         'query': query,
+        'facet_groups': _facet_links(request.GET, get_facet_counts(params)),
         'filters': {
-            'location': location,
-            'work_mode': work_mode,
-            'job_type': job_type,
-            'experience_level': experience_level,
-            'salary_min': salary_min,
-        }
+            name: request.GET.get(name, '')
+            for name in ('location', 'radius_km', 'work_mode', 'job_type', 'experience_level', 'salary_min')
+        },
+        'radius_choices': RADIUS_CHOICES,
     }
     return render(request, 'jobs/search.html', context)
 
@@ -127,14 +135,10 @@ def job_detail(request, job_id):
         has_applied = Application.objects.filter(user=request.user, job=job).exists()
         is_saved = SavedJob.objects.filter(user=request.user, job=job).exists()
     
-    # Related jobs - exclude expired jobs
-    now = timezone.now()
-    related_jobs = Job.objects.filter(
-        is_active=True,
-        skills_required__overlap=job.skills_required
-    ).filter(
-        Q(deadline__isnull=True) | Q(deadline__gt=now)
-    ).exclude(id=job.id)[:5]
+    # Related jobs (most shared skills first) - exclude expired jobs
+    related_ids = get_job_skill_matrix().related(job.skill_ids, exclude_id=job.id, limit=5)
+    related_by_id = Job.objects.open().in_bulk(related_ids)
+    related_jobs = [related_by_id[job_id] for job_id in related_ids if job_id in related_by_id]
     
     context = {
         'job': job,
@@ -242,6 +246,8 @@ def recommendations(request):
     
     recommendations_list = []
     use_ai = False
+    resume_status = get_resume_status(request.user)
+    processing = bool(resume_status and resume_status['pending'])
     
     # First, check if we have saved recommendations in database
     from .models import JobRecommendation
@@ -282,8 +288,8 @@ def recommendations(request):
                 })
     else:
         # No saved recommendations, generate new ones
-        # Try AI recommendations first if user has a resume
-        if profile and profile.resume:
+        # Try AI recommendations first if user has a resume (unless a background run is in flight)
+        if profile and profile.resume and not processing:
             try:
                 from .ai_recommender import recommend_jobs_from_resume
                 ai_recommendations = recommend_jobs_from_resume(profile.resume, request.user, top_k=20)
@@ -313,8 +319,16 @@ def recommendations(request):
     context = {
         'recommendations': recommendations_list,
         'use_ai': use_ai,
-        'has_resume': profile.resume if profile else False
+        'has_resume': profile.resume if profile else False,
+        'resume_status': resume_status,
+        'processing': processing,
     }
     
     return render(request, 'jobs/recommendations.html', context)
 
+
+@login_required
+def recommendations_status(request):
+    """Background resume processing status, polled by the recommendations page"""
+    return JsonResponse({'processing': get_resume_status(request.user)})
+
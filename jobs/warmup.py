@@ -0,0 +1,132 @@
+"""
+AI model preloading, warm-up and readiness
+
+With AI_PRELOAD_MODEL enabled the sentence transformer is loaded in
+JobsConfig.ready(). Under gunicorn with preload_app (see gunicorn.conf.py)
+that happens once in the master, so forked workers share the weights
+copy-on-write; each worker then runs warm_up() after forking to initialise
+inference and load the job index before it reports ready. Only known server
+entry points preload (should_preload); other commands and scripts never load
+the model at startup. This module must stay importable without the AI
+dependencies (the health check uses it).
+"""
+import logging
+import os
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_state = {'started_at': None, 'seconds': None, 'error': ''}
+
+# Management commands that serve requests or run recommendation tasks
+SERVER_COMMANDS = ('runserver', 'runserver_plus')
+# Other entry points that preload: program name -> required subcommand (None: any)
+SERVER_PROGRAMS = {'gunicorn': None, 'celery': 'worker'}
+
+
+def preload_enabled():
+    return bool(getattr(settings, 'AI_PRELOAD_MODEL', False))
+
+
+def should_preload():
+    """
+    Whether this process serves recommendations: only known server entry points
+    (SERVER_PROGRAMS, or manage.py with one of SERVER_COMMANDS) preload, never
+    scripts, shells, test runners or other management commands
+    """
+    if not preload_enabled():
+        return False
+    program = os.path.basename(sys.argv[0]) if sys.argv else ''
+    if program in ('manage.py', 'django-admin'):
+        if len(sys.argv) < 2 or sys.argv[1] not in SERVER_COMMANDS:
+            return False
+        # runserver's autoreloader parent only watches files
+        return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+    for name, subcommand in SERVER_PROGRAMS.items():
+        if program == name:
+            return subcommand is None or subcommand in sys.argv[1:]
+    return False
+
+
+def forks_workers():
+    """Whether this is a gunicorn or celery master that forks the serving processes"""
+    program = os.path.basename(sys.argv[0]) if sys.argv else ''
+    return program.startswith(('gunicorn', 'celery'))
+
+
+def preload_model():
+    """Load the model weights (no inference), e.g. in the gunicorn master before forking"""
+    from .ai_recommender import get_model
+    from .inference_client import get_inference_url
+
+    if get_inference_url():
+        # Encoding happens in the inference server; workers only load it as a fallback
+        return
+    started = time.monotonic()
+    get_model()
+    logger.info(f"Preloaded AI model in {time.monotonic() - started:.1f}s")
+
+
+def warm_up(load_index=True):
+    """
+    Load the model, run one encode and (optionally) sync the job index, then mark ready
+
+    Returns:
+        float: Seconds taken
+    """
+    from .ai_recommender import encode_texts, get_catalogue_index
+
+    _state['started_at'] = time.time()
+    started = time.monotonic()
+    try:
+        encode_texts(['warm-up'])
+        if load_index:
+            try:
+                get_catalogue_index(wait=True)
+            except Exception as e:
+                # The model is usable; the index is synced on the first request instead
+                logger.warning(f"Job index warm-up failed: {e}")
+            finally:
+                from django.db import close_old_connections
+                close_old_connections()
+    except Exception as e:
+        _state['error'] = str(e)
+        logger.error(f"AI model warm-up failed: {e}", exc_info=True)
+        raise
+    _state['seconds'] = round(time.monotonic() - started, 2)
+    _state['error'] = ''
+    _ready.set()
+    logger.info(f"AI recommender warmed up in {_state['seconds']}s (pid {os.getpid()})")
+    return _state['seconds']
+
+
+def start_warm_up(load_index=True):
+    """Warm up in a daemon thread; the readiness check reports not-ready until it finishes"""
+    def run():
+        try:
+            warm_up(load_index=load_index)
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=run, name='ai-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready():
+    """Ready to serve: always when preloading is disabled, otherwise once warmed up"""
+    return not preload_enabled() or _ready.is_set()
+
+
+def readiness():
+    return {
+        'ready': is_ready(),
+        'preload': preload_enabled(),
+        'warm_up_seconds': _state['seconds'],
+        'error': _state['error'],
+    }